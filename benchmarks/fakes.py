@@ -0,0 +1,237 @@
+"""
+Fakes for everything the plugin talks to outside Python: hostapd's control socket,
+dnsmasq's lease file and external commands.
+"""
+import asyncio
+import multiprocessing
+import os
+import re
+import select
+import socket
+import time
+from collections import OrderedDict
+
+
+def station_mac(index: int) -> str:
+    # Locally administered, deterministic MACs so hostapd, the lease file and the checks agree.
+    return f"02:00:00:{(index >> 16) & 0xff:02x}:{(index >> 8) & 0xff:02x}:{index & 0xff:02x}"
+
+
+def station_reply(mac: str, index: int, now: float) -> str:
+    # A STA-FIRST/STA-NEXT reply shaped like a real hostapd 2.10 one. Counters grow with time
+    # so rate calculations have something to work on.
+    elapsed = int(now * 1000) % 10_000_000
+    return "\n".join([
+        mac,
+        "flags=[AUTH][ASSOC][AUTHORIZED][SHORT_PREAMBLE][WMM][HT][VHT]",
+        f"aid={index % 2007 + 1}",
+        "capability=0x0011",
+        "listen_interval=10",
+        "supported_rates=8c 12 98 24 b0 48 60 6c",
+        "timeout_next=NULLFUNC POLL",
+        f"dot11RSNAStatsSTAAddress={mac}",
+        "dot11RSNAStatsVersion=1",
+        "dot11RSNAStatsSelectedPairwiseCipher=00-0f-ac-4",
+        "dot11RSNAStatsTKIPLocalMICFailures=0",
+        "dot11RSNAStatsTKIPRemoteMICFailures=0",
+        "wpa=2",
+        "AKMSuiteSelector=00-0f-ac-2",
+        "hostapd_WPA_AUTH_MODE=2",
+        f"rx_packets={elapsed * 3}",
+        f"tx_packets={elapsed * 4}",
+        f"rx_bytes={elapsed * 3 * 420}",
+        f"tx_bytes={elapsed * 4 * 610}",
+        f"inactive_msec={index * 7 % 900}",
+        f"signal=-{40 + index % 40}",
+        "rx_rate_info=8667 vhtmcs 9 vhtnss 2 shortGI",
+        "tx_rate_info=7800 vhtmcs 8 vhtnss 2 shortGI",
+        f"tx_retry_count={elapsed // 50}",
+        f"tx_retry_failed={elapsed // 5000}",
+        f"connected_time={elapsed // 1000}",
+        "",
+    ])
+
+
+def _serve_hostapd(path: str, control):
+    # Child process: answers ctrl_iface requests on `path` and applies commands from `control`.
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    if os.path.exists(path):
+        os.unlink(path)
+    sock.bind(path)
+    stations = OrderedDict()
+    # Station order for STA-NEXT, rebuilt when stations change so a walk is O(n) like hostapd's list.
+    order, position = [], {}
+    attached = set()
+    next_index = 0
+
+    def broadcast(message: str):
+        for addr in list(attached):
+            try:
+                sock.sendto(message.encode(), addr)
+            except OSError:
+                attached.discard(addr)
+
+    def handle(command: str, addr):
+        now = time.time()
+        if command == "PING":
+            return "PONG\n"
+        if command == "ATTACH":
+            attached.add(addr)
+            return "OK\n"
+        if command == "DETACH":
+            attached.discard(addr)
+            return "OK\n"
+        if command == "STATUS":
+            return f"state=ENABLED\nchannel=36\nnum_sta[0]={len(stations)}\n"
+        if command == "STA-FIRST":
+            mac = next(iter(stations), None)
+            return station_reply(mac, stations[mac], now) if mac else ""
+        if command.startswith("STA-NEXT "):
+            following = position.get(command.split()[1], len(order)) + 1
+            return station_reply(order[following], stations[order[following]], now) if following < len(order) else ""
+        if command.startswith("STA "):
+            mac = command.split()[1]
+            return station_reply(mac, stations[mac], now) if mac in stations else "FAIL\n"
+        if command.startswith(("DEAUTHENTICATE", "DENY_ACL", "SET ", "RELOAD", "CHAN_SWITCH")):
+            return "OK\n"
+        return "UNKNOWN COMMAND\n"
+
+    while True:
+        readable, _, _ = select.select([sock, control], [], [])
+        if control in readable:
+            try:
+                op, count = control.recv()
+            except EOFError:
+                break
+            added, removed = [], []
+            if op in ("populate", "churn"):
+                # populate replaces every station; churn replaces the `count` oldest.
+                for _ in range(len(stations) if op == "populate" else min(count, len(stations))):
+                    mac, _ = stations.popitem(last=False)
+                    removed.append(mac)
+                for _ in range(count):
+                    mac = station_mac(next_index)
+                    stations[mac] = next_index
+                    added.append(mac)
+                    next_index += 1
+                order[:] = stations
+                position.clear()
+                position.update((mac, i) for i, mac in enumerate(order))
+                for mac in removed:
+                    broadcast(f"<3>AP-STA-DISCONNECTED {mac}")
+                for mac in added:
+                    broadcast(f"<3>AP-STA-CONNECTED {mac}")
+            elif op == "stop":
+                break
+            control.send({"added": added, "removed": removed, "stations": list(stations)})
+        if sock in readable:
+            data, addr = sock.recvfrom(4096)
+            if not addr:
+                continue
+            reply = handle(data.decode(errors="replace").strip(), addr)
+            try:
+                sock.sendto(reply.encode(), addr)
+            except OSError:
+                attached.discard(addr)
+
+    sock.close()
+    os.unlink(path)
+
+
+class FakeHostapd:
+    """
+    hostapd ctrl_iface stand-in running in a child process, so its CPU time isn't charged to
+    the plugin. Supports the requests the plugin sends, ATTACH/DETACH and
+    AP-STA-CONNECTED/DISCONNECTED events when stations churn.
+    """
+
+    def __init__(self, ctrl_dir: str, interface: str = "muon0"):
+        self.path = os.path.join(ctrl_dir, interface)
+        self._control, child = multiprocessing.get_context("fork").Pipe()
+        self._process = multiprocessing.get_context("fork").Process(target=_serve_hostapd, args=(self.path, child), daemon=True)
+        self.stations = []
+
+    def start(self):
+        self._process.start()
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.path):
+            if time.monotonic() > deadline:
+                raise RuntimeError("fake hostapd did not start")
+            time.sleep(0.01)
+
+    def _call(self, op: str, count: int = 0) -> dict:
+        self._control.send((op, count))
+        result = self._control.recv()
+        self.stations = result["stations"]
+        return result
+
+    def populate(self, count: int) -> dict:
+        # Replaces every station with `count` new ones.
+        return self._call("populate", count)
+
+    def churn(self, count: int) -> dict:
+        # Disconnects the `count` oldest stations and connects as many new ones.
+        return self._call("churn", count)
+
+    def stop(self):
+        if self._process.is_alive():
+            self._control.send(("stop", 0))
+            self._process.join(5)
+        if self._process.is_alive():
+            self._process.kill()
+
+
+class LeaseWriter:
+    # Writes a dnsmasq lease file for the given MACs the way dnsmasq does: new file, then rename.
+    def __init__(self, path: str, subnet: str = "192.168.8"):
+        self.path = path
+        self.subnet = subnet
+
+    def write(self, macs, lifetime: int = 43200):
+        expiry = int(time.time()) + lifetime
+        lines = []
+        for i, mac in enumerate(macs):
+            host = 100 + i % 150
+            lines.append(f"{expiry} {mac} {self.subnet}.{host} client-{mac.replace(':', '')[-6:]} 01:{mac}")
+        temp = f"{self.path}.new"
+        with open(temp, "w") as f:
+            f.write("\n".join(lines) + ("\n" if lines else ""))
+        os.replace(temp, self.path)
+
+
+class FakeCommands:
+    """
+    Replaces Plugin.execute_command (and so run_command, run_privileged and the scripts) with
+    canned results after a configurable delay. Rules are (pattern, latency, stdout, returncode)
+    matched with re.search against the command line; the first match wins.
+    """
+
+    def __init__(self, rules: list, default_latency: float = 0.002, scale: float = 1.0):
+        self.rules = [(re.compile(pattern), latency, stdout, returncode) for pattern, latency, stdout, returncode in rules]
+        self.default_latency = default_latency
+        self.scale = scale
+        self.calls = []
+
+    def install(self, plugin):
+        # Sends every external command through this runner. The helper is dropped so
+        # run_privileged_batch falls back to execute_command.
+        plugin.helper = None
+
+        async def execute_command(command, cwd=None, timeout=None, category=None):
+            label = " ".join(command) if isinstance(command, list) else command
+            async with plugin.command_slot():
+                with plugin.tracer.span(label[:80], category="command"):
+                    return await self.execute(label)
+
+        plugin.execute_command = execute_command
+
+    async def execute(self, label: str) -> dict:
+        self.calls.append(label)
+        latency, stdout, returncode = self.default_latency, "", 0
+        for pattern, rule_latency, rule_stdout, rule_returncode in self.rules:
+            if pattern.search(label):
+                latency, stdout, returncode = rule_latency, rule_stdout, rule_returncode
+                break
+        if latency:
+            await asyncio.sleep(latency * self.scale)
+        return {"returncode": returncode, "stdout": stdout, "stderr": "", "timed_out": False}
@@ -0,0 +1,115 @@
+"""
+Measurement and baseline comparison.
+
+Every benchmark is run twice: a timing pass recording wall-clock latency and process CPU
+time per tick, then an allocation pass under tracemalloc (which slows everything down, so
+it never overlaps the timing pass) recording the peak memory allocated during each tick.
+"""
+import json
+import os
+import time
+import tracemalloc
+
+# A metric regresses when it exceeds baseline * (1 + tolerance) + slack. The slack keeps
+# sub-millisecond benchmarks from failing on scheduler noise.
+METRICS = {
+    "latency_ms": 0.25,
+    "cpu_ms": 0.25,
+    "alloc_kib": 4.0,
+}
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(values: list) -> dict:
+    return {
+        "p50": round(percentile(values, 0.5), 3),
+        "p95": round(percentile(values, 0.95), 3),
+        "max": round(max(values), 3) if values else 0.0,
+    }
+
+
+async def measure(tick, ticks: int, before_tick=None, warmup: int = 3) -> dict:
+    # Runs `tick` (an async callable) `ticks` times per pass. `before_tick`, if given, runs
+    # before every tick outside the measured section, e.g. to churn stations.
+    async def run_pass(record):
+        for i in range(warmup + ticks):
+            if before_tick is not None:
+                await before_tick()
+            sample = await record()
+            if i >= warmup:
+                samples.append(sample)
+
+    async def timed():
+        cpu, wall = time.process_time(), time.perf_counter()
+        await tick()
+        return (time.perf_counter() - wall) * 1000, (time.process_time() - cpu) * 1000
+
+    async def traced():
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        await tick()
+        _, peak = tracemalloc.get_traced_memory()
+        return max(0, peak - start) / 1024
+
+    samples = []
+    await run_pass(timed)
+    latencies = [s[0] for s in samples]
+    cpu = [s[1] for s in samples]
+
+    samples = []
+    tracemalloc.start()
+    try:
+        await run_pass(traced)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ticks": ticks,
+        "latency_ms": summarize(latencies),
+        "cpu_ms": summarize(cpu),
+        "alloc_kib": summarize(samples),
+    }
+
+
+def load_baselines(path: str) -> dict:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(path: str, results: dict):
+    # Records the medians of `results`, keeping baselines of benchmarks that weren't run.
+    baselines = load_baselines(path)
+    baselines.update(
+        (name, {metric: result[metric]["p50"] for metric in METRICS})
+        for name, result in results.items()
+    )
+    temp = f"{path}.tmp"
+    with open(temp, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(temp, path)
+
+
+def compare(results: dict, baselines: dict, tolerance: float) -> list:
+    # Returns (benchmark, metric, baseline, current) for every p50 over its allowance.
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        for metric, slack in METRICS.items():
+            if metric not in baseline:
+                continue
+            current = result[metric]["p50"]
+            if current > baseline[metric] * (1 + tolerance) + slack:
+                regressions.append((name, metric, baseline[metric], current))
+    return regressions
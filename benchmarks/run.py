@@ -0,0 +1,96 @@
+"""
+Hermetic benchmark runner: no hostapd, dnsmasq, sudo or radio needed.
+
+    python3 benchmarks/run.py                    # run everything, compare with baselines.json
+    python3 benchmarks/run.py -k poll            # only benchmarks whose name contains "poll"
+    python3 benchmarks/run.py --quick            # fewer ticks, for a fast sanity check
+    python3 benchmarks/run.py --update-baselines # record the current figures as the baseline
+
+Exits with status 1 if any benchmark's median latency, CPU time or allocation exceeds
+its baseline by more than --tolerance. Baselines are machine-specific; record them on the
+machine that runs the comparison.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINES = os.path.join(BENCH_DIR, "baselines.json")
+
+
+def prepare_environment(root: str):
+    # decky and the plugin read their directories from the environment at import time.
+    for name in ("settings", "data", "logs", "plugin/assets"):
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+    os.environ.update({
+        "DECKY_HOME": root,
+        "DECKY_PLUGIN_SETTINGS_DIR": os.path.join(root, "settings"),
+        "DECKY_PLUGIN_RUNTIME_DIR": os.path.join(root, "data"),
+        "DECKY_PLUGIN_LOG_DIR": os.path.join(root, "logs"),
+        "DECKY_PLUGIN_DIR": os.path.join(root, "plugin"),
+    })
+    sys.path[:0] = [os.path.join(BENCH_DIR, "stubs"), os.path.join(REPO_DIR, "py_modules"), REPO_DIR, BENCH_DIR]
+
+
+def format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<18} {result['latency_ms']['p50']:>10.3f} {result['latency_ms']['p95']:>10.3f}"
+        f" {result['cpu_ms']['p50']:>9.3f} {result['alloc_kib']['p50']:>10.1f}"
+    )
+
+
+async def run(selected: dict, root: str) -> dict:
+    from scenarios import Sandbox
+
+    results = {}
+    print(f"{'benchmark':<18} {'p50 ms':>10} {'p95 ms':>10} {'cpu ms':>9} {'alloc KiB':>10}")
+    for name, benchmark in selected.items():
+        # A fresh sandbox per benchmark so one can't warm caches for the next.
+        sandbox_root = tempfile.mkdtemp(prefix=f"{name}-", dir=root)
+        async with Sandbox(sandbox_root) as sandbox:
+            results[name] = await benchmark(sandbox)
+        print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the Muon backend benchmarks.")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="fewer ticks per benchmark")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed fractional regression over the baseline")
+    parser.add_argument("--update-baselines", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--json", dest="json_path", help="also write the full results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="muon-bench-") as root:
+        prepare_environment(root)
+        from harness import compare, load_baselines, save_baselines
+        from scenarios import benchmarks
+
+        selected = {name: bench for name, bench in benchmarks(args.quick).items() if args.pattern in name}
+        if not selected:
+            print(f"No benchmarks match '{args.pattern}'.")
+            return 1
+        results = asyncio.run(run(selected, root))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baselines:
+        save_baselines(BASELINES, results)
+        print(f"Baselines written to {BASELINES}.")
+        return 0
+
+    regressions = compare(results, load_baselines(BASELINES), args.tolerance)
+    for name, metric, baseline, current in regressions:
+        print(f"REGRESSION {name} {metric}: {current} (baseline {baseline}, tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Benchmark scenarios. Each runs the real Plugin against the fakes in a Sandbox and returns
+the harness measurements.
+"""
+import asyncio
+import os
+
+import decky
+from settings import SettingsManager
+
+from main import Plugin
+from ban_list import BanList
+from hostapd_ctrl import HostapdControl
+from lease_index import DhcpLeaseIndex
+
+from fakes import FakeCommands, FakeHostapd, LeaseWriter
+from harness import measure
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# `firewall-cmd --info-zone` for a zone provisioned by an earlier start.
+MUON_ZONE_INFO = """muon-hotspot (active)
+  target: ACCEPT
+  icmp-block-inversion: no
+  interfaces: muon0
+  sources: 
+  services: dhcp
+  ports: 
+  protocols: 
+  forward: yes
+  masquerade: yes
+  forward-ports: 
+  source-ports: 
+  icmp-blocks: 
+  rich rules: 
+"""
+
+
+def command_rules(phy_info: str) -> list:
+    # (pattern, latency in seconds, stdout, returncode). Latencies are rough figures from a
+    # Steam Deck; the scripts dominate a start/stop, single commands take a few milliseconds.
+    return [
+        (r"start_hotspot\.sh", 0.250, "Hotspot started successfully", 0),
+        (r"stop_hotspot\.sh", 0.300, "Network configuration restored successfully", 0),
+        (r"start_dhcp_server\.sh", 0.080, "dnsmasq is running", 0),
+        (r"^firewall-cmd --info-zone", 0.250, MUON_ZONE_INFO, 0),
+        (r"extract_network_config\.sh", 0.060, "IP_ADDRESS=192.168.1.50\nGATEWAY=192.168.1.1\nDNS_SERVERS=192.168.1.1", 0),
+        (r"^ip link show", 0.004, "3: wlan0: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 qdisc noqueue state UP mode DORMANT", 0),
+        (r"^ip -4 -o addr show", 0.004, "3: wlan0    inet 192.168.1.50/24 brd 192.168.1.255 scope global dynamic wlan0", 0),
+        (r"^iw dev \S+ info", 0.003, "Interface wlan0\n\tifindex 3\n\twdev 0x1\n\ttype managed\n\twiphy 0", 0),
+        (r"^iw phy \S+ info", 0.010, phy_info, 0),
+        (r"^systemctl is-active", 0.008, "active\nactive", 0),
+        (r"^systemctl (start|stop)", 0.150, "", 0),
+        (r"^systemd-sysext status", 0.020, "[]", 0),
+        (r"^systemd-sysext refresh", 0.600, "", 0),
+        (r"^pgrep", 0.003, "1234", 0),
+    ]
+
+
+class Sandbox:
+    """
+    A Plugin wired to a fake hostapd, a synthetic lease file and canned commands, with
+    every path under `root`. Nothing outside `root` is written.
+    """
+
+    def __init__(self, root: str, command_scale: float = 1.0):
+        self.root = root
+        self.ctrl_dir = os.path.join(root, "hostapd")
+        os.makedirs(self.ctrl_dir, exist_ok=True)
+        self.hostapd = FakeHostapd(self.ctrl_dir)
+        self.leases = LeaseWriter(os.path.join(root, "dnsmasq.leases"))
+        with open(os.path.join(FIXTURES, "iw_phy_info.txt"), "r") as f:
+            self.commands = FakeCommands(command_rules(f.read()), scale=command_scale)
+        self.plugin = None
+
+    async def __aenter__(self):
+        self.hostapd.start()
+        self.leases.write([])
+
+        plugin = Plugin()
+        plugin.settings = SettingsManager(name="hotspot_settings", settings_directory=plugin.settingsDir)
+        plugin.settings.read()
+        # load_settings applies the stored log level; keep the benchmark's.
+        plugin.settings.setSetting("log_level", os.environ.get("BENCH_LOG_LEVEL", "ERROR"))
+        await plugin.load_settings()
+        plugin.hostapd = HostapdControl(plugin.ap_interface, ctrl_dir=self.ctrl_dir)
+        plugin.dhcp_leases = DhcpLeaseIndex(self.leases.path)
+        plugin.dhcp_leases.start()
+        plugin.ban_list = BanList(os.path.join(self.root, "hostapd.deny"), excluded=plugin.EXCLUDED_MACS)
+        # Every call goes to hostapd rather than being served from the snapshot cache.
+        plugin.device_poll_interval = 0
+        plugin.station_sample_interval = 3600
+        self.commands.install(plugin)
+        self.prepare_assets(plugin)
+
+        # The sysext image is installed under /var/lib/extensions and the hostapd config under
+        # /tmp; keep their commands (and latency) but write nothing outside the sandbox.
+        async def activate_muon_sysext():
+            await plugin.run_privileged("systemd-sysext", "refresh")
+
+        async def deactivate_muon_sysext(force: bool = False):
+            await plugin.run_privileged("systemd-sysext", "refresh")
+
+        async def write_hostapd_config(config_content: str):
+            with open(os.path.join(self.root, "hostapd.conf"), "w") as f:
+                f.write(config_content)
+
+        plugin.activate_muon_sysext = activate_muon_sysext
+        plugin.deactivate_muon_sysext = deactivate_muon_sysext
+        plugin.write_hostapd_config = write_hostapd_config
+        self.plugin = plugin
+        return self
+
+    def prepare_assets(self, plugin):
+        # A sysext tree that satisfies the dependency check for this host's OS release.
+        os_release = plugin.read_os_release()
+        sysext = os.path.join(plugin.assetsDir, "muon")
+        for path in ("usr/bin", "usr/lib/extension-release.d"):
+            os.makedirs(os.path.join(sysext, path), exist_ok=True)
+        for binary in ("hostapd", "dnsmasq"):
+            open(os.path.join(sysext, "usr/bin", binary), "w").close()
+        with open(os.path.join(sysext, "usr/lib/extension-release.d/extension-release.muon"), "w") as f:
+            f.write(f"ID={os_release.get('ID', '')}\nVERSION_ID={os_release.get('VERSION_ID', '')}\n")
+        with open(os.path.join(plugin.assetsDir, "muon.raw"), "wb") as f:
+            f.write(b"\0" * 4096)
+
+    async def __aexit__(self, *exc):
+        plugin = self.plugin
+        plugin.cancel_wifi_reconnect_wait()
+        plugin.stop_ping_responder()
+        plugin.hostapd.close()
+        plugin.dhcp_leases.stop()
+        self.hostapd.stop()
+
+    def populate(self, count: int):
+        self.leases.write(self.hostapd.populate(count)["stations"])
+
+    async def churn(self, count: int) -> dict:
+        result = await asyncio.to_thread(self.hostapd.churn, count)
+        self.leases.write(result["stations"])
+        return result
+
+
+async def poll_devices(sandbox: Sandbox, stations: int, ticks: int, full: bool = False) -> dict:
+    # One frontend poll per tick; a tenth of the stations churn every fifth tick, between ticks.
+    plugin = sandbox.plugin
+    sandbox.populate(stations)
+    version = -1
+    tick_number = 0
+
+    async def before_tick():
+        nonlocal tick_number
+        tick_number += 1
+        if tick_number % 5 == 0:
+            await sandbox.churn(max(1, stations // 10))
+
+    async def tick():
+        nonlocal version
+        if full:
+            await plugin.get_connected_devices()
+        else:
+            delta = await plugin.get_connected_devices_since(version)
+            version = delta.get("version", version)
+
+    return await measure(tick, ticks, before_tick)
+
+
+async def device_events(sandbox: Sandbox, stations: int, ticks: int) -> dict:
+    # Time from hostapd sending AP-STA-* events for a tenth of the stations until the plugin
+    # has emitted a device event for every one of them, with monitor_connected_devices attached.
+    plugin = sandbox.plugin
+    sandbox.populate(stations)
+    count = max(1, stations // 10)
+    pending = {"events": 0}
+    done = asyncio.Event()
+
+    def on_emit(event, payload=None, *args):
+        if event == "muon_device_event":
+            pending["events"] -= 1
+            if pending["events"] <= 0:
+                done.set()
+
+    monitor = asyncio.create_task(plugin.monitor_connected_devices())
+    # Wait for the attach and the initial reconciliation.
+    for _ in range(200):
+        if len(plugin.device_snapshot) == stations:
+            break
+        await asyncio.sleep(0.01)
+
+    decky.subscribers.append(on_emit)
+    try:
+        async def tick():
+            done.clear()
+            pending["events"] = 2 * count
+            await sandbox.churn(count)
+            await asyncio.wait_for(done.wait(), 5)
+
+        return await measure(tick, ticks)
+    finally:
+        decky.subscribers.remove(on_emit)
+        monitor.cancel()
+        try:
+            await monitor
+        except asyncio.CancelledError:
+            pass
+
+
+async def lifecycle(sandbox: Sandbox, operation: str, ticks: int) -> dict:
+    # start_hotspot or stop_hotspot end to end, with the other run between ticks.
+    plugin = sandbox.plugin
+
+    async def start():
+        if not await plugin.start_hotspot():
+            raise RuntimeError(f"start_hotspot failed: {plugin.start_report}")
+
+    async def stop():
+        await plugin.stop_hotspot()
+        plugin.cancel_wifi_reconnect_wait()
+
+    if operation == "start":
+        async def before_tick():
+            if plugin.hotspot_active:
+                await stop()
+        return await measure(start, ticks, before_tick, warmup=1)
+
+    async def before_tick():
+        if not plugin.hotspot_active:
+            await start()
+    return await measure(stop, ticks, before_tick, warmup=1)
+
+
+def benchmarks(quick: bool = False) -> dict:
+    # name -> async callable(sandbox) returning the measurements.
+    ticks = 10 if quick else 40
+    lifecycle_ticks = 2 if quick else 5
+    suite = {}
+    for stations in (1, 16, 64, 256):
+        suite[f"poll_since_{stations}"] = lambda s, n=stations: poll_devices(s, n, ticks)
+        suite[f"events_churn_{stations}"] = lambda s, n=stations: device_events(s, n, ticks)
+    suite["poll_full_64"] = lambda s: poll_devices(s, 64, ticks, full=True)
+    suite["start_hotspot"] = lambda s: lifecycle(s, "start", lifecycle_ticks)
+    suite["stop_hotspot"] = lambda s: lifecycle(s, "stop", lifecycle_ticks)
+    return suite
@@ -0,0 +1,59 @@
+"""
+Stand-in for the `decky` module the loader injects, with the same names as decky.pyi.
+Paths come from the same environment variables; the benchmark runner points them at a
+temporary directory. Emitted events are recorded and passed to `subscribers`.
+"""
+
+__version__ = '1.0.0'
+
+import logging
+import os
+
+from typing import Any
+
+HOME: str = os.environ.get("HOME", "/tmp")
+USER: str = os.environ.get("USER", "deck")
+DECKY_VERSION: str = os.environ.get("DECKY_VERSION", "v0.0.0-bench")
+DECKY_USER: str = os.environ.get("DECKY_USER", USER)
+DECKY_USER_HOME: str = os.environ.get("DECKY_USER_HOME", HOME)
+DECKY_HOME: str = os.environ.get("DECKY_HOME", "/tmp/decky-bench")
+DECKY_PLUGIN_SETTINGS_DIR: str = os.environ.get("DECKY_PLUGIN_SETTINGS_DIR", os.path.join(DECKY_HOME, "settings"))
+DECKY_PLUGIN_RUNTIME_DIR: str = os.environ.get("DECKY_PLUGIN_RUNTIME_DIR", os.path.join(DECKY_HOME, "data"))
+DECKY_PLUGIN_LOG_DIR: str = os.environ.get("DECKY_PLUGIN_LOG_DIR", os.path.join(DECKY_HOME, "logs"))
+DECKY_PLUGIN_DIR: str = os.environ.get("DECKY_PLUGIN_DIR", os.path.join(DECKY_HOME, "plugin"))
+DECKY_PLUGIN_NAME: str = os.environ.get("DECKY_PLUGIN_NAME", "muon")
+DECKY_PLUGIN_VERSION: str = os.environ.get("DECKY_PLUGIN_VERSION", "0.0.0")
+DECKY_PLUGIN_AUTHOR: str = os.environ.get("DECKY_PLUGIN_AUTHOR", "")
+DECKY_PLUGIN_LOG: str = os.path.join(DECKY_PLUGIN_LOG_DIR, "plugin.log")
+
+
+def migrate_any(target_dir: str, *files_or_directories: str) -> dict[str, str]:
+    return {}
+
+
+def migrate_settings(*files_or_directories: str) -> dict[str, str]:
+    return {}
+
+
+def migrate_runtime(*files_or_directories: str) -> dict[str, str]:
+    return {}
+
+
+def migrate_logs(*files_or_directories: str) -> dict[str, str]:
+    return {}
+
+
+logger: logging.Logger = logging.getLogger("decky-bench")
+logger.setLevel(os.environ.get("BENCH_LOG_LEVEL", "ERROR"))
+if not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+
+# (event, args) of every emit call, and callbacks invoked with the same.
+emitted: list = []
+subscribers: list = []
+
+
+async def emit(event: str, *args: Any) -> None:
+    emitted.append((event, args))
+    for callback in subscribers:
+        callback(event, *args)
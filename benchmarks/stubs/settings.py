@@ -0,0 +1,28 @@
+"""Stand-in for the loader's `settings` module: a JSON file per SettingsManager."""
+import json
+import os
+
+
+class SettingsManager:
+    def __init__(self, name, settings_directory=None):
+        self.path = os.path.join(settings_directory or os.environ.get("DECKY_PLUGIN_SETTINGS_DIR", "/tmp"), f"{name}.json")
+        self.settings = {}
+
+    def read(self):
+        try:
+            with open(self.path, "r") as f:
+                self.settings = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.settings = {}
+
+    def commit(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.settings, f, indent=4)
+
+    def getSetting(self, key, default=None):
+        return self.settings.get(key, default)
+
+    def setSetting(self, key, value):
+        self.settings[key] = value
+        return value
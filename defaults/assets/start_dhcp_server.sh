@@ -4,6 +4,8 @@ DNSMASQ_LOG="/var/log/dnsmasq.log"
 INTERFACE=$1
 DHCP_RANGE=$2
 IP_ADDRESS=$3
+# Optional: a config rendered ahead of time by the plugin, used instead of generating one.
+PRERENDERED_CONFIG=$4
 
 # Remove old dnsmasq configuration.
 if [ -f "$DNSMASQ_CONFIG" ]; then
@@ -11,6 +13,10 @@ if [ -f "$DNSMASQ_CONFIG" ]; then
     sudo rm "$DNSMASQ_CONFIG"
 fi
 
+if [ -n "$PRERENDERED_CONFIG" ] && [ -f "$PRERENDERED_CONFIG" ]; then
+    echo "Using pre-rendered dnsmasq config $PRERENDERED_CONFIG..."
+    sudo cp "$PRERENDERED_CONFIG" "$DNSMASQ_CONFIG"
+else
 # Generate new dnsmasq config.
 echo "Generating new dnsmasq config..."
 cat <<EOT > "$DNSMASQ_CONFIG"
@@ -26,6 +32,7 @@ dhcp-broadcast
 dhcp-leasefile=/tmp/muon-dnsmasq.leases
 EOT
 echo "dnsmasq config generated successfully."
+fi
 
 # Stop any running copies of dnsmasq to avoid conflicts.
 echo "Stopping any existing dnsmasq instances..."
@@ -3,6 +3,8 @@
 WIFI_INTERFACE=$1
 STATIC_IP=$2
 COUNTRY_CODE=$3
+# "prepared" when the plugin has already stopped network services and configured $AP_IF over netlink.
+PREPARED=$4
 
 HOSTAPD_CONF="/tmp/hostapd.conf"
 CTRL_INTERFACE_DIR="/var/run/hostapd"
@@ -13,56 +15,60 @@ echo "WiFi Interface: $WIFI_INTERFACE"
 echo "Static IP: $STATIC_IP"
 echo "Country Code: $COUNTRY_CODE"
 
-PHY=$(iw dev "$WIFI_INTERFACE" info 2>/dev/null | awk '/wiphy/ {print "phy"$2}')
-if [ -z "$PHY" ]; then
-    echo "Error: Unable to determine the PHY for interface $WIFI_INTERFACE."
-    exit 1
-fi
-echo "Using PHY $PHY to create $AP_IF"
-
-# Step 1: Stop network services
-echo "Stopping network services..."
-sudo systemctl stop NetworkManager
-sudo systemctl stop iwd
-if [ $? -ne 0 ]; then
-    echo "Failed to stop network services."
-    exit 1
-fi
-echo "Network services stopped."
-
-# Step 2: Create AP interface (muon0) and configure static IP there
-echo "Setting static IP for $AP_IF on $PHY"
-
-if ip link show "$AP_IF" >/dev/null 2>&1; then
-  echo "$AP_IF already exists; deleting it first..."
-  sudo iw dev "$AP_IF" del || true
-  sleep 0.5
-fi
-
-echo "Bringing down $WIFI_INTERFACE to prepare for $AP_IF..."
-sudo ip link set "$WIFI_INTERFACE" down
-
-if ! sudo iw phy "$PHY" interface add "$AP_IF" type __ap; then
-  echo "Failed to create $AP_IF on $PHY."
-  exit 1
-fi
-
-sudo ip link set "$AP_IF" up
-
-# Disable IPv6 on muon0
-echo 1 | sudo tee /proc/sys/net/ipv6/conf/"$AP_IF"/disable_ipv6 > /dev/null
-
-echo "Assigning IP $STATIC_IP/24 to $AP_IF..."
-sudo ip addr flush dev "$AP_IF" || true
-sudo ip addr add "$STATIC_IP/24" dev "$AP_IF"
-sleep 1
-
-FINAL_IP_CHECK=$(ip addr show "$AP_IF" | grep -oP 'inet \K[\d.]+')
-if [ "$FINAL_IP_CHECK" != "$STATIC_IP" ]; then
-  echo "Failed to assign IP $STATIC_IP to $AP_IF."
-  exit 1
+if [ "$PREPARED" = "prepared" ]; then
+    echo "$AP_IF already configured by the plugin; skipping interface setup."
 else
-  echo "Successfully assigned IP $STATIC_IP to $AP_IF."
+    PHY=$(iw dev "$WIFI_INTERFACE" info 2>/dev/null | awk '/wiphy/ {print "phy"$2}')
+    if [ -z "$PHY" ]; then
+        echo "Error: Unable to determine the PHY for interface $WIFI_INTERFACE."
+        exit 1
+    fi
+    echo "Using PHY $PHY to create $AP_IF"
+
+    # Step 1: Stop network services
+    echo "Stopping network services..."
+    sudo systemctl stop NetworkManager
+    sudo systemctl stop iwd
+    if [ $? -ne 0 ]; then
+        echo "Failed to stop network services."
+        exit 1
+    fi
+    echo "Network services stopped."
+
+    # Step 2: Create AP interface (muon0) and configure static IP there
+    echo "Setting static IP for $AP_IF on $PHY"
+
+    if ip link show "$AP_IF" >/dev/null 2>&1; then
+      echo "$AP_IF already exists; deleting it first..."
+      sudo iw dev "$AP_IF" del || true
+      sleep 0.5
+    fi
+
+    echo "Bringing down $WIFI_INTERFACE to prepare for $AP_IF..."
+    sudo ip link set "$WIFI_INTERFACE" down
+
+    if ! sudo iw phy "$PHY" interface add "$AP_IF" type __ap; then
+      echo "Failed to create $AP_IF on $PHY."
+      exit 1
+    fi
+
+    sudo ip link set "$AP_IF" up
+
+    # Disable IPv6 on muon0
+    echo 1 | sudo tee /proc/sys/net/ipv6/conf/"$AP_IF"/disable_ipv6 > /dev/null
+
+    echo "Assigning IP $STATIC_IP/24 to $AP_IF..."
+    sudo ip addr flush dev "$AP_IF" || true
+    sudo ip addr add "$STATIC_IP/24" dev "$AP_IF"
+    sleep 1
+
+    FINAL_IP_CHECK=$(ip addr show "$AP_IF" | grep -oP 'inet \K[\d.]+')
+    if [ "$FINAL_IP_CHECK" != "$STATIC_IP" ]; then
+      echo "Failed to assign IP $STATIC_IP to $AP_IF."
+      exit 1
+    else
+      echo "Successfully assigned IP $STATIC_IP to $AP_IF."
+    fi
 fi
 
 # Step 3: Prepare control interface directory
@@ -1,29 +1,48 @@
 #!/bin/bash
 
 WIFI_INTERFACE=$1
+# Comma-separated services that were running before the hotspot started; only these are started again.
+# Defaults to both when not given.
+SERVICES=${2-NetworkManager,iwd}
 AP_IF="muon0"
 
+# Run a step and report how long it took as "TIMING <step> <microseconds>" for the plugin's timing report.
+timed() {
+    local step=$1
+    shift
+    local start
+    start=$(date +%s%N)
+    "$@"
+    local status=$?
+    echo "TIMING $step $(( ($(date +%s%N) - start) / 1000 ))"
+    return $status
+}
+
 echo "Restoring network configuration for $WIFI_INTERFACE..."
 
 # Stop the hostapd and dnsmasq services
 echo "Stopping hostapd and dnsmasq..."
-sudo pkill -x hostapd
-sudo pkill -x dnsmasq
+timed stop_hostapd sudo pkill -x hostapd
+timed stop_dnsmasq sudo pkill -x dnsmasq
 sudo rm -f /var/run/hostapd/*
 
 # Remove the virtual AP interface if it exists
 if ip link show "$AP_IF" >/dev/null 2>&1; then
     echo "Removing AP interface $AP_IF..."
     sudo ip link set "$AP_IF" down
-    sudo iw dev "$AP_IF" del
+    timed remove_ap_interface sudo iw dev "$AP_IF" del
 fi
 
-# Restart network services
-echo "Restarting NetworkManager and iwd..."
-sudo systemctl restart NetworkManager
-sudo systemctl restart iwd
+# Start the network services that were running before, in a single transaction.
+# systemctl start blocks until the start jobs have completed; units already running are left alone.
+if [ -n "$SERVICES" ]; then
+    echo "Starting ${SERVICES//,/ }..."
+    timed start_services sudo systemctl start ${SERVICES//,/ }
+else
+    echo "No network services were running before the hotspot; leaving them stopped."
+fi
 
 # Step 5: Bring the main Wi-Fi interface back up
-sudo ip link set "$WIFI_INTERFACE" up
+timed wifi_interface_up sudo ip link set "$WIFI_INTERFACE" up
 
 echo "Network configuration restored successfully."
@@ -1,19 +1,47 @@
+import hashlib
 import json
+import logging
 import os
-import re
 import decky
+import re
+import shlex
+import shutil
+import signal
 import subprocess
-import aiohttp
+import time
 import asyncio
 import ssl
 import certifi
+from contextlib import asynccontextmanager
 from pathlib import Path
 from settings import SettingsManager
+from atomic_file import JsonCache
+from ban_list import BanList, normalize_mac
+from priv_helper import HelperError, PrivilegedHelper
+from compat_catalogue import CompatCatalogue
+from compat_fetcher import CompatFetcher, CompatFetchError
+from hostapd_ctrl import HostapdControl, HostapdControlError, HostapdEventListener, channel_frequency
+from lease_index import DhcpLeaseIndex
+from device_snapshot import DeviceSnapshot
+from station_stats import StationStatsCollector
+from channel_select import parse_scan, parse_survey_dump, select_channel
+from phy_caps import chan_switch_flags, parse_phy_info, radio_params, span_channels
+from radio_profiles import DEFAULT_PROFILE, RADIO_PROFILES, profile_lines
+from firewall_zone import INVALID_ZONE, FIREWALLD_NOT_RUNNING, ZONE_NAME, ZONE_TARGET, missing_settings, parse_zone_info, plan_zone_commands
+from hotspot_profiles import DNSMASQ_LOG, ArtifactCache, ProfileError, ProfileStore, render_dnsmasq_config, validate_profile
+from log_filters import LOG_LEVELS, every, install as install_log_filters
+from udp_ping import DEFAULT_PORT as PING_PORT, start_responder
+from stage_graph import Stage, StageGraph
+from timing import Tracer, traced
+from netlink import NetlinkBackend
 
 class Plugin:
     # Define default WiFi interface, plugin directory, settings file, IP/DHCP range, and initialise statuses.
     def __init__(self):
-        self.debug = True
+        # Redact the passphrase from everything logged, and rate-limit messages from poll loops.
+        install_log_filters(decky.logger, lambda: (getattr(self, "passphrase", None),))
+        # Plugin log level, adjustable at runtime through set_log_level.
+        self.log_level = "INFO"
         self.wifi_interface = "wlan0"
         self.ap_interface = "muon0"
         self.settingsDir = os.environ.get("DECKY_PLUGIN_SETTINGS_DIR", "/tmp")
@@ -21,6 +49,49 @@ class Plugin:
         self.ip_address = "192.168.8.1"
         self.dhcp_range = "192.168.8.100,192.168.8.200,12h"
         self.hotspot_active = False
+        # Leave the Muon sysext merged between hotspot toggles instead of refreshing /usr each time.
+        self.keep_sysext_merged = False
+        # SHA-256 of image files, keyed by path and invalidated by inode/size/mtime changes.
+        self.image_hash_cache = {}
+        # Dependency statuses of the sysext image, keyed by image hash and OS version. Loaded lazily.
+        self.dependency_cache = JsonCache(os.path.join(self.settingsDir, "dependency_cache.json"))
+        # Parsed `iw phy info` of the WiFi PHY, keyed by PHY, driver, kernel and country. Loaded lazily.
+        self.phy_caps = None
+        self.phy_caps_cache = JsonCache(os.path.join(self.settingsDir, "phy_caps.json"))
+        # Cache key of self.phy_caps; part of the inputs of every pre-rendered hostapd config.
+        self.phy_caps_key = None
+        # Named bundles of credentials, radio, country and DHCP settings, and the hostapd/dnsmasq
+        # configs rendered from them, stored by content hash.
+        self.profiles = ProfileStore(os.path.join(self.settingsDir, "profiles.json"))
+        self.artifacts = ArtifactCache(os.path.join(self.settingsDir, "artifacts"))
+        # Radio profile ("default" or "latency", see radio_profiles) and whether the latency profile
+        # DSCP-marks small UDP packets to clients so they go out on the WMM voice/video queues.
+        self.radio_profile = DEFAULT_PROFILE
+        self.dscp_priority = False
+        self.dscp_rule_active = False
+        # UDP ping responder on the AP address; clients running udp_ping.py get per-client RTT and jitter.
+        self.ping_transport = None
+        self.ping_responder = None
+        # Monotonic-clock spans for lifecycle operations and external commands.
+        self.tracer = Tracer(max_runs=20, max_commands=200)
+        # hostapd config and PHY of the running AP, kept so it can be restarted without re-rendering.
+        self.hostapd_config = None
+        self.ap_phy = None
+        # Channel the hotspot actually uses; differs from self.channel when that is "auto".
+        self.active_channel = None
+        # Outcome of the last automatic channel selection, reported to the UI.
+        self.channel_selection = None
+        # Settings the running hotspot was brought up with, diffed by apply_live.
+        self.applied_settings = None
+        # Warm snapshot taken by suspend_ap for resume_ap's fast path.
+        self.resume_snapshot = None
+        # Whether NetworkManager/iwd were running before bring-up; tear-down restores exactly these.
+        self.service_states = {}
+        # Background wait measuring how long WiFi takes to reconnect after tear-down.
+        self.wifi_reconnect_task = None
+        self.wifi_reconnect_timeout = 30
+        # Per-stage outcomes of the most recent start_hotspot run.
+        self.start_report = []
         self.ssid = None
         self.passphrase = None
         self.channel = "36"
@@ -28,37 +99,107 @@ class Plugin:
         self.country_code = "US"
         self.compatibility_url = "https://raw.githubusercontent.com/wtlnetwork/muon-docs/refs/heads/main/static/gameinfo/supported_games.json"
         self.compatibility_save_path = f"{self.assetsDir}/compatibility.json"
+        # Conditional, TTL-bounded fetcher for the compatibility list. The TTL is overridable
+        # through the "compat_ttl" setting (seconds).
+        self.compat_fetcher = CompatFetcher(
+            self.compatibility_url,
+            self.compatibility_save_path,
+            ttl=6 * 3600,
+            ssl_context=ssl.create_default_context(cafile=certifi.where())
+        )
+        # Parsed, indexed compatibility list, reloaded only when the file changes.
+        self.compat_catalogue = CompatCatalogue(self.compatibility_save_path)
         self.current_directory = os.path.dirname(__file__)
-        # Regex which matches valid MAC addresses.
-        self.VALID_MAC_REGEX = re.compile(r"^(?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$")
         # Default MAC addresses included in the hostapd.deny file. We don't need to worry about these.
         self.EXCLUDED_MACS = {"00:20:30:40:50:60", "00:ab:cd:ef:12:34", "00:00:30:40:50:60"}
-        if self.debug:
-            decky.logger.debug(f"Muon initialised. Settings directory: {self.settingsDir}, Assets directory: {self.assetsDir}")
+        # Banned MACs, kept in memory and persisted to hostapd's deny_mac_file.
+        self.ban_list = BanList("/etc/hostapd/hostapd.deny", excluded=self.EXCLUDED_MACS)
+        # Environment for external commands, built once rather than per call.
+        self.command_env = dict(os.environ, LD_LIBRARY_PATH="/usr/lib:/usr/lib64:" + os.environ.get("LD_LIBRARY_PATH", ""))
+        # Timeouts (seconds) for external commands by category. Scripts bring interfaces and
+        # services up and down; install covers building the sysext image.
+        self.command_timeouts = {"default": 30, "query": 10, "script": 120, "install": 900}
+        # At most this many external commands run at once; the rest queue.
+        self.command_semaphore = asyncio.BoundedSemaphore(4)
+        self.command_stats = {
+            "started": 0, "completed": 0, "timeouts": 0, "cancelled": 0,
+            "in_flight": 0, "queued": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0,
+        }
+        # Long-lived helper running whitelisted commands without a shell. None runs them as subprocesses.
+        self.helper = PrivilegedHelper(env=self.command_env)
+        # Persistent connection to hostapd's control socket, used instead of spawning hostapd_cli.
+        self.hostapd = HostapdControl(self.ap_interface, ctrl_dir="/var/run/hostapd")
+        # In-process rtnetlink/nl80211 backend for AP interface setup. None falls back to start_hotspot.sh.
+        self.netlink = None
+        # In-memory view of dnsmasq's lease file, reparsed only when the file changes.
+        self.dhcp_leases = DhcpLeaseIndex("/tmp/muon-dnsmasq.leases")
+        # Single versioned view of connected devices shared by the monitor and the frontend.
+        self.device_snapshot = DeviceSnapshot()
+        self.device_snapshot_lock = asyncio.Lock()
+        self.device_snapshot_time = None
+        # Seconds between checks for hostapd when no event stream is attached. Also the
+        # maximum age of the device snapshot served to the frontend.
+        self.device_poll_interval = 2
+        # Per-station throughput and link-quality history: 600 samples per station at most.
+        self.station_stats = StationStatsCollector(capacity=600, max_stations=64)
+        # Seconds between station counter samples while hostapd events are being received.
+        self.station_sample_interval = 5
+        # Seconds between safety-net reconciliations while hostapd events are being received.
+        self.device_reconcile_interval = 30
+        # dnsmasq's log is moved aside once it exceeds this size, keeping one old copy.
+        self.dnsmasq_log_max_bytes = 1024 * 1024
+        self.dnsmasq_log_check_interval = 600
+        decky.logger.debug("Muon initialised. Settings directory: %s, Assets directory: %s", self.settingsDir, self.assetsDir)
 
     async def _main(self):
         decky.logger.info("Hotspot Plugin Loaded")
         self.settings = SettingsManager(name="hotspot_settings", settings_directory=self.settingsDir)
         self.settings.read()
         await self.load_settings()
+        try:
+            self.netlink = NetlinkBackend()
+        except OSError as e:
+            decky.logger.warning(f"Netlink unavailable, AP interface setup will use the shell script: {e}")
+        try:
+            await self.helper.start()
+        except (HelperError, OSError) as e:
+            decky.logger.warning(f"Privileged helper unavailable, commands will run as subprocesses: {e}")
+            self.helper = None
+        if not self.dhcp_leases.start():
+            decky.logger.warning("inotify unavailable - DHCP lease index will check the lease file on each lookup.")
         asyncio.create_task(self.fetch_latest_compat())
         asyncio.create_task(self.monitor_connected_devices())
+        asyncio.create_task(self.rotate_dnsmasq_log_periodically())
 
     async def _unload(self):
         decky.logger.info("Stopping Hotspot Plugin")
-        if self.hotspot_active:
+        # A hotspot parked by suspend_ap still holds the AP interface and the stopped WiFi services.
+        if self.hotspot_active or self.resume_snapshot is not None:
+            self.resume_snapshot = None
             await self.stop_hotspot()
+        if self.keep_sysext_merged:
+            await self.deactivate_muon_sysext(force=True)
+        self.cancel_wifi_reconnect_wait()
+        await self.compat_fetcher.close()
+        if self.helper is not None:
+            await self.helper.close()
+        self.dhcp_leases.stop()
+        if self.netlink is not None:
+            self.netlink.close()
         decky.logger.info("Plugin Unloaded")
 
     async def _uninstall(self):
         decky.logger.info("Stopping Hotspot Plugin")
-        if self.hotspot_active:
+        # A hotspot parked by suspend_ap still holds the AP interface and the stopped WiFi services.
+        if self.hotspot_active or self.resume_snapshot is not None:
+            self.resume_snapshot = None
             await self.stop_hotspot()
 
         decky.logger.info("Cleaning up dependencies.")
         script_path = os.path.join(self.assetsDir, "remove_dependencies.sh")
         await self.run_command(
-            f"bash {script_path}"
+            f"bash {script_path}",
+            category="install"
         )
 
     # GROUNDWORK FOR SUPPORTING BAZZITE
@@ -74,73 +215,189 @@ class Plugin:
             # Assume SteamOS unless otherwise indicated.
             return "steamos"
 
+    def read_os_release(self, path: str = "/etc/os-release") -> dict:
+        # Parses an os-release style KEY=value file into a dictionary.
+        values = {}
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    if "=" in line and not line.startswith("#"):
+                        key, value = line.strip().split("=", 1)
+                        values[key] = value.strip('"\'')
+        except FileNotFoundError:
+            pass
+        return values
+
     # SYSEXT METHODS
+    def image_hash(self, path: str) -> str:
+        # SHA-256 of a file, cached until its inode, size or mtime changes.
+        st = os.stat(path)
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        cached = self.image_hash_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        self.image_hash_cache[path] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+
+    async def sysext_image_matches(self, source: str, installed: str) -> bool:
+        # Checks whether the installed image is identical to the source without copying it again.
+        try:
+            source_stat = os.stat(source)
+            installed_stat = os.stat(installed)
+        except FileNotFoundError:
+            return False
+
+        if source_stat.st_size != installed_stat.st_size:
+            return False
+        if source_stat.st_mtime_ns == installed_stat.st_mtime_ns:
+            return True
+        # Same size but different timestamps (e.g. copied by the install script): compare content.
+        source_hash = await asyncio.to_thread(self.image_hash, source)
+        installed_hash = await asyncio.to_thread(self.image_hash, installed)
+        return source_hash == installed_hash
+
+    async def is_muon_sysext_merged(self) -> bool:
+        # Asks systemd-sysext whether the Muon extension is currently merged into /usr.
+        output = (await self.run_privileged("systemd-sysext", "status", "--json=short"))["stdout"]
+        try:
+            hierarchies = json.loads(output)
+            return any("muon" in (h.get("extensions") or []) for h in hierarchies)
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            # Older systemd without JSON output: look for the extension in the table.
+            output = (await self.run_privileged("systemd-sysext", "status"))["stdout"]
+            return any("muon" in line.split() for line in output.splitlines())
+
+    @traced()
     async def activate_muon_sysext(self):
         muon_raw = os.path.join(self.assetsDir, "muon.raw")
         link_path = "/var/lib/extensions/muon.raw"
 
         if not os.path.exists(muon_raw):
             decky.logger.warning("muon.raw not found - attempting to build via install script.")
-            await self.run_command(f"bash {os.path.join(self.assetsDir, 'install_dependencies.sh')}")
-
-        await self.run_command(f"sudo cp -f '{muon_raw}' '{link_path}'")
+            await self.run_command(f"bash {os.path.join(self.assetsDir, 'install_dependencies.sh')}", category="install")
+
+        # Only copy the image and remount /usr when something actually changed.
+        if await self.sysext_image_matches(muon_raw, link_path):
+            decky.logger.info("Installed muon.raw matches source image, skipping copy.")
+            if await self.is_muon_sysext_merged():
+                decky.logger.info("Muon sysext already merged, skipping refresh.")
+                return
+        else:
+            await asyncio.to_thread(self.install_sysext_image, muon_raw, link_path)
 
         try:
-            out = await self.run_command("systemd-sysext refresh")
+            out = (await self.run_privileged("systemd-sysext", "refresh"))["stdout"].strip()
             decky.logger.info(f"sysext refresh output: {out}")
         except Exception as e:
             decky.logger.error(f"sysext refresh after activation failed: {e}")
 
-    async def deactivate_muon_sysext(self):
+    def install_sysext_image(self, source: str, target: str):
+        # Equivalent of cp -f --preserve=timestamps. An existing file or symlink is removed first so
+        # the copy never writes through a link into the source image.
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.lexists(target):
+            os.remove(target)
+        shutil.copy2(source, target)
+
+    @traced()
+    async def deactivate_muon_sysext(self, force: bool = False):
+        if self.keep_sysext_merged and not force:
+            decky.logger.info("Keeping Muon sysext merged while the plugin is loaded.")
+            return
+
         link_path = "/var/lib/extensions/muon.raw"
         if os.path.exists(link_path) or os.path.islink(link_path):
-            await self.run_command(f"sudo rm -f '{link_path}'")
+            await asyncio.to_thread(os.remove, link_path)
+        elif not await self.is_muon_sysext_merged():
+            # Nothing installed and nothing merged, so a refresh would only remount /usr for nothing.
+            return
 
         # Refresh sysext after removing Muon
         try:
-            out = await self.run_command("systemd-sysext refresh")
+            out = (await self.run_privileged("systemd-sysext", "refresh"))["stdout"].strip()
             decky.logger.info(f"sysext refresh output: {out}")
         except Exception as e:
             decky.logger.error(f"sysext refresh after deactivation failed: {e}")
 
-    # COMPATIBILITY LIST METHODS
-    async def fetch_latest_compat(self) -> dict:
+    async def update_sysext_policy(self, keep_merged: bool):
+        # Chooses whether the sysext stays merged between hotspot toggles while the plugin is loaded.
+        self.keep_sysext_merged = bool(keep_merged)
+        self.settings.setSetting("keep_sysext_merged", "true" if self.keep_sysext_merged else "false")
+        self.settings.commit()
 
-        timeout = aiohttp.ClientTimeout(total=5)
-        decky.logger.info(f"Fetching from {self.compatibility_url}, saving to {self.compatibility_save_path}")
+        decky.logger.info(f"Updated sysext policy: KeepMerged={self.keep_sysext_merged}")
 
-        try:
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(self.compatibility_url, ssl=ssl_context) as response:
-                    decky.logger.info(f"HTTP response: {response.status}")
-                    response.raise_for_status()
-                    raw_text = await response.text()
-                    decky.logger.info(f"Received {len(raw_text)} bytes")
+        return {"keep_sysext_merged": self.keep_sysext_merged}
+
+    async def get_radio_profile(self) -> dict:
+        return {"radio_profile": self.radio_profile, "dscp_priority": self.dscp_priority, "profiles": list(RADIO_PROFILES)}
+
+    async def update_radio_profile(self, profile: str, dscp_priority: bool):
+        # Chooses the radio profile; takes effect on the next start or through apply_live.
+        if profile not in RADIO_PROFILES:
+            return {"error": f"Unknown radio profile '{profile}'."}
+        self.radio_profile = profile
+        self.dscp_priority = bool(dscp_priority)
+        self.settings.setSetting("radio_profile", self.radio_profile)
+        self.settings.setSetting("dscp_priority", "true" if self.dscp_priority else "false")
+        self.settings.commit()
 
-                    data = json.loads(raw_text)
-                    decky.logger.info(f"Parsed JSON successfully ({len(data)} entries)")
+        decky.logger.info(f"Updated radio profile: Profile={self.radio_profile}, DSCP={self.dscp_priority}")
+
+        return {"radio_profile": self.radio_profile, "dscp_priority": self.dscp_priority}
+
+    def apply_log_level(self, level: str) -> bool:
+        level = str(level).upper()
+        if level not in LOG_LEVELS:
+            return False
+        self.log_level = level
+        decky.logger.setLevel(level)
+        return True
+
+    async def get_log_level(self) -> dict:
+        return {"log_level": self.log_level, "levels": list(LOG_LEVELS)}
+
+    async def set_log_level(self, level: str):
+        # Changes the plugin log level immediately and for later sessions. DEBUG also turns on
+        # dnsmasq's per-request DHCP logging from the next DHCP server start.
+        if not self.apply_log_level(level):
+            return {"error": f"Unknown log level '{level}'."}
+        self.settings.setSetting("log_level", self.log_level)
+        self.settings.commit()
 
-                with open(self.compatibility_save_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4)
-                decky.logger.info(f"Saved to {self.compatibility_save_path}")
+        decky.logger.warning("Log level set to %s", self.log_level)
 
-                return {
-                    "success": True,
-                    "errortype": None
-                }
+        return {"log_level": self.log_level}
+
+    # COMPATIBILITY LIST METHODS
+    async def fetch_latest_compat(self, force: bool = False) -> dict:
+        # Refreshes the saved compatibility list. Within the TTL this is free; after it (or when
+        # forced from the UI) an unchanged list costs one conditional request.
+        decky.logger.info(f"Checking {self.compatibility_url} for updates to {self.compatibility_save_path}")
+
+        try:
+            result = await self.compat_fetcher.fetch(force=force)
+            if result["status"] == "updated":
+                decky.logger.info(f"Saved {result['size']} bytes to {self.compatibility_save_path}")
+            else:
+                decky.logger.info(f"Compatibility list unchanged ({result['status']}).")
 
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            decky.logger.error(f"Connectivity error: {e}")
             return {
-                "success": False,
-                "errortype": "connectivity"
+                "success": True,
+                "errortype": None,
+                "status": result["status"]
             }
-        except json.JSONDecodeError as e:
-            decky.logger.error(f"JSON decode error: {e}")
+
+        except CompatFetchError as e:
+            decky.logger.error(f"Failed to fetch compatibility list ({e.errortype}): {e}")
             return {
                 "success": False,
-                "errortype": "invalidjson"
+                "errortype": e.errortype
             }
         except Exception as e:
             decky.logger.error(f"Unexpected error: {e}")
@@ -149,31 +406,47 @@ class Plugin:
                 "errortype": "unknown"
             }
 
+    async def refresh_compat_catalogue(self):
+        # Returns None if the catalogue is usable, otherwise the errortype to report.
+        try:
+            if not await asyncio.to_thread(self.compat_catalogue.refresh):
+                decky.logger.warning(f"File not found: {self.compatibility_save_path}")
+                return "filenotfound"
+            return None
+        except ValueError as e:
+            decky.logger.error(f"JSON decode error: {e}")
+            return "invalidjson"
+
     async def get_compat_list(self) -> dict:
-        decky.logger.info(f"Reading saved compatibility list.")
-        try:
-            with open(self.compatibility_save_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                decky.logger.info(f"Loaded {len(data)} entries.")
-                return {
-                    "success": True,
-                    "data": data
-                }
-        except FileNotFoundError:
-            decky.logger.warning(f"File not found: {self.compatibility_save_path}")
+        # Returns the whole list. The UI pages through search_compat instead.
+        errortype = await self.refresh_compat_catalogue()
+        if errortype:
             return {
                 "success": False,
-                "errortype": "filenotfound",
+                "errortype": errortype,
                 "data": []
             }
+        decky.logger.info(f"Loaded {len(self.compat_catalogue)} entries.")
+        return {
+            "success": True,
+            "data": self.compat_catalogue.entries()
+        }
 
-        except json.JSONDecodeError as e:
-            decky.logger.error(f"JSON decode error: {e}")
-            return {
-                "success": False,
-                "errortype": "invalidjson",
-                "data": []
-            }
+    async def search_compat(self, query: str = "", offset: int = 0, limit: int = 50, states: list = None) -> dict:
+        # Returns one page of entry summaries whose title words start with the query's words,
+        # optionally limited to the given states.
+        errortype = await self.refresh_compat_catalogue()
+        if errortype:
+            return {"success": False, "errortype": errortype, "total": 0, "offset": 0, "limit": limit, "items": []}
+        return {"success": True, **self.compat_catalogue.search(query, offset, min(int(limit), 200), states)}
+
+    async def get_compat_entry(self, entry_id: str) -> dict:
+        # Returns a single entry, including its notes and link.
+        errortype = await self.refresh_compat_catalogue()
+        entry = None if errortype else self.compat_catalogue.get(entry_id)
+        if entry is None:
+            return {"success": False, "errortype": errortype or "notfound"}
+        return {"success": True, "entry": entry}
 
 
     # SETTINGS METHODS
@@ -189,6 +462,16 @@ class Plugin:
         self.channel = stored_channel
         self.hw_mode = stored_hw_mode
         self.country_code = stored_country_code
+        self.keep_sysext_merged = self.settings.getSetting("keep_sysext_merged", "false") == "true"
+        self.radio_profile = self.settings.getSetting("radio_profile", DEFAULT_PROFILE)
+        if self.radio_profile not in RADIO_PROFILES:
+            self.radio_profile = DEFAULT_PROFILE
+        self.dscp_priority = self.settings.getSetting("dscp_priority", "false") == "true"
+        self.apply_log_level(self.settings.getSetting("log_level", "INFO"))
+        try:
+            self.compat_fetcher.ttl = float(self.settings.getSetting("compat_ttl", self.compat_fetcher.ttl))
+        except (TypeError, ValueError):
+            decky.logger.warning("[Settings] Ignoring invalid compat_ttl.")
 
         # Check if SSID and passphrase are set. If not, load from settings.
         if not (self.ssid and self.passphrase):
@@ -213,7 +496,7 @@ class Plugin:
         # Use the IP address and DHCP range from the settings if available, if not use the defaults.
         self.ip_address = self.settings.getSetting("ip_address", "192.168.8.1")
         self.dhcp_range = self.settings.getSetting("dhcp_range", "192.168.8.100,192.168.8.200,12h")
-        decky.logger.info(f"[Settings] SSID={self.ssid}, Passphrase={self.passphrase}, AlwaysUseStored={self.always_use_stored_credentials}")
+        decky.logger.info("[Settings] SSID=%s, AlwaysUseStored=%s", self.ssid, self.always_use_stored_credentials)
         return {
             "ssid": self.ssid,
             "passphrase": self.passphrase,
@@ -222,7 +505,10 @@ class Plugin:
             "dhcp_range": self.dhcp_range,
             "channel": self.channel,
             "hw_mode": self.hw_mode,
-            "country_code": self.country_code
+            "country_code": self.country_code,
+            "keep_sysext_merged": self.keep_sysext_merged,
+            "radio_profile": self.radio_profile,
+            "dscp_priority": self.dscp_priority
         }
 
     async def settings_read(self):
@@ -259,7 +545,7 @@ class Plugin:
             self.settings.setSetting("always_use_stored_credentials", "false")
             self.settings.commit()
 
-        decky.logger.info(f"Updated credentials: SSID={self.ssid}, Passphrase={self.passphrase}, AlwaysUse={self.always_use_stored_credentials}")
+        decky.logger.info("Updated credentials: SSID=%s, AlwaysUse=%s", self.ssid, self.always_use_stored_credentials)
 
         return {"ssid": self.ssid, "passphrase": self.passphrase, "always_use_stored_credentials": self.always_use_stored_credentials}
 
@@ -272,12 +558,123 @@ class Plugin:
         self.settings.setSetting("country_code", new_country_code)
         self.settings.commit()
 
-        decky.logger.info(f"Updated advanced settings: ")
+        decky.logger.info("Updated advanced settings: channel=%s, hw_mode=%s, country_code=%s", self.channel, self.hw_mode, self.country_code)
 
         return {"channel": self.channel, "hw_mode": self.hw_mode, "country_code": self.country_code}
 
+    # PROFILE METHODS
+    async def list_profiles(self) -> dict:
+        # Profiles by name. "active" is the last activated profile, unless settings changed since.
+        current = self.running_settings()
+        profiles = [{"name": name, **self.profiles.get(name)} for name in self.profiles.names()]
+        active = self.profiles.active
+        if not any(profile["name"] == active and all(current.get(k) == v for k, v in profile.items() if k != "name") for profile in profiles):
+            active = None
+        return {"active": active, "profiles": profiles}
+
+    async def save_profile(self, name: str, settings: dict = None):
+        # Validates and saves a profile (the current settings if none are given) and renders its
+        # dnsmasq and, where the channel and radio capabilities are known, hostapd configs ahead of use.
+        name = str(name or "").strip()
+        if not 0 < len(name) <= 64:
+            return {"error": "Profile name must be 1-64 characters."}
+        try:
+            profile = validate_profile(settings or self.running_settings(), tuple(RADIO_PROFILES))
+        except ProfileError as e:
+            return {"error": str(e)}
+
+        try:
+            # Saving the current settings makes the new profile the active one.
+            await asyncio.to_thread(self.profiles.save, name, profile, settings is None)
+        except OSError as e:
+            decky.logger.error(f"Failed to save profile {name}: {e}")
+            return {"error": str(e)}
+        await self.prerender_profile(profile)
+
+        decky.logger.info(f"Saved profile {name}: SSID={profile['ssid']}, Channel={profile['channel']}, HW Mode={profile['hw_mode']}, Country Code={profile['country_code']}")
+        return {"name": name, "profile": profile}
+
+    async def prerender_profile(self, profile: dict):
+        # A hostapd config depends on the radio's capabilities under the profile's regulatory
+        # domain, so it is only rendered here if those were probed before; otherwise (and for
+        # "auto" channels) it is rendered and stored on the first start.
+        try:
+            await self.dnsmasq_config_for(profile["dhcp_range"], profile["ip_address"])
+            cache = self.phy_caps_cache.load()
+            if profile["channel"] == "auto" or not str(cache.get("key", "")).endswith(f":{profile['country_code']}"):
+                return
+            inputs = self.hostapd_config_inputs(
+                profile["ssid"], profile["passphrase"], profile["channel"], profile["hw_mode"],
+                profile["country_code"], profile["radio_profile"], cache["key"]
+            )
+            if self.artifacts.lookup("hostapd", inputs) is None:
+                config_content = self.render_hostapd_config(
+                    profile["ssid"], profile["passphrase"], profile["channel"], profile["hw_mode"],
+                    profile["country_code"], profile["radio_profile"], cache["caps"]
+                )
+                await asyncio.to_thread(self.artifacts.store, "hostapd", inputs, config_content)
+        except (OSError, KeyError) as e:
+            decky.logger.warning(f"Could not pre-render profile configs: {e}")
+
+    async def delete_profile(self, name: str) -> bool:
+        try:
+            return await asyncio.to_thread(self.profiles.delete, name)
+        except OSError as e:
+            decky.logger.error(f"Failed to delete profile {name}: {e}")
+            return False
+
+    def use_profile(self, name: str) -> bool:
+        # Makes a saved profile the current settings. It was validated when saved, so it is not
+        # validated again; all settings are committed at once.
+        profile = self.profiles.get(name)
+        if profile is None:
+            decky.logger.error(f"Unknown profile {name}.")
+            return False
+
+        self.ssid = profile["ssid"]
+        self.passphrase = profile["passphrase"]
+        self.always_use_stored_credentials = True
+        self.channel = profile["channel"]
+        self.hw_mode = profile["hw_mode"]
+        self.country_code = profile["country_code"]
+        self.ip_address = profile["ip_address"]
+        self.dhcp_range = profile["dhcp_range"]
+        self.radio_profile = profile["radio_profile"]
+        self.dscp_priority = profile["dscp_priority"]
+
+        for key, value in profile.items():
+            self.settings.setSetting(key, ("true" if value else "false") if isinstance(value, bool) else value)
+        self.settings.setSetting("always_use_stored_credentials", "true")
+        self.settings.commit()
+        self.profiles.set_active(name)
+
+        decky.logger.info(f"Using profile {name}: SSID={self.ssid}, Channel={self.channel}, HW Mode={self.hw_mode}, Country Code={self.country_code}")
+        return True
+
+    async def activate_profile(self, name: str):
+        # Switches to a saved profile, applying it to the running hotspot if there is one.
+        if not self.use_profile(name):
+            return {"error": f"Unknown profile '{name}'."}
+        result = {"name": name, "settings": await self.load_settings()}
+        if self.hotspot_active:
+            result["apply"] = await self.apply_live()
+        return result
+
     # HOTSPOT CONTROL METHODS
-    async def start_hotspot(self):
+    async def start_hotspot(self, profile: str = None):
+        # Starts the hotspot with the current settings, or with a saved profile's.
+        if profile is not None and not self.use_profile(profile):
+            return False
+        self.cancel_wifi_reconnect_wait()
+        if self.resume_snapshot is not None:
+            # A hotspot parked by suspend_ap still holds the AP interface; tear it down first.
+            self.resume_snapshot = None
+            await self.stop_hotspot()
+        with self.tracer.run("start_hotspot") as trace:
+            trace["success"] = await self.bring_up_hotspot()
+            return trace["success"]
+
+    async def bring_up_hotspot(self):
             decky.logger.info("Starting Hotspot")
 
             try:
@@ -287,23 +684,47 @@ class Plugin:
                 hw_mode = self.hw_mode
                 country_code = self.country_code
 
-                decky.logger.info(f"Using SSID: {ssid}, Passphrase: {passphrase}, Channel: {channel}, HW Mode: {hw_mode}, Country Code: {country_code}  (Always Use: {self.always_use_stored_credentials})")
+                decky.logger.info("Using SSID: %s, Channel: %s, HW Mode: %s, Country Code: %s (Always Use: %s)", ssid, channel, hw_mode, country_code, self.always_use_stored_credentials)
 
                 if not ssid or not passphrase:
                     decky.logger.error("SSID or Passphrase is missing! Aborting.")
                     return False
 
-                await self.activate_muon_sysext()
-                await self.check_dependencies(temporary_sysext=False)
-                await self.ensure_wlan0_up()
-                await self.capture_network_config()
-                await self.capture_service_states()
-                await self.start_wifi_ap(ssid, passphrase, channel, hw_mode, country_code)
-                await self.configure_firewalld()
-                await self.start_dhcp_server()
+                # Bring-up as a dependency graph: once the sysext is merged, independent stages
+                # (dependency check, wlan0/network capture, service states, firewalld) run
+                # concurrently, and a failure rolls back what ran. Everything waits for the sysext
+                # because its refresh remounts /usr, which the ip/iw/systemctl/firewall-cmd calls
+                # of the other stages run from.
+                stages = StageGraph([
+                    Stage("sysext", self.activate_muon_sysext, rollback=self.deactivate_muon_sysext),
+                    Stage("dependencies", self.require_dependencies, requires=["sysext"]),
+                    Stage("wlan0", self.ensure_wlan0_up, requires=["sysext"]),
+                    Stage("phy_caps", self.probe_phy_capabilities, requires=["wlan0"]),
+                    Stage("channel", self.select_hotspot_channel, requires=["phy_caps"]),
+                    Stage("network_config", self.capture_network_config, requires=["wlan0"]),
+                    Stage("service_states", self.capture_service_states, requires=["sysext"]),
+                    Stage("firewalld", self.configure_firewalld, requires=["sysext"]),
+                    Stage(
+                        "wifi_ap",
+                        lambda: self.start_wifi_ap(ssid, passphrase, self.active_channel, hw_mode, country_code),
+                        requires=["dependencies", "network_config", "service_states", "channel"],
+                        rollback=self.restore_network
+                    ),
+                    Stage("dhcp", self.start_dhcp_server, requires=["wifi_ap", "firewalld"]),
+                ])
+
+                succeeded = await stages.run()
+                self.start_report = stages.report()
+                for result in self.start_report:
+                    decky.logger.info(f"Stage {result['stage']}: {result['status']} ({result['duration']}s){' - ' + result['error'] if result['error'] else ''}")
+
+                if not succeeded:
+                    decky.logger.error("Hotspot bring-up failed; completed stages were rolled back.")
+                    self.hotspot_active = False
+                    return False
 
                 decky.logger.info("Hotspot activated.")
-                self.wlan_ip = await self.run_command(fr"ip addr show {self.ap_interface} | grep -oP 'inet \K[\d.]+/\d+'")
+                self.wlan_ip = await self.get_ap_address()
                 decky.logger.info(f"Using WLAN IP address: {self.wlan_ip}")
 
                 decky.logger.info("Checking if hotspot activated successfully...")
@@ -323,43 +744,198 @@ class Plugin:
                 return False
 
     async def stop_hotspot(self):
-        decky.logger.info("Stopping Hotspot")
-        try:
-            script_path = os.path.join(self.assetsDir, "stop_hotspot.sh")
+        with self.tracer.run("stop_hotspot") as trace:
+            decky.logger.info("Stopping Hotspot")
+            try:
+                await self.clear_radio_profile()
+                trace["success"] = await self.restore_network()
+                if trace["success"]:
+                    self.hotspot_active = False
+                # hostapd is gone, so drop the control socket rather than waiting for a failed request.
+                self.hostapd.close()
+                await self.deactivate_muon_sysext()
+                decky.logger.info("Hotspot stopped")
+            except Exception as e:
+                trace["success"] = False
+                decky.logger.error(f"Failed to stop hotspot: {str(e)}")
 
-            decky.logger.info("Restoring network configuration")
+    def services_to_restore(self) -> list:
+        # Services that were running before bring-up. If the states were never captured,
+        # fall back to starting both, as tear-down always used to.
+        if not self.service_states:
+            return ["NetworkManager", "iwd"]
+        return [service for service, active in self.service_states.items() if active]
 
-            result = await self.run_command([
-                "bash", 
-                script_path, 
-                self.wifi_interface
-            ])
+    @traced()
+    async def restore_network(self) -> bool:
+        # Tears down the AP interface and brings the regular WiFi connection back.
+        script_path = os.path.join(self.assetsDir, "stop_hotspot.sh")
+        started = time.monotonic()
+        services = self.services_to_restore()
 
-            if "Network configuration restored successfully" in result:
-                self.hotspot_active = False
-                decky.logger.info("Network configuration restored successfully.")
-            else:
-                decky.logger.error("Failed to restore network configuration.")
-            await self.deactivate_muon_sysext()
-            decky.logger.info("Hotspot stopped")
-        except Exception as e:
-            decky.logger.error(f"Failed to stop hotspot: {str(e)}")
+        decky.logger.info(f"Restoring network configuration (services to start: {', '.join(services) or 'none'})")
+
+        result = await self.run_command([
+            "bash", 
+            script_path, 
+            self.wifi_interface,
+            ",".join(services)
+        ])
+
+        self.record_script_timings(result)
+
+        if "Network configuration restored successfully" in result:
+            decky.logger.info("Network configuration restored successfully.")
+            if "NetworkManager" in services:
+                # Measure time-to-reconnected in the background so tear-down doesn't block on it.
+                self.cancel_wifi_reconnect_wait()
+                self.wifi_reconnect_task = asyncio.create_task(self.wait_for_wifi_reconnected(started))
+            return True
+
+        decky.logger.error("Failed to restore network configuration.")
+        return False
+
+    def cancel_wifi_reconnect_wait(self):
+        if self.wifi_reconnect_task is not None and not self.wifi_reconnect_task.done():
+            self.wifi_reconnect_task.cancel()
+        self.wifi_reconnect_task = None
+
+    async def wait_for_wifi_reconnected(self, started: float):
+        # Polls the WiFi interface until NetworkManager has given it an IPv4 address again, and
+        # records the time since tear-down began as a "wifi_reconnected" span.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wifi_reconnect_timeout
+        while loop.time() < deadline:
+            if await self.get_interface_address(self.wifi_interface):
+                duration = time.monotonic() - started
+                self.tracer.add_span("wifi_reconnected", duration)
+                decky.logger.info(f"WiFi reconnected {duration:.2f}s after tear-down began.")
+                return True
+            await asyncio.sleep(0.25)
+
+        decky.logger.warning(f"WiFi did not reconnect within {self.wifi_reconnect_timeout}s of tear-down.")
+        return False
+
+    @traced()
+    async def select_hotspot_channel(self):
+        # Resolves the "auto" channel setting by surveying the RF environment on the WiFi interface
+        # before it is handed over to the AP.
+        if self.channel != "auto":
+            self.active_channel = self.channel
+            return
+
+        wifi = self.wifi_interface
+        survey = await self.run_privileged("iw", "dev", wifi, "survey", "dump")
+        scan = await self.run_privileged("iw", "dev", wifi, "scan")
+        if scan["returncode"] != 0:
+            # Scanning can be refused while the interface is busy; use the last results instead.
+            scan = await self.run_privileged("iw", "dev", wifi, "scan", "dump")
+
+        # The regulatory domain was applied by probe_phy_capabilities, so the channel flags are current.
+        phy_channels = [c for band in (self.phy_caps or {}).get("bands", {}).values() for c in band["channels"]]
+
+        # Score each candidate over the whole 40/80/160 MHz block radio_params will run it at.
+        selection = select_channel(
+            self.hw_mode,
+            phy_channels,
+            parse_survey_dump(survey["stdout"]),
+            parse_scan(scan["stdout"]),
+            span_of=lambda channel: span_channels(radio_params(self.phy_caps, channel, self.hw_mode), channel)
+        )
+        if selection["channel"] is None:
+            raise Exception(f"No usable channel for hw_mode {self.hw_mode} in {self.country_code}.")
+
+        self.active_channel = str(selection["channel"])
+        self.channel_selection = {
+            "channel": self.active_channel,
+            "hw_mode": self.hw_mode,
+            "country_code": self.country_code,
+            "scores": selection["scores"],
+        }
+        best = selection["scores"][0]
+        decky.logger.info(f"Auto channel: selected {self.active_channel} at {best['width']} MHz (score {best['score']}, {best['bss_count']} overlapping networks) from {len(selection['scores'])} candidates.")
+
+    @traced()
+    async def probe_phy_capabilities(self):
+        # Reads the HT/VHT/HE capabilities and channel list of the WiFi PHY. `iw phy info` is only
+        # parsed again when the PHY, its driver, the kernel or the country code change. A failed
+        # probe leaves self.phy_caps unset and the hostapd config falls back to the basic defaults.
+        info, _ = await self.run_privileged_batch([
+            ["iw", "dev", self.wifi_interface, "info"],
+            ["iw", "reg", "set", self.country_code],
+        ])
+        phy = re.search(r"wiphy (\d+)", info["stdout"])
+        if not phy:
+            decky.logger.warning(f"Could not find the PHY of {self.wifi_interface}; using default radio settings.")
+            self.phy_caps = None
+            self.phy_caps_key = None
+            return
+
+        phy = f"phy{phy.group(1)}"
+        cache_key = f"{self.phy_identity(phy)}:{self.country_code}"
+        cache = self.phy_caps_cache.load()
+        if cache.get("key") == cache_key:
+            self.phy_caps = cache["caps"]
+            self.phy_caps_key = cache_key
+            return
+
+        result = await self.run_privileged("iw", "phy", phy, "info")
+        caps = parse_phy_info(result["stdout"]) if result["returncode"] == 0 else {"bands": {}}
+        if not caps["bands"]:
+            decky.logger.warning(f"Could not read the capabilities of {phy}; using default radio settings.")
+            self.phy_caps = None
+            self.phy_caps_key = None
+            return
+
+        self.phy_caps = caps
+        self.phy_caps_key = cache_key
+        decky.logger.info(f"Probed {phy}: bands {', '.join(sorted(caps['bands']))}, HE {'yes' if any(b['he'] for b in caps['bands'].values()) else 'no'}.")
+        self.save_json_cache(self.phy_caps_cache, {"key": cache_key, "caps": caps}, "PHY capability")
+
+    def phy_identity(self, phy: str) -> str:
+        # Identifies a PHY across reboots (its index can change): permanent MAC, driver module,
+        # module version and kernel release.
+        base = f"/sys/class/ieee80211/{phy}"
+
+        def read(path):
+            try:
+                with open(path, "r") as f:
+                    return f.read().strip()
+            except OSError:
+                return ""
+
+        module = os.path.basename(os.path.realpath(f"{base}/device/driver/module"))
+        version = read(f"/sys/module/{module}/version") or read(f"/sys/module/{module}/srcversion")
+        return f"{read(f'{base}/macaddress')}:{module}:{version}:{os.uname().release}"
+
+    async def get_channel_selection(self) -> dict:
+        # Returns the channel picked by the last "auto" selection and the score of every candidate.
+        return self.channel_selection or {}
 
     async def is_hotspot_active(self) -> bool:
         # Checks if the hostapd service is running.
         try:
-            result = await self.run_command("pgrep -x hostapd", check=False)
-            is_active = bool(result.strip())
-            decky.logger.info(f"Hotspot status: {'Active' if is_active else 'Inactive'}")
+            result = await self.run_privileged("pgrep", "-x", "hostapd")
+            is_active = result["returncode"] == 0
+            decky.logger.debug("Hotspot status: %s", "Active" if is_active else "Inactive")
             return is_active
         except Exception as e:
             decky.logger.error(f"Error checking hotspot status: {e}")
             return False
 
+    @traced()
     async def start_wifi_ap(self, ssid, passphrase, channel, hw_mode, country_code):
         decky.logger.info("Starting Hotspot")
-        script_path = os.path.join(self.assetsDir, "start_hotspot.sh")
-        hostapd_conf_path = "/tmp/hostapd.conf"
+        config_content = await self.hostapd_config_for(ssid, passphrase, channel, hw_mode, country_code)
+        if not await self.launch_hostapd(config_content, country_code):
+            return False
+        self.applied_settings = self.running_settings()
+        return True
+
+    def render_hostapd_config(self, ssid, passphrase, channel, hw_mode, country_code, radio_profile=None, phy_caps=None) -> str:
+        # radio_profile and phy_caps default to those of the hotspot being brought up.
+        radio_profile = radio_profile or self.radio_profile
+        phy_caps = phy_caps or self.phy_caps
         ctrl_interface_dir = "/var/run/hostapd"
 
         config_lines = [
@@ -374,19 +950,15 @@ class Plugin:
             "rsn_pairwise=CCMP",
             "ieee80211d=1",
             f"country_code={country_code}",
-            "ieee80211n=1",
             "wmm_enabled=1",
             "broadcast_deauth=0",
             "no_probe_resp_if_max_sta=0",
             "multicast_to_unicast=0"
         ]
 
-        # Append 5 GHz-specific capabilities if applicable
-        if hw_mode == "a":
-            config_lines.extend([
-                "ieee80211ac=1",
-                "ht_capab=[HT40+]"
-            ])
+        # Widest HT/VHT/HE operation the radio supports on this channel, then the profile's tuning
+        config_lines.extend(radio_params(phy_caps, channel, hw_mode)["lines"])
+        config_lines.extend(profile_lines(radio_profile))
 
         # Append control interface settings
         config_lines.extend([
@@ -395,7 +967,38 @@ class Plugin:
             "deny_mac_file=/etc/hostapd/hostapd.deny"
         ])
 
-        config_content = "\n".join(config_lines) + "\n"
+        return "\n".join(config_lines) + "\n"
+
+    def hostapd_config_inputs(self, ssid, passphrase, channel, hw_mode, country_code, radio_profile, phy_caps_key) -> dict:
+        # Everything render_hostapd_config's output depends on. The plugin version stands in for
+        # the template itself, so an update never reuses configs rendered by older code.
+        return {
+            "ssid": ssid, "passphrase": passphrase, "channel": str(channel), "hw_mode": hw_mode,
+            "country_code": country_code, "radio_profile": radio_profile, "phy_caps": phy_caps_key,
+            "interface": self.ap_interface, "version": decky.DECKY_PLUGIN_VERSION,
+        }
+
+    async def hostapd_config_for(self, ssid, passphrase, channel, hw_mode, country_code, radio_profile=None) -> str:
+        # Returns the pre-rendered hostapd config for these settings, rendering and storing it
+        # on the first use. The channel must already be resolved (not "auto").
+        radio_profile = radio_profile or self.radio_profile
+        inputs = self.hostapd_config_inputs(ssid, passphrase, channel, hw_mode, country_code, radio_profile, self.phy_caps_key)
+        path = self.artifacts.lookup("hostapd", inputs)
+        if path:
+            try:
+                return await asyncio.to_thread(Path(path).read_text)
+            except OSError as e:
+                decky.logger.warning(f"Could not read pre-rendered hostapd config: {e}")
+
+        config_content = self.render_hostapd_config(ssid, passphrase, channel, hw_mode, country_code, radio_profile)
+        try:
+            await asyncio.to_thread(self.artifacts.store, "hostapd", inputs, config_content)
+        except OSError as e:
+            decky.logger.warning(f"Could not store rendered hostapd config: {e}")
+        return config_content
+
+    async def write_hostapd_config(self, config_content: str):
+        hostapd_conf_path = "/tmp/hostapd.conf"
 
         def write_config():
             with open(hostapd_conf_path, "w") as f:
@@ -403,24 +1006,138 @@ class Plugin:
 
         await asyncio.to_thread(write_config)
 
+    async def launch_hostapd(self, config_content: str, country_code: str) -> bool:
+        # Writes a rendered hostapd config, brings up the AP interface and starts hostapd.
+        script_path = os.path.join(self.assetsDir, "start_hotspot.sh")
+
+        await self.write_hostapd_config(config_content)
+
+        # Set the interface up in-process where possible; the script then only starts hostapd.
+        prepared = await self.prepare_ap_interface()
+
         result = await self.run_command([
             "bash",
             script_path,
             self.wifi_interface,
             self.ip_address,
             country_code
-        ])
+        ] + (["prepared"] if prepared else []))
 
         if "Hotspot started successfully" in result:
             self.hotspot_active = True
+            self.hostapd_config = config_content
             decky.logger.info("Hotspot is active.")
+            await self.apply_radio_profile()
+            return True
         else:
             decky.logger.error("Failed to start Hotspot.")
+            return False
+
+    @traced()
+    async def prepare_ap_interface(self) -> bool:
+        # Stops the WiFi services and creates/addresses the AP interface over netlink.
+        # Returns False if netlink can't do it, leaving start_hotspot.sh to run its ip/iw steps.
+        if self.netlink is None:
+            return False
+
+        try:
+            # Checked before stopping anything, so the shell script starts from the usual state.
+            if not await self.netlink.has_nl80211():
+                decky.logger.info("nl80211 is not available over netlink, the shell script will set up the AP interface.")
+                return False
+            await self.run_privileged("systemctl", "stop", "NetworkManager", "iwd")
+            phy = await self.netlink.setup_ap_interface(self.wifi_interface, self.ap_interface, f"{self.ip_address}/24")
+            self.ap_phy = phy
+            decky.logger.info(f"Configured {self.ap_interface} on phy{phy} with {self.ip_address}/24 via netlink.")
+            return True
+        except OSError as e:
+            decky.logger.warning(f"Netlink AP setup failed, falling back to shell script: {e}")
+            return False
+
+    async def apply_radio_profile(self):
+        # Interface and firewall side of the radio profile, applied once hostapd is up. Failures
+        # are logged but don't fail the bring-up: the AP works, just without the tuning.
+        latency = self.radio_profile == "latency"
+        if latency:
+            # Power save on the AP side delays frames while the radio dozes.
+            result = await self.run_privileged("iw", "dev", self.ap_interface, "set", "power_save", "off")
+            if result["returncode"] != 0:
+                decky.logger.warning(f"Could not disable power save on {self.ap_interface}: {result['stderr'].strip()}")
+        await self.apply_dscp_priority(latency and self.dscp_priority)
+        await self.start_ping_responder()
+
+    async def clear_radio_profile(self):
+        await self.apply_dscp_priority(False)
+        self.stop_ping_responder()
+
+    def dscp_rule(self) -> list:
+        # Runtime-only direct rule for traffic leaving through the muon-hotspot zone's interface:
+        # small UDP datagrams (game state, voice chat) are marked EF, which mac80211 maps to a
+        # high-priority WMM access category. Bulk transfers keep their own marking.
+        return [
+            "ipv4", "mangle", "POSTROUTING", "0",
+            "-o", self.ap_interface, "-p", "udp", "-m", "length", "--length", "0:512",
+            "-j", "DSCP", "--set-dscp-class", "EF",
+        ]
+
+    async def apply_dscp_priority(self, enable: bool) -> bool:
+        # Adds or removes the DSCP marking rule. It isn't permanent, so a firewalld reload or a
+        # reboot drops it along with the hotspot.
+        if enable == self.dscp_rule_active:
+            return True
+        action = "--add-rule" if enable else "--remove-rule"
+        result = await self.run_privileged("firewall-cmd", "--direct", action, *self.dscp_rule())
+        if result["returncode"] != 0:
+            decky.logger.warning(f"Could not {'add' if enable else 'remove'} DSCP prioritisation rule: {result['stderr'].strip()}")
+            return False
+        self.dscp_rule_active = enable
+        decky.logger.info(f"DSCP prioritisation {'enabled' if enable else 'disabled'} on {self.ap_interface}.")
+        return True
+
+    async def start_ping_responder(self):
+        if self.ping_transport is not None:
+            return
+        try:
+            self.ping_transport, self.ping_responder = await start_responder(self.ip_address, PING_PORT)
+        except OSError as e:
+            decky.logger.warning(f"UDP ping responder unavailable on {self.ip_address}:{PING_PORT}: {e}")
+
+    def stop_ping_responder(self):
+        if self.ping_transport is not None:
+            self.ping_transport.close()
+        self.ping_transport = None
+
+    async def get_latency_stats(self) -> dict:
+        # Per-client UDP round-trip time, jitter and loss, keyed by client IP. Only clients that
+        # have run udp_ping.py against the hotspot appear. The last figures stay available
+        # after the hotspot stops.
+        clients = self.ping_responder.report() if self.ping_responder is not None else {}
+        return {"port": PING_PORT, "running": self.ping_transport is not None, "clients": clients}
+
+    async def get_ap_address(self) -> str:
+        # Returns the AP interface's IPv4 address in CIDR form.
+        return await self.get_interface_address(self.ap_interface)
+
+    async def get_interface_address(self, interface: str) -> str:
+        # Returns an interface's first IPv4 address in CIDR form, or "" if it has none.
+        if self.netlink is not None:
+            try:
+                addresses = await self.netlink.route.get_addresses(interface)
+                return addresses[0] if addresses else ""
+            except OSError as e:
+                decky.logger.warning(f"Netlink address lookup failed: {e}")
+        # One line per address: "3: wlan0    inet 192.168.1.5/24 brd ..."
+        output = (await self.run_privileged("ip", "-4", "-o", "addr", "show", "dev", interface))["stdout"]
+        for line in output.splitlines():
+            parts = line.split()
+            if "inet" in parts[:-1]:
+                return parts[parts.index("inet") + 1]
+        return ""
 
     # Check if the WiFi has been disabled
     async def is_rfkill_blocking_wlan(self):
         try:
-            rfkill_output = await self.run_command("rfkill list")
+            rfkill_output = (await self.run_privileged("rfkill", "list"))["stdout"].strip()
 
             if not rfkill_output:
                 decky.logger.error("rfkill command returned empty output.")
@@ -444,31 +1161,84 @@ class Plugin:
             return False  # Default to not blocked if there's an error
 
     # DEPENDENCY MANAGEMENT METHODS
+    @traced()
     async def check_dependencies(self, temporary_sysext=True):
-        # Ensure required dependencies are installed.
-        try:
-            if self.hotspot_active:
-                temporary_sysext = False
-
-            if temporary_sysext:
-                await self.activate_muon_sysext()
-
-            statuses = {}
-            for dep in ["dnsmasq", "hostapd"]:
-                result = await self.run_command(f"which {dep}")
-                statuses[dep] = bool(result)
-                if not result:
-                    decky.logger.error(f"ERROR: `{dep}` is not installed.")
-            decky.logger.info("Dependency statuses: " + str(statuses))
-            return statuses
-        finally:
-            # Deactivate Muon sysext after checking dependencies
-            try:
-                if temporary_sysext and not self.hotspot_active:
-                    await self.deactivate_muon_sysext()
-                    decky.logger.info("Muon sysext deactivated after dependency check.")
-            except Exception as e:
-                decky.logger.error(f"Failed to deactivate Muon sysext after check: {e}")
+        # Ensure required dependencies are installed, by inspecting the sysext image rather than
+        # merging it. temporary_sysext is kept for callers but no longer mounts anything.
+        muon_raw = os.path.join(self.assetsDir, "muon.raw")
+        dependencies = ["dnsmasq", "hostapd"]
+
+        if not os.path.exists(muon_raw):
+            decky.logger.error("ERROR: muon.raw has not been built.")
+            return {dep: False for dep in dependencies}
+
+        # The result only changes when the image is rebuilt or the OS is updated.
+        os_release = self.read_os_release()
+        image_hash = await asyncio.to_thread(self.image_hash, muon_raw)
+        cache_key = f"{image_hash}:{os_release.get('ID')}:{os_release.get('VERSION_ID')}"
+
+        cache = self.dependency_cache.load()
+        if cache.get("key") == cache_key:
+            return cache["statuses"]
+
+        statuses = await self.inspect_sysext_dependencies(muon_raw, dependencies, os_release)
+        if statuses is None:
+            # Nothing was inspected; report the dependencies missing for now, but look again next time.
+            return {dep: False for dep in dependencies}
+        for dep, ok in statuses.items():
+            if not ok:
+                decky.logger.error(f"ERROR: `{dep}` is not installed.")
+        decky.logger.info("Dependency statuses: " + str(statuses))
+
+        self.save_json_cache(self.dependency_cache, {"key": cache_key, "statuses": statuses}, "dependency")
+        return statuses
+
+    async def inspect_sysext_dependencies(self, muon_raw: str, dependencies: list, os_release: dict) -> dict:
+        # Looks for each dependency's binary in the unpacked sysext tree left by install_dependencies.sh,
+        # or in the squashfs image's file listing if the tree is gone. Returns None if the image
+        # couldn't be listed.
+        sysext_dir = os.path.join(self.assetsDir, "muon")
+        release_path = os.path.join(sysext_dir, "usr/lib/extension-release.d/extension-release.muon")
+
+        if os.path.isdir(sysext_dir):
+            release = self.read_os_release(release_path)
+            # systemd-sysext refuses to merge an image built for a different OS release.
+            if release.get("ID") != os_release.get("ID") or release.get("VERSION_ID", os_release.get("VERSION_ID")) != os_release.get("VERSION_ID"):
+                decky.logger.warning(f"Muon sysext was built for {release.get('ID')} {release.get('VERSION_ID')}; a rebuild is required.")
+                return {dep: False for dep in dependencies}
+
+            return {
+                dep: any(os.path.exists(os.path.join(sysext_dir, "usr", bin_dir, dep)) for bin_dir in ("bin", "sbin"))
+                for dep in dependencies
+            }
+
+        try:
+            listing = await self.execute_command(["unsquashfs", "-l", muon_raw])
+        except OSError as e:
+            decky.logger.error(f"Could not list the Muon sysext image: {e}")
+            return None
+        if listing["returncode"] != 0:
+            decky.logger.error(f"Could not list the Muon sysext image: {listing['stderr'].strip()}")
+            return None
+        files = {line.strip().removeprefix("squashfs-root") for line in listing["stdout"].splitlines()}
+        return {
+            dep: f"/usr/bin/{dep}" in files or f"/usr/sbin/{dep}" in files
+            for dep in dependencies
+        }
+
+    def save_json_cache(self, cache: JsonCache, data: dict, description: str):
+        # Persisting is best effort; the result stays cached in memory for this session.
+        try:
+            cache.save(data)
+        except OSError as e:
+            decky.logger.warning(f"Could not persist {description} cache: {e}")
+
+    async def require_dependencies(self):
+        # Hotspot bring-up stage: fails if the sysext doesn't provide every dependency.
+        statuses = await self.check_dependencies(temporary_sysext=False)
+        missing = [dep for dep, ok in statuses.items() if not ok]
+        if missing:
+            raise Exception(f"Missing dependencies: {', '.join(missing)}")
 
     async def install_dependencies(self):
         # Path to install script
@@ -478,7 +1248,8 @@ class Plugin:
 
         result = await self.run_command(
             f"bash {script_path}",
-            cwd=self.assetsDir
+            cwd=self.assetsDir,
+            category="install"
         )
 
         # Recheck dependencies after script runs
@@ -493,6 +1264,7 @@ class Plugin:
         return {"success": True}
 
     # NETWORK CONFIGURATION AND SERVICE METHODS
+    @traced()
     async def capture_network_config(self):
         script_path = os.path.join(self.assetsDir, "extract_network_config.sh")
         decky.logger.info("Extracting network configuration via Shell Script")
@@ -521,6 +1293,7 @@ class Plugin:
 
         return ip_address, gateway, dns_servers
 
+    @traced()
     async def capture_service_states(self):
         # Capture the current state of NetworkManager and iwd before stopping them.
         decky.logger.info("Capturing service states for NetworkManager and iwd...")
@@ -529,28 +1302,47 @@ class Plugin:
         # Array of services to check
         services = ["NetworkManager", "iwd"]
 
-        # For each service in the services array:
-        for service in services:
-            # Check if the service is running
-            status = await self.run_command(f"sudo systemctl is-active {service}")
+        # systemctl prints one state per unit, in the order given
+        statuses = (await self.run_privileged("systemctl", "is-active", *services))["stdout"].splitlines()
+        statuses += [""] * (len(services) - len(statuses))
+
+        for service, status in zip(services, statuses):
             # Save the state of the service into the service_states array
             self.service_states[service] = status.strip() == "active"  # Store True if active, False if inactive
             decky.logger.info(f"Service {service}: {'Active' if self.service_states[service] else 'Inactive'}")
 
         decky.logger.info(f"Captured service states: {self.service_states}")
 
+    @traced()
     async def configure_firewalld(self):
-        # Configure firewalld for broadcast and DHCP traffic using a shell script.
-        script_path = os.path.join(self.assetsDir, "change_firewall_settings.sh")
+        # Provisions the muon-hotspot zone for traffic between clients and DHCP. The runtime zone
+        # is read first; once it is complete, as on every start after the first, nothing else runs.
+        query = await self.run_privileged("firewall-cmd", f"--info-zone={ZONE_NAME}")
+        if query["returncode"] == FIREWALLD_NOT_RUNNING:
+            decky.logger.error("Firewalld is not active; skipping firewall configuration.")
+            return
+        if query["returncode"] not in (0, INVALID_ZONE):
+            decky.logger.error(f"Failed to query firewalld zone {ZONE_NAME}.")
+            return
+
+        runtime = parse_zone_info(query["stdout"]) if query["returncode"] == 0 else None
+        if runtime is not None and runtime["target"] == ZONE_TARGET and not missing_settings(runtime, self.ap_interface):
+            decky.logger.info("Firewalld already configured.")
+            return
 
         decky.logger.info("Configuring firewalld...")
-
-        result = await self.run_command(
-            f"bash {script_path} {self.ip_address}"
-        )
-
-        if "Firewalld configured successfully." in result:
-            decky.logger.info("Firewalld configured successfully.")
+        query = await self.run_privileged("firewall-cmd", "--permanent", f"--info-zone={ZONE_NAME}")
+        if query["returncode"] not in (0, INVALID_ZONE):
+            # Only INVALID_ZONE means the zone is missing; creating it anyway would fail on an
+            # existing zone and force the reload this is meant to avoid.
+            decky.logger.error(f"Failed to query permanent firewalld zone {ZONE_NAME}.")
+            return
+        permanent = parse_zone_info(query["stdout"]) if query["returncode"] == 0 else None
+        commands = plan_zone_commands(runtime, permanent, self.ap_interface)
+        results = await self.run_privileged_batch(commands, stop_on_error=True, timeout=self.command_timeouts["default"])
+
+        if len(results) == len(commands) and all(result["returncode"] == 0 for result in results):
+            decky.logger.info(f"Firewalld configured successfully ({len(commands)} changes).")
         else:
             decky.logger.error("Failed to configure firewalld.")
 
@@ -583,14 +1375,21 @@ class Plugin:
             decky.logger.error(f"Failed to update DHCP config: {e}")
             return {"error": str(e)}
 
+    @traced()
     async def start_dhcp_server(self):
         # Start the DHCP server using a shell script.
         script_path = os.path.join(self.assetsDir, "start_dhcp_server.sh")
 
         decky.logger.info("Starting DHCP Server.")
 
+        # dnsmasq is restarted below and opens a fresh log, so no signal is needed after rotating.
+        await asyncio.to_thread(self.rotate_dnsmasq_log)
+
+        # The script copies a pre-rendered config when given one, and writes its own otherwise.
+        config_path = await self.dnsmasq_config_for(self.dhcp_range, self.ip_address)
         result = await self.run_command(
             f"bash {script_path} {self.ap_interface} {self.dhcp_range} {self.ip_address}"
+            + (f" {shlex.quote(config_path)}" if config_path else "")
         )
 
         if "dnsmasq is running" in result:
@@ -598,201 +1397,426 @@ class Plugin:
         else:
             decky.logger.error("Failed to start DHCP Server.")
 
+    async def dnsmasq_config_for(self, dhcp_range: str, ip_address: str):
+        # Returns the path of the pre-rendered dnsmasq config for this range, rendering it on the
+        # first use, or None if it can't be stored.
+        # Per-request DHCP logging only while debugging; it writes several lines per lease renewal.
+        log_dhcp = self.log_level == "DEBUG"
+        inputs = {
+            "interface": self.ap_interface, "dhcp_range": dhcp_range, "ip_address": ip_address,
+            "log_dhcp": log_dhcp, "version": decky.DECKY_PLUGIN_VERSION,
+        }
+        path = self.artifacts.lookup("dnsmasq", inputs)
+        if path:
+            return path
+        try:
+            return await asyncio.to_thread(
+                self.artifacts.store, "dnsmasq", inputs, render_dnsmasq_config(self.ap_interface, dhcp_range, ip_address, log_dhcp)
+            )
+        except OSError as e:
+            decky.logger.warning(f"Could not store rendered dnsmasq config: {e}")
+            return None
+
+    def rotate_dnsmasq_log(self) -> bool:
+        # Moves dnsmasq's log to DNSMASQ_LOG.1 (replacing the previous one) once it exceeds
+        # dnsmasq_log_max_bytes. Returns True if it was rotated.
+        try:
+            if os.path.getsize(DNSMASQ_LOG) < self.dnsmasq_log_max_bytes:
+                return False
+            os.replace(DNSMASQ_LOG, f"{DNSMASQ_LOG}.1")
+        except OSError:
+            return False
+        decky.logger.info("Rotated %s", DNSMASQ_LOG)
+        return True
+
+    async def rotate_dnsmasq_log_periodically(self):
+        while True:
+            await asyncio.sleep(self.dnsmasq_log_check_interval)
+            if self.hotspot_active and await asyncio.to_thread(self.rotate_dnsmasq_log):
+                # dnsmasq reopens its log file on SIGUSR2.
+                await self.run_privileged("pkill", "-x", "--signal", "USR2", "dnsmasq")
+
     async def get_ip_address(self) -> str:
         return self.ip_address
 
 
+    # LIVE RECONFIGURATION METHODS
+    def running_settings(self) -> dict:
+        # Everything that shapes the running AP.
+        return {
+            "ssid": self.ssid,
+            "passphrase": self.passphrase,
+            "channel": self.channel,
+            "hw_mode": self.hw_mode,
+            "country_code": self.country_code,
+            "ip_address": self.ip_address,
+            "dhcp_range": self.dhcp_range,
+            "radio_profile": self.radio_profile,
+            "dscp_priority": self.dscp_priority,
+        }
+
+    async def apply_live(self):
+        # Applies saved settings to the running hotspot with the least disruptive mechanism:
+        # hostapd SET/RELOAD for credentials, CHAN_SWITCH for the channel, a dnsmasq restart for
+        # the DHCP range, and a full restart only for band, regulatory domain or address changes.
+        if not self.hotspot_active or self.applied_settings is None:
+            return {"mode": "saved", "changed": [], "success": True}
+
+        settings = self.running_settings()
+        changed = [key for key, value in settings.items() if self.applied_settings.get(key) != value]
+        if not changed:
+            return {"mode": "unchanged", "changed": [], "success": True}
+
+        decky.logger.info(f"Applying changed settings to running hotspot: {', '.join(changed)}")
+        with self.tracer.run("apply_live") as trace:
+            mode = "live"
+            if {"hw_mode", "country_code", "ip_address", "radio_profile"} & set(changed) or settings["channel"] == "auto":
+                # Band, regulatory, addressing or radio profile changes, or a fresh channel survey, need a full restart.
+                mode = "restart"
+            elif not await self.apply_settings_live(changed, settings):
+                decky.logger.warning("Live reconfiguration failed, restarting hotspot.")
+                mode = "restart"
+
+            if mode == "restart":
+                await self.stop_hotspot()
+                trace["success"] = await self.start_hotspot()
+            else:
+                self.applied_settings = settings
+                trace["success"] = True
+
+        return {"mode": mode, "changed": changed, "success": trace["success"]}
+
+    async def apply_settings_live(self, changed: list, settings: dict) -> bool:
+        try:
+            hostapd_changes = {"ssid", "passphrase", "channel"} & set(changed)
+            if hostapd_changes:
+                config_content = await self.hostapd_config_for(
+                    settings["ssid"], settings["passphrase"], settings["channel"], settings["hw_mode"], settings["country_code"]
+                )
+                # Keep the config file in step, so a RELOAD or a later restart sees the same values.
+                await self.write_hostapd_config(config_content)
+
+                if hostapd_changes & {"ssid", "passphrase"}:
+                    # A new SSID or passphrase means re-association either way; apply it (and any
+                    # channel change along with it) with a single BSS reload.
+                    updates = [("ssid", settings["ssid"]), ("wpa_passphrase", settings["passphrase"]), ("channel", settings["channel"])]
+                    if "channel" in hostapd_changes:
+                        # The channel width and center frequency move with the channel.
+                        radio = radio_params(self.phy_caps, settings["channel"], settings["hw_mode"])
+                        updates += [tuple(line.split("=", 1)) for line in radio["lines"]]
+                    for key, value in updates:
+                        if not await self.hostapd.set(key, value):
+                            decky.logger.error(f"hostapd rejected SET {key}.")
+                            return False
+                    if not await self.hostapd.reload():
+                        return False
+                else:
+                    # Channel only: announce the switch so clients follow without disconnecting.
+                    frequency = channel_frequency(settings["channel"], settings["hw_mode"])
+                    flags = chan_switch_flags(radio_params(self.phy_caps, settings["channel"], settings["hw_mode"]))
+                    if not await self.hostapd.chan_switch(frequency, 5, *flags):
+                        decky.logger.error(f"hostapd rejected CHAN_SWITCH to {frequency} MHz.")
+                        return False
+                    await self.hostapd.set("channel", settings["channel"])
+
+                self.hostapd_config = config_content
+
+            if "dscp_priority" in changed:
+                if not await self.apply_dscp_priority(settings["radio_profile"] == "latency" and settings["dscp_priority"]):
+                    return False
+
+            if "dhcp_range" in changed:
+                # dnsmasq only re-reads host files on SIGHUP, not dhcp-range, so restart just dnsmasq.
+                await self.start_dhcp_server()
+                if (await self.run_privileged("pgrep", "-x", "dnsmasq"))["returncode"] != 0:
+                    return False
+
+            decky.logger.info(f"Applied {', '.join(changed)} without restarting the hotspot.")
+            return True
+        except (HostapdControlError, ValueError) as e:
+            decky.logger.error(f"Live reconfiguration failed: {e}")
+            return False
+
     # SUSPENSION METHODS
+    def hotspot_settings_signature(self) -> tuple:
+        # Everything that shapes the running AP; if it changes, a parked hotspot can't be reused.
+        return tuple(self.running_settings().values())
+
     async def suspend_ap(self):
-        # This function disables the hotspot if the Steam Deck is suspended.
+        # This function parks the hotspot if the Steam Deck is suspended. Only hostapd and dnsmasq
+        # are stopped; the sysext, firewall zone and stopped WiFi services are left as they are so
+        # resume_ap can bring the AP straight back.
         if self.hotspot_active:
-            decky.logger.info("Suspending, disabling hotspot...")
-            await self.stop_hotspot()
+            decky.logger.info("Suspending, parking hotspot...")
+            self.resume_snapshot = {
+                "settings": self.hotspot_settings_signature(),
+                "hostapd_config": self.hostapd_config,
+                "phy": self.ap_phy,
+                "service_states": dict(self.service_states),
+                "connected_macs": [d["mac"] for d in self.device_snapshot.devices()],
+            }
+            await self.run_privileged_batch([["pkill", "-x", "hostapd"], ["pkill", "-x", "dnsmasq"]])
+            self.hostapd.close()
+            self.hotspot_active = False
 
     async def resume_ap(self):
-        # Function for resuming the hotspot after suspension. At the moment, only a log entry.
+        # Function for resuming the hotspot after suspension, using the fast path where possible.
         decky.logger.info("Resuming from suspension...")
+        snapshot, self.resume_snapshot = self.resume_snapshot, None
+        if snapshot is None:
+            return False
+
+        with self.tracer.run("resume_hotspot") as trace:
+            trace["success"] = await self.fast_resume(snapshot)
+
+        if trace["success"]:
+            decky.logger.info(f"Hotspot resumed in {trace['duration']}s.")
+            return True
+
+        decky.logger.warning("Fast resume not possible, restarting hotspot from scratch.")
+        await self.stop_hotspot()
+        return await self.start_hotspot()
+
+    async def fast_resume(self, snapshot: dict) -> bool:
+        # Restarts hostapd and dnsmasq from the snapshot, skipping dependency checks, sysext
+        # activation, firewall provisioning and service capture.
+        if snapshot["settings"] != self.hotspot_settings_signature() or not snapshot["hostapd_config"]:
+            decky.logger.info("Hotspot settings changed while suspended.")
+            return False
+        if not os.path.exists("/var/lib/extensions/muon.raw"):
+            decky.logger.info("Muon sysext is no longer installed.")
+            return False
+
+        try:
+            if not await self.launch_hostapd(snapshot["hostapd_config"], self.country_code):
+                return False
+            await self.start_dhcp_server()
+            if not await self.is_hotspot_active():
+                return False
+        except Exception as e:
+            decky.logger.error(f"Fast resume failed: {e}")
+            return False
+
+        self.hotspot_active = True
+        await self.wait_for_clients(snapshot["connected_macs"])
+        return True
+
+    @traced("clients_reconnected")
+    async def wait_for_clients(self, macs: list, timeout: float = 20.0) -> bool:
+        # Waits until every previously connected station has re-associated, or the timeout passes.
+        loop = asyncio.get_running_loop()
+        remaining = set(macs)
+        deadline = loop.time() + timeout
+        while remaining and loop.time() < deadline:
+            await asyncio.sleep(0.5)
+            try:
+                remaining -= set(await self.hostapd.all_stations())
+            except HostapdControlError:
+                pass
+
+        if remaining:
+            decky.logger.info(f"{len(remaining)} of {len(macs)} clients did not reconnect after resume.")
+        else:
+            decky.logger.info(f"All {len(macs)} clients reconnected after resume.")
+        return not remaining
 
 
     # CLIENT LIST METHODS
 
     async def monitor_connected_devices(self):
-        known = set()
+        # Tracks connected devices from hostapd's event stream. If events can't be attached,
+        # falls back to polling the station list.
         while True:
             try:
-                if await self.is_hotspot_active():
-                    raw = await self.get_connected_devices()
-                    try:
-                        devices = json.loads(raw) if isinstance(raw, str) else raw
-                    except Exception:
-                        devices = []
-
-                    if not devices:
-                        continue
-
-                    if not isinstance(devices, list):
-                        decky.logger.warning(f"[Muon] Invalid device list: {devices}")
-                        await asyncio.sleep(2)
-                        continue
-
-                    macs = {d.get("mac") for d in devices if d.get("mac")}
-
-                    for d in devices:
-                        mac = d.get("mac")
-                        if mac and mac not in known:
-                            await decky.emit("muon_device_event", {
-                                "type": "connected",
-                                "hostname": d.get("hostname"),
-                                "ip": d.get("ip"),
-                                "mac": mac,
-                            })
-                            known.add(mac)
-
-                    for mac in list(known):
-                        if mac not in macs:
-                            await decky.emit("muon_device_event", {
-                                "type": "disconnected",
-                                "mac": mac,
-                            })  
-                            known.remove(mac)
+                if self.hostapd.available():
+                    if not await self.listen_for_device_events():
+                        await self.refresh_device_snapshot()
+                elif len(self.device_snapshot):
+                    # hostapd's control socket is gone, so every known device has disconnected.
+                    await self.refresh_device_snapshot()
             except Exception as e:
-                decky.logger.error(f"[Error] {e}")
-            await asyncio.sleep(2)
-
-    async def get_connected_devices(self):
-        # Combines output from hostapd_cli and dnsmasq to return connected devices info
-        # in JSON format.
-        decky.logger.debug("Fetching connected devices...")
-
-        # Hostapd and dnsmasq locations
-        hostapd_cmd = f"sudo hostapd_cli -p /var/run/hostapd -i {self.ap_interface} all_sta"
-        dnsmasq_leases_file = "/tmp/muon-dnsmasq.leases"
-
-        # Dictionary to store device info
-        devices = {}
+                decky.logger.error("[Error] %s", e, extra=every(60))
+            await asyncio.sleep(self.device_poll_interval)
 
+    async def listen_for_device_events(self) -> bool:
+        # Returns False if hostapd would not accept an event listener, True once the stream ends.
+        listener = HostapdEventListener(self.ap_interface, ctrl_dir=self.hostapd.ctrl_dir)
         try:
-            # Get the output from hostapd_cli using the run_command utility
-            hostapd_output = await self.run_command(hostapd_cmd)
-
-            # Parse hostapd output for MAC and signal strength
-            current_mac = None
-            for line in hostapd_output.splitlines():
-                line = line.strip()
+            await listener.attach()
+        except HostapdControlError as e:
+            decky.logger.warning("Unable to attach to hostapd events, polling instead: %s", e, extra=every(300))
+            listener.close()
+            return False
 
-                # Match MAC address
-                if re.match(r"^[0-9a-fA-F:]{17}$", line):
-                    current_mac = line
-                    devices[current_mac] = {
-                        "mac": current_mac,
-                        "ip": None,
-                        "hostname": None,
-                        "signal_strength": None
-                    }
-                # Match signal strength
-                elif line.startswith("signal=") and current_mac:
-                    signal_strength = int(line.split("=")[-1])
-                    # Normalize to negative
-                    if signal_strength > 0:
-                        signal_strength = -signal_strength
-                    devices[current_mac]["signal_strength"] = signal_strength
+        decky.logger.info("Attached to hostapd event stream.")
+        reconciler = asyncio.create_task(self.reconcile_connected_devices_periodically())
+        sampler = asyncio.create_task(self.sample_station_stats_periodically())
+        try:
+            async for event, args in listener.events():
+                if event == "AP-STA-CONNECTED" and args:
+                    await self.handle_station_connected(args[0].lower())
+                elif event == "AP-STA-DISCONNECTED" and args:
+                    await self.handle_station_disconnected(args[0].lower())
+        except HostapdControlError as e:
+            decky.logger.info(f"hostapd event stream ended: {e}")
+        finally:
+            reconciler.cancel()
+            sampler.cancel()
+            listener.close()
+        return True
 
-        except Exception as e:
-            decky.logger.error(f"Error running hostapd_cli: {str(e)}")
-            return json.dumps({"error": "Failed to retrieve data from hostapd_cli"})
+    async def reconcile_connected_devices_periodically(self):
+        # Safety net for missed events: re-sync once on attach, then at a slow interval.
+        while True:
+            try:
+                await self.refresh_device_snapshot()
+            except Exception as e:
+                decky.logger.error("Device reconciliation failed: %s", e, extra=every(300))
+            await asyncio.sleep(self.device_reconcile_interval)
 
-        # Read and parse dnsmasq leases file
-        try:
-            with open(dnsmasq_leases_file, 'r') as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) >= 4:
-                        mac = parts[1]
-                        ip = parts[2]
-                        hostname = parts[3]
+    async def sample_station_stats_periodically(self):
+        # Events only say who connected; throughput and link quality need the counters sampled.
+        while True:
+            await asyncio.sleep(self.station_sample_interval)
+            try:
+                stations = await self.hostapd.all_stations()
+            except HostapdControlError as e:
+                decky.logger.error("Station sampling failed: %s", e, extra=every(60))
+                continue
+            now = time.monotonic()
+            for mac, info in stations.items():
+                self.station_stats.record(mac, info, now)
+
+    async def get_station_stats(self, mac: str, window: float = 60, points: int = 60) -> dict:
+        # Returns a station's rates, bitrates, signal and retry series over the last `window`
+        # seconds, averaged into at most `points` samples.
+        series = self.station_stats.series(mac.lower(), float(window), min(int(points), 600))
+        if series is None:
+            return {"error": "No statistics for this station."}
+        return series
+
+    async def get_device_stats(self, window: float = 10) -> dict:
+        # Everything the device list shows besides the snapshot, in one call: each connected
+        # station's averages over the last `window` seconds, and UDP ping results keyed by IP.
+        macs = [device["mac"] for device in self.device_snapshot.devices()]
+        return {
+            "stations": self.station_stats.summary(macs, float(window)),
+            "latency": self.ping_responder.report() if self.ping_responder is not None else {},
+        }
 
-                        # If MAC is already in devices dict, add IP and hostname
-                        if mac in devices:
-                            devices[mac]["ip"] = ip
-                            devices[mac]["hostname"] = hostname
+    async def refresh_device_snapshot(self, max_age: float = 0) -> bool:
+        # Re-reads stations from hostapd into the shared snapshot unless it is fresher than
+        # max_age seconds. Concurrent callers wait for and share a single refresh.
+        loop = asyncio.get_running_loop()
+        async with self.device_snapshot_lock:
+            if self.device_snapshot_time is not None and loop.time() - self.device_snapshot_time < max_age:
+                return True
 
-        except FileNotFoundError:
-            decky.logger.error(f"Error: {dnsmasq_leases_file} not found.")
-            return json.dumps({"error": "dnsmasq leases file not found"})
+            try:
+                devices = await self.collect_connected_devices() if self.hostapd.available() else []
+            except (HostapdControlError, ValueError) as e:
+                decky.logger.error("Error querying hostapd control interface: %s", e, extra=every(60))
+                return False
 
-        # Convert to JSON format
-        connected_devices_json = json.dumps(list(devices.values()), indent=4)
-        decky.logger.debug(f"Connected Devices: {connected_devices_json}")
+            self.device_snapshot_time = loop.time()
+            added, removed = self.device_snapshot.update(devices)
+
+        for device in added:
+            await self.emit_device_event("connected", device)
+        for device in removed:
+            await self.emit_device_event("disconnected", device)
+        return True
+
+    async def handle_station_connected(self, mac: str):
+        device = {"mac": mac, "signal_strength": None, **self.lookup_dhcp_lease(mac)}
+        if self.device_snapshot.add(device):
+            await self.emit_device_event("connected", device)
+
+    async def handle_station_disconnected(self, mac: str):
+        device = self.device_snapshot.remove(mac)
+        if device is not None:
+            await self.emit_device_event("disconnected", device)
+
+    async def emit_device_event(self, event_type: str, device: dict):
+        payload = {"type": event_type, "hostname": device.get("hostname"), "mac": device["mac"]}
+        if event_type == "connected":
+            payload["ip"] = device.get("ip")
+        await decky.emit("muon_device_event", payload)
+
+    def lookup_dhcp_lease(self, mac: str) -> dict:
+        # Returns the IP and hostname dnsmasq has leased to a MAC, if any.
+        lease = self.dhcp_leases.lookup(mac)
+        if lease is None:
+            return {"ip": None, "hostname": None}
+        return {"ip": lease.ip, "hostname": lease.hostname}
 
-        return connected_devices_json
+    async def get_connected_devices(self):
+        # Returns the shared device snapshot, refreshing it if it is older than the poll interval.
+        if not await self.refresh_device_snapshot(max_age=self.device_poll_interval):
+            return {"error": "Failed to retrieve data from hostapd"}
+        return self.device_snapshot.devices()
+
+    async def get_connected_devices_since(self, version: int) -> dict:
+        # Returns only the devices added, removed or changed since `version`, or
+        # {"unchanged": True} if nothing has. Falls back to a full snapshot for unknown versions.
+        await self.refresh_device_snapshot(max_age=self.device_poll_interval)
+        return self.device_snapshot.since(int(version))
+
+    async def collect_connected_devices(self) -> list:
+        # Combines station info from hostapd and dnsmasq leases into a list of devices.
+        devices = []
+        stations = await self.hostapd.all_stations()
+        now = time.monotonic()
+
+        for mac, info in stations.items():
+            self.station_stats.record(mac, info, now)
+            signal_strength = None
+            if "signal" in info:
+                signal_strength = int(info["signal"])
+                # Normalize to negative
+                if signal_strength > 0:
+                    signal_strength = -signal_strength
+
+            # Join against the in-memory lease index. A missing lease just leaves IP/hostname unset.
+            devices.append({
+                "mac": mac,
+                "signal_strength": signal_strength,
+                **self.lookup_dhcp_lease(mac)
+            })
+
+        return devices
 
     # CLIENT BLACKLISTING METHODS
     async def kick_mac(self, mac_address: str) -> bool:
         """Kick and block a MAC address from the hotspot."""
+        result = await self.kick_macs([mac_address])
+        return not result["failed"] and not result["invalid"]
+
+    async def kick_macs(self, mac_addresses: list) -> dict:
+        """Kick and block several MAC addresses with a single ban-list write."""
         try:
-            # Deauthenticate the device (kick it off the hotspot)
-            result = await self.run_command([
-                "hostapd_cli", 
-                "-i", 
-                self.ap_interface, 
-                "deauthenticate", 
-                mac_address
-            ])
-
-            if not result or "OK" not in result:
-                decky.logger.error(f"Failed to kick MAC address: {mac_address}. Response: {result}")
-                return False
+            macs, invalid = self.split_valid_macs(mac_addresses)
+            added = await asyncio.to_thread(self.ban_list.add, macs)
+            decky.logger.info(f"Added {len(added)} MAC address(es) to the ban list.")
 
-            decky.logger.info(f"Successfully kicked MAC address: {mac_address}")
-
-            # Add MAC to deny list in hostapd.deny
-            hostapd_conf = "/etc/hostapd/hostapd.deny"
-            def append_ban():
-                with open(hostapd_conf, "a") as f:
-                    f.write(f"\n{mac_address}\n")
-            await asyncio.to_thread(append_ban)
-
-            decky.logger.info(f"Added {mac_address} to deny list in {hostapd_conf}")
-
-            # Reload hostapd configuration
-            reload_result = await self.run_command([
-                "hostapd_cli", 
-                "-p", 
-                "/var/run/hostapd", 
-                "-i", 
-                self.ap_interface, 
-                "reload"
-            ])
-
-            if reload_result.strip() == "":  # Success if output is empty
-                decky.logger.info("Reloaded hostapd configuration successfully.")
-                return True
-            else:
-                decky.logger.error(f"Failed to reload hostapd configuration. Output: {reload_result}")
-                return False
+            # Apply to the running hotspot through the runtime deny ACL; hostapd drops banned stations itself.
+            failed = []
+            if self.hotspot_active and self.hostapd.available():
+                failed = await self.apply_deny_acl(macs, ban=True)
+                for mac in macs:
+                    if mac not in failed:
+                        await self.handle_station_disconnected(mac)
+
+            return {"banned": [mac for mac in macs if mac not in failed], "failed": failed, "invalid": invalid}
 
         except Exception as e:
-            decky.logger.error(f"Error while processing MAC address {mac_address}: {e}")
-            return False
+            decky.logger.error(f"Error while banning MAC addresses {mac_addresses}: {e}")
+            return {"banned": [], "failed": list(mac_addresses), "invalid": []}
 
     async def retrieve_ban_list(self) -> list:
-        """Retrieves the list of banned MAC addresses from hostapd.deny, filtering out invalid and excluded ones."""
-        deny_file = "/etc/hostapd/hostapd.deny"
-
-        if not os.path.exists(deny_file):
-            decky.logger.warning("Ban list file does not exist. Returning empty list.")
-            return []
-
-        def read_bans():
-            with open(deny_file, "r") as f:
-                return [
-                    line.strip()
-                    for line in f
-                    if self.valid_mac_regex.match(line.strip()) and line.strip() not in self.excluded_macs
-                ]
-
+        """Retrieves the list of banned MAC addresses, excluding the placeholder entries hostapd ships with."""
         try:
-            mac_addresses = await asyncio.to_thread(read_bans)
+            mac_addresses = await asyncio.to_thread(self.ban_list.bans)
             decky.logger.info(f"Retrieved {len(mac_addresses)} valid banned MAC addresses.")
             return mac_addresses
 
@@ -801,90 +1825,215 @@ class Plugin:
             return []
 
     async def unban_mac_address(self, mac_address: str) -> bool:
-        # Removes a MAC address from hostapd.deny and reloads hostapd.
-        deny_file = "/etc/hostapd/hostapd.deny"
+        # Removes a MAC address from the ban list and the running hotspot's deny ACL.
+        result = await self.unban_macs([mac_address])
+        return bool(result["unbanned"]) and not result["failed"]
 
+    async def unban_macs(self, mac_addresses: list) -> dict:
+        # Removes several MAC addresses from the ban list with a single write.
         try:
-            if not os.path.exists(deny_file):
-                decky.logger.warning("Ban list file does not exist. Nothing to unban.")
-                return False
+            macs, invalid = self.split_valid_macs(mac_addresses)
+            removed = await asyncio.to_thread(self.ban_list.remove, macs)
 
-            # Read the file and filter out the MAC address
-            with open(deny_file, "r") as f:
-                lines = f.readlines()
+            missing = [mac for mac in macs if mac not in removed]
+            if missing:
+                decky.logger.warning(f"MAC address(es) not found in ban list: {', '.join(missing)}")
+            decky.logger.info(f"Unbanned {len(removed)} MAC address(es).")
 
-            new_lines = [line for line in lines if line.strip().lower() != mac_address.lower()]
+            failed = []
+            if removed and self.hotspot_active and self.hostapd.available():
+                failed = await self.apply_deny_acl(removed, ban=False)
 
-            if len(new_lines) == len(lines):  # No changes means MAC wasn't found
-                decky.logger.warning(f"MAC address {mac_address} not found in ban list.")
-                return False
-
-            # Write back the updated list
-            with open(deny_file, "w") as f:
-                f.writelines(new_lines)
-
-            decky.logger.info(f"Unbanned MAC address: {mac_address}")
-
-            # Reload hostapd to apply changes
-            reload_result = await self.run_command("sudo systemctl reload hostapd")
-
-            if reload_result.strip() == "":  # Success if no output
-                decky.logger.info("Reloaded hostapd configuration successfully.")
-                return True
-            else:
-                decky.logger.error(f"Failed to reload hostapd. Output: {reload_result}")
-                return False
+            return {"unbanned": [mac for mac in removed if mac not in failed], "failed": failed, "invalid": invalid + missing}
 
         except Exception as e:
-            decky.logger.error(f"Error unbanning MAC address {mac_address}: {e}")
-            return False
-
+            decky.logger.error(f"Error unbanning MAC addresses {mac_addresses}: {e}")
+            return {"unbanned": [], "failed": list(mac_addresses), "invalid": []}
+
+    def split_valid_macs(self, mac_addresses: list):
+        # Returns (normalised valid MACs, rejected inputs), dropping duplicates.
+        macs, invalid = [], []
+        for mac in mac_addresses:
+            normalized = normalize_mac(mac)
+            if normalized is None:
+                invalid.append(mac)
+            elif normalized not in macs:
+                macs.append(normalized)
+        return macs, invalid
+
+    async def apply_deny_acl(self, macs: list, ban: bool) -> list:
+        # Applies bans or unbans to the running hostapd over the control socket. Falls back to a
+        # single RELOAD (and a deauth for bans) if the runtime ACL command isn't supported.
+        # Returns the MACs that could not be applied.
+        try:
+            update = self.hostapd.deny_acl_add if ban else self.hostapd.deny_acl_del
+            rejected = [mac for mac in macs if not await update(mac)]
+            if not rejected:
+                return []
+
+            decky.logger.warning("hostapd rejected DENY_ACL, falling back to a configuration reload.")
+            if ban:
+                for mac in rejected:
+                    await self.hostapd.deauthenticate(mac)
+            if await self.hostapd.reload():
+                return []
+            decky.logger.error("Failed to reload hostapd configuration.")
+            return rejected
+        except HostapdControlError as e:
+            decky.logger.error(f"Failed to update hostapd deny list: {e}")
+            return list(macs)
 
     # UTILITY METHODS
-    async def run_command(self, command, check=False, cwd=None):
-            # Function to run a shell command.
-            env = os.environ.copy()
-            env["LD_LIBRARY_PATH"] = "/usr/lib:/usr/lib64:" + env.get("LD_LIBRARY_PATH", "")
-
-            if cwd is None:
-                cwd = os.path.dirname(__file__)
+    async def run_command(self, command, check=False, cwd=None, timeout=None, category=None):
+        # Function to run a shell command. Returns its stripped stdout.
+        result = await self.execute_command(command, cwd, timeout, category)
+        if result["stdout"] and decky.logger.isEnabledFor(logging.DEBUG):
+            decky.logger.debug("Command output: %s", result["stdout"].strip())
+        if result["stderr"]:
+            decky.logger.error(f"Command error: {result['stderr'].strip()}")
+        return result["stdout"].strip()
+
+    def command_timeout(self, command, timeout=None, category=None) -> float:
+        # Explicit timeout first, then the category's; shell scripts get the "script" budget.
+        if timeout is not None:
+            return timeout
+        if category is None:
+            argv = command if isinstance(command, list) else command.split()
+            category = "script" if argv[:1] == ["bash"] else "default"
+        return self.command_timeouts.get(category, self.command_timeouts["default"])
+
+    @asynccontextmanager
+    async def command_slot(self):
+        # Bounds how many external commands run at once and records how long callers queued.
+        stats = self.command_stats
+        queued = time.monotonic()
+        stats["queued"] += 1
+        try:
+            await self.command_semaphore.acquire()
+        finally:
+            stats["queued"] -= 1
+        wait = time.monotonic() - queued
+        stats["queue_wait_total"] += wait
+        stats["queue_wait_max"] = max(stats["queue_wait_max"], wait)
+        stats["started"] += 1
+        stats["in_flight"] += 1
+        try:
+            yield
+        finally:
+            stats["in_flight"] -= 1
+            self.command_semaphore.release()
 
-            if isinstance(command, list):
-                result = await asyncio.create_subprocess_exec(
-                    *command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    env=env,
-                    cwd=cwd
-                )
-            else:
-                    result = await asyncio.create_subprocess_exec(
-                        "/usr/bin/env", "bash", "-c", command,
+    async def kill_process_tree(self, process):
+        # Commands run in their own session, so the whole group (scripts and their children) can be
+        # signalled at once: SIGTERM first, then SIGKILL for anything still alive.
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(asyncio.shield(process.wait()), 2)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    async def execute_command(self, command, cwd=None, timeout=None, category=None) -> dict:
+        # Runs an argv list directly, or a string through bash. Returns {"returncode", "stdout",
+        # "stderr", "timed_out"}. On timeout or cancellation the process tree is killed.
+        if cwd is None:
+            cwd = os.path.dirname(__file__)
+        argv = command if isinstance(command, list) else ["/usr/bin/env", "bash", "-c", command]
+        timeout = self.command_timeout(command, timeout, category)
+
+        # Short label for the timing report, e.g. "bash start_hotspot.sh wlan0 ...".
+        label = " ".join(command) if isinstance(command, list) else command
+        async with self.command_slot():
+            with self.tracer.span(label[:80], category="command"):
+                process = await asyncio.create_subprocess_exec(
+                    *argv,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    env=env,
-                    cwd=cwd
+                    env=self.command_env,
+                    cwd=cwd,
+                    start_new_session=True
                 )
-
-            stdout, stderr = await result.communicate()
-            if self.debug:
-                if stdout:
-                    decky.logger.debug(f"Command output: {stdout.decode().strip()}")
-            if stderr:
-                decky.logger.error(f"Command error: {stderr.decode().strip()}")
-            return stdout.decode().strip()
-
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+                except asyncio.TimeoutError:
+                    self.command_stats["timeouts"] += 1
+                    decky.logger.error(f"Command timed out after {timeout}s: {label[:80]}")
+                    await self.kill_process_tree(process)
+                    return {"returncode": process.returncode, "stdout": "", "stderr": "", "timed_out": True}
+                except asyncio.CancelledError:
+                    # The caller gave up; don't leave the command running behind it.
+                    self.command_stats["cancelled"] += 1
+                    await self.kill_process_tree(process)
+                    raise
+
+        self.command_stats["completed"] += 1
+        return {"returncode": process.returncode, "stdout": stdout.decode(), "stderr": stderr.decode(), "timed_out": False}
+
+    async def run_privileged_batch(self, commands: list, stop_on_error: bool = False, timeout=None) -> list:
+        # Runs whitelisted argv lists through the persistent helper in one round trip, or as
+        # individual subprocesses if the helper isn't available. Returns one
+        # {"returncode", "stdout", "stderr", "timed_out"} per command that ran.
+        timeout = timeout if timeout is not None else self.command_timeouts["query"]
+        if self.helper is not None:
+            label = "; ".join(" ".join(argv) for argv in commands)
+            try:
+                async with self.command_slot():
+                    with self.tracer.span(label[:80], category="command"):
+                        results = await self.helper.batch(commands, stop_on_error, timeout)
+                self.command_stats["completed"] += 1
+                for result in results:
+                    if result.get("timed_out"):
+                        self.command_stats["timeouts"] += 1
+                        decky.logger.error(f"Command timed out after {timeout}s: {label[:80]}")
+                    if result["stderr"]:
+                        decky.logger.error(f"Command error: {result['stderr'].strip()}")
+                return results
+            except HelperError as e:
+                decky.logger.warning(f"Privileged helper failed, running commands directly: {e}")
+
+        results = []
+        for argv in commands:
+            result = await self.execute_command(list(argv), timeout=timeout)
+            if result["stderr"]:
+                decky.logger.error(f"Command error: {result['stderr'].strip()}")
+            results.append(result)
+            if stop_on_error and result["returncode"] != 0:
+                break
+        return results
+
+    async def run_privileged(self, *argv: str) -> dict:
+        return (await self.run_privileged_batch([list(argv)]))[0]
+
+    def record_script_timings(self, output: str):
+        # Shell scripts report their own steps as "TIMING <step> <microseconds>" lines.
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) == 3 and parts[0] == "TIMING" and parts[2].isdigit():
+                self.tracer.add_span(parts[1], int(parts[2]) / 1_000_000, category="script")
+
+    async def get_timing_report(self, limit: int = 10) -> dict:
+        # Returns the last `limit` start/stop runs with per-stage durations and percentiles,
+        # plus external command counters.
+        stats = dict(self.command_stats)
+        stats["queue_wait_avg"] = stats["queue_wait_total"] / stats["started"] if stats["started"] else 0.0
+        return {**self.tracer.report(int(limit)), "command_stats": stats}
+
+    @traced()
     async def ensure_wlan0_up(self):
         # Ensure the wlan0 interface is available and up.
         decky.logger.info("Checking wlan0 status...")
         # Check the status of the primary wireless networking device (almost always wlan0)
-        result = await self.run_command("ip link show wlan0")
+        result = (await self.run_privileged("ip", "link", "show", "wlan0"))["stdout"].strip()
         decky.logger.info(f"wlan0 status: {result}")
 
         # If the WiFi is down, bring it up:
         if "state DOWN" in result:
             decky.logger.info("wlan0 is down. Bringing it up...")
-            await self.run_command("sudo ip link set wlan0 up")
+            await self.run_privileged("ip", "link", "set", "wlan0", "up")
 
         # If the WiFi chip is missing for some reason (this should never happen, but good to handle it cleanly):
         elif "state UNKNOWN" in result:
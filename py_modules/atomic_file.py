@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+
+
+def atomic_write(path: str, data, mode: int = 0o644):
+    # Writes `data` (str or bytes) to a temp file in the same directory, fsyncs it and renames it
+    # over `path`, so readers only ever see the old or the new content.
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class JsonCache:
+    """
+    A JSON object kept in memory and persisted with atomic_write. The file is read on
+    first use; a missing or unreadable file reads as {}.
+    """
+
+    def __init__(self, path: str, mode: int = 0o644):
+        self.path = path
+        self.mode = mode
+        self._data = None
+
+    def load(self) -> dict:
+        if self._data is None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._data = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def save(self, data: dict):
+        # Replaces the cached object. It stays current in memory even if writing it raises OSError.
+        self._data = data
+        atomic_write(self.path, json.dumps(data), mode=self.mode)
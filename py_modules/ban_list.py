@@ -0,0 +1,96 @@
+import re
+
+from atomic_file import atomic_write
+
+# Accepts colon or hyphen separated MACs in either case.
+MAC_REGEX = re.compile(r"^(?:[0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}$")
+
+
+def normalize_mac(mac: str):
+    # Returns the MAC in hostapd's lower-case, colon separated form, or None if it isn't valid.
+    mac = (mac or "").strip()
+    if not MAC_REGEX.match(mac):
+        return None
+    return mac.replace("-", ":").lower()
+
+
+class BanList:
+    """
+    In-memory set of banned MACs backed by hostapd's deny_mac_file.
+
+    The file is read once; after that lookups and listing are served from memory and
+    every change is written back with a temp file + rename, so hostapd never sees a
+    half-written list. A change only takes effect in memory once it is on disk, so a
+    failed write (OSError) leaves both as they were. Entries in `excluded` (placeholders
+    shipped in the default deny file) are kept in the file but never reported as bans.
+    """
+
+    def __init__(self, path: str, excluded=()):
+        self.path = path
+        self.excluded = {normalize_mac(mac) for mac in excluded} - {None}
+        self._banned = {}
+        self._preserved = []
+        self._loaded = False
+
+    def load(self):
+        self._banned = {}
+        self._preserved = []
+        try:
+            with open(self.path, "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+
+        for line in lines:
+            mac = normalize_mac(line.split("#", 1)[0])
+            if mac is None:
+                continue
+            if mac in self.excluded:
+                if mac not in self._preserved:
+                    self._preserved.append(mac)
+            else:
+                self._banned[mac] = True
+        self._loaded = True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def __contains__(self, mac: str) -> bool:
+        self._ensure_loaded()
+        return normalize_mac(mac) in self._banned
+
+    def bans(self) -> list:
+        self._ensure_loaded()
+        return list(self._banned)
+
+    def add(self, macs) -> list:
+        # Bans MACs, returning the normalised ones that weren't already banned. Saves if anything changed.
+        self._ensure_loaded()
+        banned = dict(self._banned)
+        added = []
+        for mac in filter(None, map(normalize_mac, macs)):
+            if mac not in banned and mac not in self.excluded:
+                banned[mac] = True
+                added.append(mac)
+        if added:
+            self.save(banned)
+        return added
+
+    def remove(self, macs) -> list:
+        # Unbans MACs, returning the normalised ones that were banned. Saves if anything changed.
+        self._ensure_loaded()
+        banned = dict(self._banned)
+        removed = []
+        for mac in filter(None, map(normalize_mac, macs)):
+            if banned.pop(mac, None):
+                removed.append(mac)
+        if removed:
+            self.save(banned)
+        return removed
+
+    def save(self, banned: dict = None):
+        # Writes `banned` (the current bans by default) to the deny file, then makes it current.
+        banned = self._banned if banned is None else banned
+        atomic_write(self.path, "".join(f"{mac}\n" for mac in self._preserved + list(banned)))
+        self._banned = banned
@@ -0,0 +1,206 @@
+import re
+
+# Non-overlapping 2.4 GHz channels, and 5 GHz channels that need no radar detection anywhere.
+# Used when the PHY's channel list couldn't be read.
+FALLBACK_CHANNELS = {"g": [1, 6, 11], "a": [36, 40, 44, 48]}
+
+# Cost weights: a fully busy channel costs as much as ten strong overlapping networks.
+BUSY_WEIGHT = 100.0
+NOISE_WEIGHT = 2.0
+BSS_WEIGHT = 10.0
+# Noise below this floor (dBm) adds no cost.
+NOISE_FLOOR = -95.0
+
+
+def channel_to_freq(channel: int) -> int:
+    if channel == 14:
+        return 2484
+    if channel < 14:
+        return 2407 + 5 * channel
+    return 5000 + 5 * channel
+
+
+def freq_to_channel(freq: int) -> int:
+    if freq == 2484:
+        return 14
+    if freq < 2484:
+        return (freq - 2407) // 5
+    return (freq - 5000) // 5
+
+
+def band_of(hw_mode: str) -> str:
+    return "a" if hw_mode == "a" else "g"
+
+
+def parse_phy_channels(text: str) -> list:
+    # Parses the "Frequencies:" lists of `iw phy <phy> info`, e.g.
+    #   * 5260 MHz [52] (20.0 dBm) (radar detection)
+    #   * 5900 MHz [180] (disabled)
+    # into [{"channel", "freq", "disabled", "radar", "no_ir"}].
+    channels = []
+    for line in text.splitlines():
+        match = re.match(r"\s*\*\s*(\d+)(?:\.\d+)?\s*MHz\s*\[(\d+)\](.*)", line)
+        if not match:
+            continue
+        flags = match.group(3)
+        channels.append({
+            "channel": int(match.group(2)),
+            "freq": int(match.group(1)),
+            "disabled": "disabled" in flags,
+            "radar": "radar detection" in flags,
+            "no_ir": "no IR" in flags or "passive scanning" in flags or "no IBSS" in flags,
+        })
+    return channels
+
+
+def parse_survey_dump(text: str) -> dict:
+    # Parses `iw dev <if> survey dump` into {freq: {"noise", "active", "busy", "in_use"}}.
+    survey, current = {}, None
+    for line in text.splitlines():
+        line = line.strip()
+        match = re.match(r"frequency:\s*(\d+)(?:\.\d+)?\s*MHz(.*)", line)
+        if match:
+            current = survey.setdefault(int(match.group(1)), {"noise": None, "active": None, "busy": None, "in_use": "in use" in match.group(2)})
+            continue
+        if current is None or ":" not in line:
+            continue
+        key, value = (part.strip() for part in line.split(":", 1))
+        number = re.match(r"-?\d+", value)
+        if not number:
+            continue
+        if key == "noise":
+            current["noise"] = int(number.group())
+        elif key == "channel active time":
+            current["active"] = int(number.group())
+        elif key == "channel busy time":
+            current["busy"] = int(number.group())
+    return survey
+
+
+def parse_scan(text: str) -> list:
+    # Parses `iw dev <if> scan` (or `scan dump`) into [{"bssid", "freq", "signal", "low", "high"}],
+    # where low/high are the edges in MHz of the spectrum the BSS occupies.
+    networks, current = [], None
+    for raw in text.splitlines():
+        line = raw.strip()
+        match = re.match(r"BSS ([0-9a-fA-F:]{17})", line)
+        if match:
+            current = {"bssid": match.group(1).lower(), "freq": None, "signal": None, "offset": None, "center": None, "width": 20}
+            networks.append(current)
+            continue
+        if current is None:
+            continue
+        if line.startswith("freq:"):
+            current["freq"] = int(float(line.split(":", 1)[1]))
+        elif line.startswith("signal:"):
+            current["signal"] = float(line.split(":", 1)[1].split()[0])
+        elif "secondary channel offset:" in line:
+            offset = line.split(":", 1)[1].strip()
+            current["offset"] = {"above": 1, "below": -1}.get(offset)
+        elif "channel width:" in line:
+            # VHT operation: "channel width: 1 (80 MHz)"
+            width = re.search(r"\((\d+)(?:\+\d+)? MHz\)", line)
+            if width and int(width.group(1)) > 40:
+                current["width"] = int(width.group(1))
+        elif "center freq segment 1:" in line:
+            current["center"] = int(line.split(":", 1)[1].strip())
+
+    result = []
+    for bss in networks:
+        if bss["freq"] is None:
+            continue
+        low, high = bss["freq"] - 10, bss["freq"] + 10
+        if bss["freq"] < 2500:
+            # 2.4 GHz transmissions spill over roughly 22 MHz.
+            low, high = bss["freq"] - 11, bss["freq"] + 11
+        if bss["offset"] == 1:
+            high += 20
+        elif bss["offset"] == -1:
+            low -= 20
+        if bss["width"] > 40 and bss["center"]:
+            center = channel_to_freq(bss["center"])
+            low, high = min(low, center - bss["width"] // 2), max(high, center + bss["width"] // 2)
+        result.append({"bssid": bss["bssid"], "freq": bss["freq"], "signal": bss["signal"], "low": low, "high": high})
+    return result
+
+
+def candidate_channels(hw_mode: str, phy_channels: list = None) -> list:
+    # Channels we may start an AP on: enabled, no radar detection (DFS), and initiating
+    # radiation allowed under the current regulatory domain.
+    band = band_of(hw_mode)
+    if not phy_channels:
+        return list(FALLBACK_CHANNELS[band])
+
+    usable = [
+        c["channel"] for c in phy_channels
+        if not (c["disabled"] or c["radar"] or c["no_ir"]) and (c["freq"] > 5000) == (band == "a")
+    ]
+    if band == "g":
+        # Only consider the usual non-overlapping set (plus 13 where it's allowed, e.g. EU).
+        preferred = [c for c in usable if c in (1, 6, 11, 13)]
+        return preferred or usable
+    return usable
+
+
+def score_channel(channel: int, survey: dict, networks: list, span: list = None) -> dict:
+    # Returns the cost breakdown for running an AP on `channel` across `span`, the 20 MHz channels
+    # it will occupy (just `channel` by default); lower is better. The busiest and noisiest
+    # channel of the span count, since a wide transmission needs all of it clear.
+    span = sorted(span or [channel])
+    freq = channel_to_freq(channel)
+    if freq < 2500:
+        # 2.4 GHz transmissions spill over roughly 22 MHz.
+        low, high = channel_to_freq(span[0]) - 11, channel_to_freq(span[-1]) + 11
+    else:
+        low, high = channel_to_freq(span[0]) - 10, channel_to_freq(span[-1]) + 10
+
+    busy = noise = None
+    for entry in (survey.get(channel_to_freq(c), {}) for c in span):
+        if entry.get("active"):
+            busy = max(busy or 0.0, min(1.0, (entry.get("busy") or 0) / entry["active"]))
+        if entry.get("noise") is not None:
+            noise = entry["noise"] if noise is None else max(noise, entry["noise"])
+
+    bss_cost, bss_count = 0.0, 0
+    for bss in networks:
+        overlap = min(high, bss["high"]) - max(low, bss["low"])
+        if overlap <= 0:
+            continue
+        bss_count += 1
+        # Strong neighbours hurt more; anything near the noise floor still counts a little. A
+        # neighbour contends fully for whatever part of the span it overlaps, however narrow.
+        strength = 1.0 if bss["signal"] is None else min(1.5, max(0.1, (bss["signal"] - NOISE_FLOOR) / 40))
+        bss_cost += (overlap / min(high - low, bss["high"] - bss["low"])) * strength
+
+    score = BSS_WEIGHT * bss_cost
+    if busy is not None:
+        score += BUSY_WEIGHT * busy
+    if noise is not None:
+        score += NOISE_WEIGHT * max(0.0, noise - NOISE_FLOOR)
+
+    return {
+        "channel": channel,
+        "freq": freq,
+        "width": 20 * len(span),
+        "score": round(score, 2),
+        "busy": None if busy is None else round(busy, 3),
+        "noise": noise,
+        "bss_count": bss_count,
+    }
+
+
+def select_channel(hw_mode: str, phy_channels: list = None, survey: dict = None, networks: list = None, span_of=None) -> dict:
+    # Scores every candidate channel and picks the cheapest. `span_of(channel)`, if given, returns
+    # the 20 MHz channels the AP will occupy with that primary, so wide channels are scored on
+    # their whole block. Within a block, the primary with the quietest 20 MHz wins, then the
+    # lowest channel. Returns {"channel", "scores"} with scores sorted best first, or a None
+    # channel if nothing is usable.
+    survey, networks = survey or {}, networks or []
+    scores = []
+    for channel in candidate_channels(hw_mode, phy_channels):
+        span = span_of(channel) if span_of is not None else [channel]
+        score = score_channel(channel, survey, networks, span)
+        primary = score if len(span) == 1 else score_channel(channel, survey, networks)
+        scores.append((score["score"], primary["score"], channel, score))
+    scores = [score for *_, score in sorted(scores, key=lambda s: s[:3])]
+    return {"channel": scores[0]["channel"] if scores else None, "scores": scores}
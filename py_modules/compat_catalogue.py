@@ -0,0 +1,135 @@
+import bisect
+import json
+import os
+import re
+import unicodedata
+
+# Fields sent with each search result; notes and links are fetched per entry.
+SUMMARY_FIELDS = ("title", "state", "variable_players", "short_description")
+
+
+def normalize_title(title: str) -> str:
+    # Lower-case, accent-free, with punctuation collapsed to single spaces: "Pokémon: Let's Go" -> "pokemon let s go".
+    text = unicodedata.normalize("NFKD", str(title or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.split(r"[^0-9a-z]+", text)).strip()
+
+
+def _slug(normalized: str) -> str:
+    return normalized.replace(" ", "-") or "untitled"
+
+
+class CompatCatalogue:
+    """
+    Parsed compatibility list held in memory with a title index.
+
+    The file is reparsed only when its mtime/size/inode change. Every entry gets an id
+    derived from its title, so ids survive list updates. Searches match each query word
+    against the start of a title word via a sorted vocabulary, and return a single page.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._signature = None
+        self._entries = []
+        self._by_id = {}
+        self._normalized = []
+        self._token_postings = {}
+        self._vocabulary = []
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def refresh(self) -> bool:
+        # Reloads the list if the file changed. Returns False if there is no list on disk.
+        # Raises ValueError if the file isn't a valid list.
+        signature = self._file_signature()
+        if signature is None:
+            self._signature = None
+            self._load([])
+            return False
+        if signature != self._signature:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, list):
+                raise ValueError("Compatibility list is not a JSON array.")
+            self._load(data)
+            self._signature = signature
+        return True
+
+    def _load(self, data: list):
+        entries, by_id, normalized, postings = [], {}, [], {}
+        for raw in data:
+            if not isinstance(raw, dict):
+                continue
+            norm = normalize_title(raw.get("title"))
+            entry_id, n = _slug(norm), 2
+            while entry_id in by_id:
+                entry_id, n = f"{_slug(norm)}-{n}", n + 1
+
+            entry = dict(raw, id=entry_id)
+            position = len(entries)
+            entries.append(entry)
+            by_id[entry_id] = entry
+            normalized.append(norm)
+            for token in set(norm.split()):
+                postings.setdefault(token, []).append(position)
+
+        self._entries = entries
+        self._by_id = by_id
+        self._normalized = normalized
+        self._token_postings = postings
+        self._vocabulary = sorted(postings)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> list:
+        return list(self._entries)
+
+    def get(self, entry_id: str):
+        return self._by_id.get(entry_id)
+
+    def _prefix_positions(self, prefix: str) -> set:
+        # Positions of entries with any title word starting with `prefix`.
+        positions = set()
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            positions.update(self._token_postings[self._vocabulary[i]])
+            i += 1
+        return positions
+
+    def search(self, query: str = "", offset: int = 0, limit: int = 50, states=None) -> dict:
+        # Returns {"total", "offset", "limit", "items"} where items are entry summaries.
+        norm = normalize_title(query)
+        if norm:
+            matches = None
+            for word in norm.split():
+                found = self._prefix_positions(word)
+                matches = found if matches is None else matches & found
+                if not matches:
+                    break
+            positions = sorted(matches or ())
+            # Titles starting with the query come first; otherwise keep list order.
+            positions.sort(key=lambda p: not self._normalized[p].startswith(norm))
+        else:
+            positions = range(len(self._entries))
+
+        if states is not None:
+            states = set(states)
+            positions = [p for p in positions if self._entries[p].get("state") in states]
+
+        offset, limit = max(0, int(offset)), max(0, int(limit))
+        page = positions[offset:offset + limit]
+        items = []
+        for p in page:
+            entry = self._entries[p]
+            summary = {"id": entry["id"], "has_notes": bool(entry.get("notes"))}
+            summary.update((field, entry.get(field)) for field in SUMMARY_FIELDS)
+            items.append(summary)
+
+        return {"total": len(positions), "offset": offset, "limit": limit, "items": items}
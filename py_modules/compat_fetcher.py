@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import random
+import time
+
+import aiohttp
+
+from atomic_file import atomic_write
+
+# Statuses worth retrying; anything else is reported straight away.
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class CompatFetchError(Exception):
+    def __init__(self, errortype: str, message: str):
+        super().__init__(message)
+        self.errortype = errortype
+
+
+class CompatFetcher:
+    """
+    Conditional downloader for the compatibility list.
+
+    The ETag/Last-Modified of the saved copy are kept in a `.meta.json` file next to
+    it. Within `ttl` seconds of the last successful check nothing is requested; after
+    that a conditional GET normally costs a single 304. Transient failures are retried
+    with exponential backoff and full jitter, and the list is only replaced by an
+    atomic rename once the new body has parsed as JSON.
+    """
+
+    def __init__(self, url: str, path: str, ttl: float = 6 * 3600, timeout: float = 5, retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 8, ssl_context=None):
+        self.url = url
+        self.path = path
+        self.meta_path = f"{path}.meta.json"
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.ssl_context = ssl_context
+        self._session = None
+        self._lock = asyncio.Lock()
+
+    def load_meta(self) -> dict:
+        # Metadata only describes the saved list, so it's ignored if the list is missing.
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return meta if isinstance(meta, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_meta(self, meta: dict):
+        atomic_write(self.meta_path, json.dumps(meta))
+
+    def is_fresh(self, meta: dict) -> bool:
+        checked_at = meta.get("checked_at")
+        return checked_at is not None and 0 <= time.time() - checked_at < self.ttl
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def retry_delay(self, attempt: int) -> float:
+        # Full jitter: anywhere between zero and the capped exponential backoff.
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def fetch(self, force: bool = False) -> dict:
+        # Returns {"status": "fresh" | "not_modified" | "updated", "size": bytes written or None}.
+        # Raises CompatFetchError with an errortype of "connectivity", "http" or "invalidjson".
+        async with self._lock:
+            meta = await asyncio.to_thread(self.load_meta)
+            if not force and self.is_fresh(meta):
+                return {"status": "fresh", "size": None}
+
+            headers = {"Accept-Encoding": "gzip"}
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+            status, body, response_headers = await self._get_with_retries(headers)
+
+            if status == 304:
+                meta["checked_at"] = time.time()
+                await asyncio.to_thread(self.save_meta, meta)
+                return {"status": "not_modified", "size": None}
+
+            try:
+                json.loads(body)
+            except ValueError as e:
+                raise CompatFetchError("invalidjson", f"Downloaded list is not valid JSON: {e}") from e
+
+            new_meta = {
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+                "checked_at": time.time(),
+            }
+
+            def store():
+                # The list goes first: metadata pointing at a list we failed to write would
+                # turn the next check into a false 304.
+                atomic_write(self.path, body)
+                self.save_meta(new_meta)
+
+            await asyncio.to_thread(store)
+            return {"status": "updated", "size": len(body)}
+
+    async def _get_with_retries(self, headers: dict):
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_delay(attempt - 1))
+            try:
+                session = self._get_session()
+                async with session.get(self.url, headers=headers, ssl=self.ssl_context) as response:
+                    if response.status in RETRY_STATUSES:
+                        last_error = CompatFetchError("http", f"HTTP {response.status}")
+                        continue
+                    if response.status != 304 and response.status >= 400:
+                        raise CompatFetchError("http", f"HTTP {response.status}")
+                    # aiohttp transparently decompresses gzip bodies.
+                    body = await response.read() if response.status != 304 else b""
+                    return response.status, body, response.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = CompatFetchError("connectivity", str(e) or type(e).__name__)
+
+        raise last_error
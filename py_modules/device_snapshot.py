@@ -0,0 +1,124 @@
+import time
+from collections import OrderedDict
+
+
+class DeviceSnapshot:
+    """
+    Versioned set of connected devices, keyed by MAC.
+
+    Every change bumps the version. Per-MAC add/modify versions plus a bounded
+    set of removal tombstones let `since()` describe what changed after any
+    recent version without keeping full copies of old snapshots.
+
+    Changes confined to `volatile` fields (signal strength by default, which moves on
+    every poll) are stored without bumping the version, so they don't make every
+    client part of every delta. Clients get the new values with the next real change
+    or full snapshot, and read live values from the station statistics.
+    """
+
+    def __init__(self, tombstone_limit: int = 256, volatile=("signal_strength",)):
+        # Start from a wall-clock based version so a client holding a version from
+        # a previous plugin session always falls back to a full snapshot.
+        self.version = time.time_ns() // 1_000_000
+        self.tombstone_limit = tombstone_limit
+        self.volatile = frozenset(volatile)
+        self._horizon = self.version
+        self._devices = {}
+        self._created = {}
+        self._modified = {}
+        self._removed = OrderedDict()
+
+    def __contains__(self, mac: str) -> bool:
+        return mac in self._devices
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def get(self, mac: str):
+        return self._devices.get(mac)
+
+    def devices(self) -> list:
+        return list(self._devices.values())
+
+    def _put(self, mac: str, device: dict):
+        if mac not in self._devices:
+            self._created[mac] = self.version
+            self._removed.pop(mac, None)
+        self._devices[mac] = device
+        self._modified[mac] = self.version
+
+    def _delete(self, mac: str):
+        self._devices.pop(mac)
+        self._modified.pop(mac)
+        self._removed[mac] = (self.version, self._created.pop(mac))
+        self._removed.move_to_end(mac)
+        # Forgetting a tombstone means deltas older than it can no longer be computed.
+        while len(self._removed) > self.tombstone_limit:
+            _, (removed_version, _) = self._removed.popitem(last=False)
+            self._horizon = max(self._horizon, removed_version)
+
+    def _differs(self, old: dict, new: dict) -> bool:
+        keys = (old.keys() | new.keys()) - self.volatile
+        return any(old.get(key) != new.get(key) for key in keys)
+
+    def add(self, device: dict) -> bool:
+        # Adds a single device if it isn't already known. Returns True if it was added.
+        mac = device["mac"]
+        if mac in self._devices:
+            return False
+        self.version += 1
+        self._put(mac, device)
+        return True
+
+    def remove(self, mac: str):
+        # Removes a single device, returning it, or None if it wasn't known.
+        device = self._devices.get(mac)
+        if device is None:
+            return None
+        self.version += 1
+        self._delete(mac)
+        return device
+
+    def update(self, devices: list):
+        # Replaces the snapshot with a full device list. Returns (added, removed) device lists.
+        current = {d["mac"]: d for d in devices if d.get("mac")}
+        added = [d for mac, d in current.items() if mac not in self._devices]
+        removed = [d for mac, d in self._devices.items() if mac not in current]
+        changed = [d for mac, d in current.items() if mac in self._devices and self._differs(self._devices[mac], d)]
+
+        if added or removed or changed:
+            self.version += 1
+            for device in removed:
+                self._delete(device["mac"])
+            for device in added + changed:
+                self._put(device["mac"], device)
+        # Volatile-only changes are kept without a new version.
+        for mac, device in current.items():
+            if mac in self._devices and self._devices[mac] is not device:
+                self._devices[mac] = device
+
+        return added, removed
+
+    def to_dict(self) -> dict:
+        return {"version": self.version, "full": True, "devices": self.devices()}
+
+    def since(self, version: int) -> dict:
+        # Describes the changes after `version`, or returns a full snapshot if that's no longer possible.
+        if version == self.version:
+            return {"version": self.version, "unchanged": True}
+        if version > self.version or version < self._horizon:
+            return self.to_dict()
+
+        added, changed = [], []
+        for mac, device in self._devices.items():
+            if self._created[mac] > version:
+                added.append(device)
+            elif self._modified[mac] > version:
+                changed.append(device)
+
+        removed = [
+            mac for mac, (removed_version, created_version) in self._removed.items()
+            if removed_version > version and created_version <= version
+        ]
+
+        return {"version": self.version, "added": added, "removed": removed, "changed": changed}
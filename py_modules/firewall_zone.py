@@ -0,0 +1,70 @@
+"""
+Provisioning of the muon-hotspot firewalld zone from its current state.
+
+The zone accepts all traffic between hotspot clients, is bound to the AP interface, allows
+DHCP and has masquerading enabled. `plan_zone_commands` compares the desired state with the
+runtime and permanent configuration reported by `firewall-cmd --info-zone` and returns only
+the firewall-cmd calls that are missing. Runtime changes are made directly rather than by
+reloading firewalld, which rebuilds every zone; a reload is only needed when the zone itself
+is created or its target changes, as firewalld can't do either at runtime.
+"""
+
+ZONE_NAME = "muon-hotspot"
+ZONE_TARGET = "ACCEPT"
+ZONE_SERVICES = ("dhcp",)
+
+# firewall-cmd exit codes.
+FIREWALLD_NOT_RUNNING = 252
+INVALID_ZONE = 112
+
+
+def parse_zone_info(text: str) -> dict:
+    # Parses `firewall-cmd [--permanent] --info-zone=ZONE` into
+    # {"target": str, "interfaces": set, "services": set, "masquerade": bool}.
+    fields = {}
+    for line in text.splitlines()[1:]:
+        key, sep, value = line.strip().partition(":")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return {
+        "target": fields.get("target", ""),
+        "interfaces": set(fields.get("interfaces", "").split()),
+        "services": set(fields.get("services", "").split()),
+        "masquerade": fields.get("masquerade") == "yes",
+    }
+
+
+def missing_settings(info: dict, interface: str) -> list:
+    # firewall-cmd options (without --zone) that would bring `info` to the desired state.
+    # The target is left out; it can't be changed at runtime.
+    options = []
+    if interface not in info["interfaces"]:
+        # --change-interface also moves it out of any zone it was bound to before.
+        options.append(f"--change-interface={interface}")
+    if not info["masquerade"]:
+        options.append("--add-masquerade")
+    options.extend(f"--add-service={service}" for service in ZONE_SERVICES if service not in info["services"])
+    return options
+
+
+def plan_zone_commands(runtime, permanent, interface: str) -> list:
+    # Returns firewall-cmd argv lists provisioning the zone. `runtime` and `permanent` are
+    # parse_zone_info results, or None if the zone doesn't exist in that configuration.
+    zone = f"--zone={ZONE_NAME}"
+    commands = []
+    reload = False
+
+    if permanent is None:
+        commands.append(["firewall-cmd", "--permanent", f"--new-zone={ZONE_NAME}"])
+        permanent = {"target": "", "interfaces": set(), "services": set(), "masquerade": False}
+    if permanent["target"] != ZONE_TARGET:
+        commands.append(["firewall-cmd", "--permanent", zone, f"--set-target={ZONE_TARGET}"])
+        reload = True
+    commands.extend(["firewall-cmd", "--permanent", zone, option] for option in missing_settings(permanent, interface))
+
+    if reload or runtime is None or runtime["target"] != ZONE_TARGET:
+        # The runtime zone is missing or stale; it can only be rebuilt from the permanent one.
+        commands.append(["firewall-cmd", "--reload"])
+    else:
+        commands.extend(["firewall-cmd", zone, option] for option in missing_settings(runtime, interface))
+    return commands
@@ -0,0 +1,254 @@
+import asyncio
+import itertools
+import os
+import socket
+
+# hostapd replies are capped at 4096 bytes by default; leave headroom for large STATUS output.
+RECV_BUFFER_SIZE = 16384
+# Guard against a misbehaving STA-NEXT chain looping forever.
+MAX_STATIONS = 2048
+
+_client_counter = itertools.count()
+
+
+class HostapdControlError(Exception):
+    pass
+
+
+def parse_station(reply: str):
+    # Parses a STA-FIRST/STA-NEXT/STA reply: the first line is the MAC, the rest are key=value pairs.
+    lines = reply.strip().splitlines()
+    if not lines or lines[0].startswith("FAIL"):
+        return None, {}
+
+    mac = lines[0].strip().lower()
+    info = {}
+    for line in lines[1:]:
+        if "=" in line:
+            key, value = line.split("=", 1)
+            info[key.strip()] = value.strip()
+    return mac, info
+
+
+def parse_event(message: str):
+    # Splits an unsolicited "<level>EVENT-NAME arg ..." message into (name, [args]).
+    if message.startswith("<") and ">" in message:
+        message = message.split(">", 1)[1]
+    parts = message.strip().split()
+    if not parts:
+        return None, []
+    return parts[0], parts[1:]
+
+
+def channel_frequency(channel: int, hw_mode: str) -> int:
+    # Centre frequency in MHz of a 2.4 GHz (hw_mode b/g) or 5 GHz (hw_mode a) channel.
+    channel = int(channel)
+    if hw_mode == "a":
+        return 5000 + 5 * channel
+    if channel == 14:
+        return 2484
+    return 2407 + 5 * channel
+
+
+def parse_key_values(reply: str) -> dict:
+    # Parses a key=value reply such as STATUS into a dictionary.
+    result = {}
+    for line in reply.splitlines():
+        if "=" in line:
+            key, value = line.split("=", 1)
+            result[key.strip()] = value.strip()
+    return result
+
+
+class HostapdControl:
+    """
+    Persistent asyncio client for hostapd's ctrl_iface UNIX datagram socket.
+
+    One socket is kept open for request/response commands and is transparently
+    re-established when hostapd restarts or the socket disappears.
+    """
+
+    def __init__(self, interface: str, ctrl_dir: str = "/var/run/hostapd", timeout: float = 2.0):
+        self.interface = interface
+        self.ctrl_dir = ctrl_dir
+        self.timeout = timeout
+        self._sock = None
+        self._local_path = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def ctrl_path(self) -> str:
+        return os.path.join(self.ctrl_dir, self.interface)
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def available(self) -> bool:
+        # Cheap check used to decide whether hostapd is reachable without sending anything.
+        return os.path.exists(self.ctrl_path)
+
+    def _connect(self):
+        # hostapd replies to the sender's address, so the client needs its own bound path.
+        local_path = f"/tmp/muon_ctrl_{os.getpid()}-{next(_client_counter)}"
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            if os.path.exists(local_path):
+                os.unlink(local_path)
+            sock.bind(local_path)
+            sock.connect(self.ctrl_path)
+            sock.setblocking(False)
+        except OSError as e:
+            sock.close()
+            if os.path.exists(local_path):
+                os.unlink(local_path)
+            raise HostapdControlError(f"Unable to connect to {self.ctrl_path}: {e}") from e
+
+        self._sock = sock
+        self._local_path = local_path
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._local_path:
+            try:
+                os.unlink(self._local_path)
+            except FileNotFoundError:
+                pass
+            self._local_path = None
+
+    def _drain(self):
+        # Discard late replies from a previously timed-out request so they aren't mistaken for ours.
+        while True:
+            try:
+                self._sock.recv(RECV_BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+
+    async def _roundtrip(self, command: str) -> str:
+        loop = asyncio.get_running_loop()
+        self._drain()
+        await loop.sock_sendall(self._sock, command.encode())
+
+        while True:
+            data = await asyncio.wait_for(loop.sock_recv(self._sock, RECV_BUFFER_SIZE), self.timeout)
+            reply = data.decode(errors="replace")
+            # Unsolicited event messages start with "<level>"; they never answer a request.
+            if not reply.startswith("<"):
+                return reply
+
+    async def request(self, command: str) -> str:
+        # Sends a command and returns the raw reply, reconnecting once if the socket went stale.
+        async with self._lock:
+            for attempt in range(2):
+                if self._sock is None:
+                    self._connect()
+                try:
+                    return await self._roundtrip(command)
+                except (OSError, asyncio.TimeoutError) as e:
+                    self.close()
+                    if attempt:
+                        raise HostapdControlError(f"hostapd command '{command.split()[0]}' failed: {e!r}") from e
+
+    async def ping(self) -> bool:
+        try:
+            return (await self.request("PING")).strip() == "PONG"
+        except HostapdControlError:
+            return False
+
+    async def status(self) -> dict:
+        return parse_key_values(await self.request("STATUS"))
+
+    async def all_stations(self) -> dict:
+        # Walks the station list with STA-FIRST/STA-NEXT, returning {mac: {key: value}}.
+        stations = {}
+        mac, info = parse_station(await self.request("STA-FIRST"))
+        while mac and mac not in stations and len(stations) < MAX_STATIONS:
+            stations[mac] = info
+            mac, info = parse_station(await self.request(f"STA-NEXT {mac}"))
+        return stations
+
+    async def deauthenticate(self, mac: str) -> bool:
+        return (await self.request(f"DEAUTHENTICATE {mac}")).strip() == "OK"
+
+    async def reload(self) -> bool:
+        return (await self.request("RELOAD")).strip() == "OK"
+
+    async def deny_acl_add(self, mac: str) -> bool:
+        # Adds a MAC to the runtime deny list; hostapd disconnects it if it is associated.
+        return (await self.request(f"DENY_ACL ADD_MAC {mac}")).strip() == "OK"
+
+    async def deny_acl_del(self, mac: str) -> bool:
+        return (await self.request(f"DENY_ACL DEL_MAC {mac}")).strip() == "OK"
+
+    async def set(self, key: str, value) -> bool:
+        # Changes a configuration value in the running hostapd; most need a RELOAD to take effect.
+        return (await self.request(f"SET {key} {value}")).strip() == "OK"
+
+    async def chan_switch(self, frequency: int, cs_count: int = 5, *flags: str) -> bool:
+        # Moves the BSS to another channel, announcing it with CSA beacons for `cs_count` beacon
+        # intervals so associated stations follow instead of being dropped.
+        command = " ".join(["CHAN_SWITCH", str(cs_count), str(frequency), *flags])
+        return (await self.request(command)).strip() == "OK"
+
+
+class HostapdEventListener(HostapdControl):
+    """
+    Dedicated ctrl_iface connection registered with ATTACH to receive hostapd events.
+
+    Events arrive on their own socket so they never interleave with request/response
+    traffic. The listener PINGs hostapd when the stream has been idle so that a dead
+    hostapd is noticed even though datagram sockets never report a closed peer.
+    """
+
+    def __init__(self, interface: str, ctrl_dir: str = "/var/run/hostapd", timeout: float = 2.0, ping_interval: float = 10.0):
+        super().__init__(interface, ctrl_dir=ctrl_dir, timeout=timeout)
+        self.ping_interval = ping_interval
+
+    async def attach(self):
+        reply = await self.request("ATTACH")
+        if reply.strip() != "OK":
+            self.close()
+            raise HostapdControlError(f"hostapd refused ATTACH: {reply.strip()}")
+
+    def close(self):
+        # Best-effort DETACH so hostapd stops queueing events for this socket.
+        if self._sock is not None:
+            try:
+                self._sock.send(b"DETACH")
+            except OSError:
+                pass
+        super().close()
+
+    async def events(self):
+        # Yields (event_name, args) until hostapd goes away, then raises HostapdControlError.
+        if self._sock is None:
+            raise HostapdControlError("Event listener is not attached.")
+
+        loop = asyncio.get_running_loop()
+        awaiting_pong = False
+        while True:
+            try:
+                data = await asyncio.wait_for(loop.sock_recv(self._sock, RECV_BUFFER_SIZE), self.ping_interval)
+            except asyncio.TimeoutError:
+                if not self.available():
+                    raise HostapdControlError("hostapd control socket was removed.")
+                if awaiting_pong:
+                    raise HostapdControlError("hostapd stopped responding to PING.")
+                awaiting_pong = True
+                try:
+                    await loop.sock_sendall(self._sock, b"PING")
+                except OSError as e:
+                    raise HostapdControlError(f"hostapd control socket closed: {e!r}") from e
+                continue
+            except OSError as e:
+                raise HostapdControlError(f"hostapd control socket closed: {e!r}") from e
+
+            # Any traffic proves hostapd is still alive.
+            awaiting_pong = False
+            message = data.decode(errors="replace")
+            if message.startswith("<"):
+                name, args = parse_event(message)
+                if name:
+                    yield name, args
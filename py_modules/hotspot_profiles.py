@@ -0,0 +1,221 @@
+import hashlib
+import ipaddress
+import json
+import os
+import re
+
+from atomic_file import atomic_write
+
+# Settings a profile bundles, in the order they are shown.
+PROFILE_FIELDS = (
+    "ssid", "passphrase", "channel", "hw_mode", "country_code",
+    "ip_address", "dhcp_range", "radio_profile", "dscp_priority",
+)
+
+DNSMASQ_LEASE_FILE = "/tmp/muon-dnsmasq.leases"
+DNSMASQ_LOG = "/var/log/dnsmasq.log"
+
+
+class ProfileError(Exception):
+    pass
+
+
+def validate_profile(settings: dict, radio_profiles=("default",)) -> dict:
+    # Checks and normalises a profile's settings; raises ProfileError naming the first bad field.
+    missing = [field for field in PROFILE_FIELDS if field != "dscp_priority" and not str(settings.get(field) or "").strip()]
+    if missing:
+        raise ProfileError(f"Missing {', '.join(missing)}.")
+
+    ssid = str(settings["ssid"])
+    if len(ssid.encode("utf-8")) > 32 or "\n" in ssid:
+        raise ProfileError("SSID must be at most 32 bytes.")
+
+    passphrase = str(settings["passphrase"])
+    if not (8 <= len(passphrase) <= 63 or re.fullmatch(r"[0-9a-fA-F]{64}", passphrase)) or not passphrase.isprintable():
+        raise ProfileError("Passphrase must be 8-63 printable characters.")
+
+    hw_mode = str(settings["hw_mode"])
+    if hw_mode not in ("a", "b", "g"):
+        raise ProfileError("Hardware mode must be a, b or g.")
+
+    channel = str(settings["channel"]).strip().lower()
+    if channel != "auto":
+        if not channel.isdigit():
+            raise ProfileError("Channel must be a number or auto.")
+        if (hw_mode == "a") != (int(channel) >= 32) or not 1 <= int(channel) <= 177:
+            raise ProfileError(f"Channel {channel} is not in the {'5' if hw_mode == 'a' else '2.4'} GHz band.")
+
+    country_code = str(settings["country_code"]).strip().upper()
+    if not re.fullmatch(r"[A-Z]{2}", country_code):
+        raise ProfileError("Country code must be two letters.")
+
+    try:
+        ip = ipaddress.IPv4Address(str(settings["ip_address"]).strip())
+        parts = str(settings["dhcp_range"]).split(",")
+        start, end = ipaddress.IPv4Address(parts[0].strip()), ipaddress.IPv4Address(parts[1].strip())
+        lease_time = parts[2].strip() if len(parts) > 2 else "12h"
+    except (ValueError, IndexError):
+        raise ProfileError("IP address and DHCP range must be IPv4 addresses.") from None
+    network = ipaddress.IPv4Network(f"{ip}/24", strict=False)
+    if not ip.is_private or start not in network or end not in network or int(start) >= int(end):
+        raise ProfileError("IP address and DHCP range must be private and in the same /24, with start before end.")
+    if not re.fullmatch(r"\d+[smhd]?|infinite", lease_time):
+        raise ProfileError("DHCP lease time must look like 12h.")
+
+    radio_profile = str(settings["radio_profile"])
+    if radio_profile not in radio_profiles:
+        raise ProfileError(f"Unknown radio profile '{radio_profile}'.")
+
+    dscp_priority = settings.get("dscp_priority", False)
+    return {
+        "ssid": ssid,
+        "passphrase": passphrase,
+        "channel": channel,
+        "hw_mode": hw_mode,
+        "country_code": country_code,
+        "ip_address": str(ip),
+        "dhcp_range": f"{start},{end},{lease_time}",
+        "radio_profile": radio_profile,
+        "dscp_priority": dscp_priority is True or str(dscp_priority).lower() == "true",
+    }
+
+
+def render_dnsmasq_config(interface: str, dhcp_range: str, ip_address: str, log_dhcp: bool = False) -> str:
+    # Same configuration start_dhcp_server.sh generates with a heredoc. log-dhcp logs every
+    # DHCP request in detail, so it is only included on request.
+    return "\n".join([
+        f"interface={interface}",
+        "bind-dynamic",
+        f"dhcp-range={dhcp_range}",
+        f"dhcp-option=3,{ip_address}",  # Gateway
+        "dhcp-option=6,1.1.1.1,8.8.8.8",  # DNS for clients
+        "port=0",  # Disable DNS serving
+    ] + (["log-dhcp"] if log_dhcp else []) + [
+        f"log-facility={DNSMASQ_LOG}",
+        "dhcp-broadcast",
+        f"dhcp-leasefile={DNSMASQ_LEASE_FILE}",
+    ]) + "\n"
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class ArtifactCache:
+    """
+    Rendered config files stored by content hash, with an index from a hash of the
+    inputs that produced them. A config is rendered once per distinct set of inputs;
+    after that it is a lookup and a file read. The index keeps the most recent
+    `max_entries` input sets and files no longer referenced are deleted.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 64):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.index_path = os.path.join(directory, "index.json")
+        self._index = None
+
+    @staticmethod
+    def inputs_key(kind: str, inputs: dict) -> str:
+        return _hash(json.dumps([kind, inputs], sort_keys=True).encode("utf-8"))
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            try:
+                with open(self.index_path, "r") as f:
+                    self._index = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = {}
+        return self._index
+
+    def path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f"{content_hash}.conf")
+
+    def lookup(self, kind: str, inputs: dict):
+        # Returns the path of the artifact rendered from `inputs`, or None.
+        content_hash = self._load_index().get(self.inputs_key(kind, inputs))
+        if content_hash is None or not os.path.exists(self.path(content_hash)):
+            return None
+        return self.path(content_hash)
+
+    def store(self, kind: str, inputs: dict, content: str) -> str:
+        # Saves rendered content (once per distinct content) and indexes it; returns its path.
+        index = self._load_index()
+        content_hash = _hash(content.encode("utf-8"))
+        path = self.path(content_hash)
+        if not os.path.exists(path):
+            # Contains passphrases; readable by the plugin (root) only.
+            atomic_write(path, content, mode=0o600)
+
+        key = self.inputs_key(kind, inputs)
+        index.pop(key, None)
+        index[key] = content_hash
+        while len(index) > self.max_entries:
+            index.pop(next(iter(index)))
+        # The keys hash the inputs, passphrase included; keep them as private as the configs.
+        atomic_write(self.index_path, json.dumps(index), mode=0o600)
+        self._remove_unreferenced(set(index.values()))
+        return path
+
+    def _remove_unreferenced(self, referenced: set):
+        for name in os.listdir(self.directory):
+            if name.endswith(".conf") and name[:-5] not in referenced:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+class ProfileStore:
+    """
+    Named profiles in one JSON file, {"active": name, "profiles": {name: settings}}.
+    Every change rewrites the whole file atomically, so a profile is saved in one step.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = None
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._data = {"active": data.get("active"), "profiles": dict(data.get("profiles") or {})}
+            except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+                self._data = {"active": None, "profiles": {}}
+        return self._data
+
+    def _save(self):
+        atomic_write(self.path, json.dumps(self._data, indent=2), mode=0o600)
+
+    @property
+    def active(self):
+        return self._load()["active"]
+
+    def names(self) -> list:
+        return list(self._load()["profiles"])
+
+    def get(self, name: str):
+        profile = self._load()["profiles"].get(name)
+        return dict(profile) if profile is not None else None
+
+    def save(self, name: str, settings: dict, active: bool = False):
+        data = self._load()
+        data["profiles"][name] = dict(settings)
+        if active:
+            data["active"] = name
+        self._save()
+
+    def delete(self, name: str) -> bool:
+        data = self._load()
+        if data["profiles"].pop(name, None) is None:
+            return False
+        if data["active"] == name:
+            data["active"] = None
+        self._save()
+        return True
+
+    def set_active(self, name):
+        self._load()["active"] = name
+        self._save()
@@ -0,0 +1,159 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+from collections import namedtuple
+
+Lease = namedtuple("Lease", ["ip", "hostname", "expiry"])
+
+# inotify event bits we care about (see inotify(7)).
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def parse_leases(text: str) -> dict:
+    # Parses dnsmasq lease lines: "<expiry> <mac> <ip> <hostname> <client-id>".
+    leases = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        try:
+            expiry = int(parts[0])
+        except ValueError:
+            continue
+        leases[parts[1].lower()] = Lease(parts[2], parts[3], expiry)
+    return leases
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class DhcpLeaseIndex:
+    """
+    In-memory MAC -> Lease index over dnsmasq's lease file.
+
+    The file is only reparsed after it changes: inotify marks the index dirty when
+    available, otherwise each access compares the file's mtime/size/inode against the
+    last parse. A missing file is treated as an empty index.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._leases = {}
+        self._signature = None
+        self._dirty = True
+        self._inotify_fd = None
+
+    @property
+    def watching(self) -> bool:
+        return self._inotify_fd is not None
+
+    def start(self) -> bool:
+        # Begins watching the lease file's directory. Returns False if inotify is unavailable,
+        # in which case the index falls back to stat-based change detection.
+        if self._inotify_fd is not None:
+            return True
+
+        libc = _load_libc()
+        if libc is None:
+            return False
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return False
+
+        directory = os.path.dirname(self.path) or "."
+        if libc.inotify_add_watch(fd, directory.encode(), WATCH_MASK) < 0:
+            os.close(fd)
+            return False
+
+        asyncio.get_running_loop().add_reader(fd, self._on_inotify)
+        self._inotify_fd = fd
+        self._dirty = True
+        return True
+
+    def stop(self):
+        if self._inotify_fd is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._inotify_fd)
+            except RuntimeError:
+                pass
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _on_inotify(self):
+        name = os.path.basename(self.path).encode()
+        try:
+            data = os.read(self._inotify_fd, 8192)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            event_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW or event_name == name:
+                self._dirty = True
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def refresh(self) -> bool:
+        # Reparses the lease file if it changed since the last parse. Returns True if it did.
+        if self.watching:
+            if not self._dirty:
+                return False
+            self._dirty = False
+
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return False
+
+        try:
+            with open(self.path, "r") as f:
+                text = f.read()
+        except FileNotFoundError:
+            signature, text = None, ""
+
+        self._leases = parse_leases(text)
+        self._signature = signature
+        return True
+
+    def leases(self, now: float = None) -> dict:
+        # Returns all unexpired leases. An expiry of 0 means the lease never expires.
+        self.refresh()
+        now = time.time() if now is None else now
+        return {mac: lease for mac, lease in self._leases.items() if not lease.expiry or lease.expiry > now}
+
+    def lookup(self, mac: str, now: float = None):
+        self.refresh()
+        lease = self._leases.get(mac.lower())
+        if lease is None:
+            return None
+        now = time.time() if now is None else now
+        if lease.expiry and lease.expiry <= now:
+            return None
+        return lease
@@ -0,0 +1,106 @@
+"""
+Filters for the plugin logger: secret redaction and rate limiting of repeated messages.
+
+Rate limiting runs on the plugin logger, after its level check. Redaction runs on the
+handlers the logger's records reach, so it covers records propagated from other loggers
+too and only formats records a handler will actually emit. Messages should be logged with
+%-style arguments rather than f-strings so they are only formatted when emitted.
+"""
+import logging
+import re
+import time
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+# key=value / key: value pairs whose value is a secret, as in hostapd configs, SET commands and
+# dict reprs. A quoted value is redacted up to its closing quote, anything else to the end of
+# the line, since passphrases may contain spaces.
+SECRET_PATTERN = re.compile(
+    r"((?:wpa_)?passphrase|wpa_psk|password)([\"']?\s*[=:]\s*)(?:([\"'])[^\n]*?(?:\3|$)|[^\n]*)",
+    re.IGNORECASE | re.MULTILINE,
+)
+REDACTED = "********"
+
+
+def every(seconds: float) -> dict:
+    # `extra` for a log call in a loop: emit it at most once per `seconds` per call site.
+    return {"rate_limit": seconds}
+
+
+class RedactingFilter(logging.Filter):
+    """
+    Replaces secrets in log messages: values of passphrase-like keys, and any string
+    returned by `secrets` (e.g. the current passphrase) wherever it appears.
+    """
+
+    def __init__(self, secrets=lambda: ()):
+        super().__init__()
+        self.secrets = secrets
+
+    def redact(self, message: str) -> str:
+        message = SECRET_PATTERN.sub(lambda m: f"{m.group(1)}{m.group(2)}{m.group(3) or ''}{REDACTED}{m.group(3) or ''}", message)
+        for secret in self.secrets():
+            if secret and len(secret) >= 4:
+                message = message.replace(secret, REDACTED)
+        return message
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # A record reaching several handlers is only redacted by the first.
+        if getattr(record, "redacted", False):
+            return True
+        message = record.getMessage()
+        redacted = self.redact(message)
+        if redacted != message:
+            record.msg, record.args = redacted, ()
+        record.redacted = True
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops records logged with extra=every(seconds) if the same call site emitted one less
+    than `seconds` ago. The next record let through reports how many were dropped.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        super().__init__()
+        self.clock = clock
+        # (path, line) -> [time of the last emitted record, records dropped since]
+        self.sites = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        interval = getattr(record, "rate_limit", None)
+        if interval is None:
+            return True
+        now = self.clock()
+        site = self.sites.get((record.pathname, record.lineno))
+        if site is not None and now - site[0] < interval:
+            site[1] += 1
+            return False
+        if site is not None and site[1]:
+            record.msg = f"{record.msg} (repeated {site[1]} times)"
+        self.sites[(record.pathname, record.lineno)] = [now, 0]
+        return True
+
+
+def reached_handlers(logger: logging.Logger) -> list:
+    # Handlers a record logged on `logger` is passed to, following propagation.
+    handlers = []
+    while logger is not None:
+        handlers.extend(handler for handler in logger.handlers if handler not in handlers)
+        logger = logger.parent if logger.propagate else None
+    return handlers
+
+
+def install(logger: logging.Logger, secrets=lambda: ()):
+    # Adds rate limiting to `logger` and redaction to the handlers its records reach (to the
+    # logger itself if there are none yet), replacing any installed before. Records dropped by
+    # the rate limit or a handler's level are never redacted.
+    for target in [logger] + reached_handlers(logger):
+        for existing in list(target.filters):
+            if isinstance(existing, (RateLimitFilter, RedactingFilter)):
+                target.removeFilter(existing)
+    logger.addFilter(RateLimitFilter())
+    redacting = RedactingFilter(secrets)
+    for target in reached_handlers(logger) or [logger]:
+        target.addFilter(redacting)
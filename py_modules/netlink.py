@@ -0,0 +1,386 @@
+import asyncio
+import errno
+import ipaddress
+import os
+import socket
+import struct
+
+# Minimal asyncio netlink client covering what hotspot bring-up needs: rtnetlink for
+# links and addresses, and nl80211 (via generic netlink) for PHY lookup and virtual
+# interface management. Every change is sent with NLM_F_ACK, so callers know the
+# kernel applied it without sleeping and re-checking.
+
+NETLINK_ROUTE = 0
+NETLINK_GENERIC = 16
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLM_F_REQUEST = 0x001
+NLM_F_MULTI = 0x002
+NLM_F_ACK = 0x004
+NLM_F_DUMP = 0x300
+NLM_F_EXCL = 0x200
+NLM_F_CREATE = 0x400
+
+NLA_F_NESTED = 0x8000
+NLA_F_NET_BYTEORDER = 0x4000
+NLA_TYPE_MASK = ~(NLA_F_NESTED | NLA_F_NET_BYTEORDER)
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+IFLA_IFNAME = 3
+IFLA_LINKINFO = 18
+IFLA_INFO_KIND = 1
+IFLA_INFO_DATA = 2
+VETH_INFO_PEER = 1
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_BROADCAST = 4
+
+IFF_UP = 0x1
+
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+
+NL80211_CMD_GET_INTERFACE = 5
+NL80211_CMD_NEW_INTERFACE = 7
+NL80211_CMD_DEL_INTERFACE = 8
+NL80211_ATTR_WIPHY = 1
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_IFNAME = 4
+NL80211_ATTR_IFTYPE = 5
+NL80211_IFTYPE_AP = 3
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_NLATTR = struct.Struct("=HH")
+_IFINFOMSG = struct.Struct("=BxHiII")
+_IFADDRMSG = struct.Struct("=BBBBI")
+_GENLMSGHDR = struct.Struct("=BBH")
+_NLMSGERR = struct.Struct("=i")
+
+
+class NetlinkError(OSError):
+    pass
+
+
+class FamilyNotFound(NetlinkError):
+    # The kernel has no such generic netlink family, e.g. nl80211 without cfg80211 loaded.
+    pass
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def pack_attr(attr_type: int, value: bytes) -> bytes:
+    length = _NLATTR.size + len(value)
+    return _NLATTR.pack(length, attr_type) + value + b"\0" * (_align(length) - length)
+
+
+def pack_str(attr_type: int, value: str) -> bytes:
+    return pack_attr(attr_type, value.encode() + b"\0")
+
+
+def pack_u32(attr_type: int, value: int) -> bytes:
+    return pack_attr(attr_type, struct.pack("=I", value))
+
+
+def pack_nested(attr_type: int, *attrs: bytes) -> bytes:
+    return pack_attr(attr_type | NLA_F_NESTED, b"".join(attrs))
+
+
+def parse_attrs(data: bytes, offset: int = 0) -> dict:
+    # Returns {attr_type: raw payload}; nested attributes can be parsed again with parse_attrs.
+    attrs = {}
+    while offset + _NLATTR.size <= len(data):
+        length, attr_type = _NLATTR.unpack_from(data, offset)
+        if length < _NLATTR.size:
+            break
+        attrs[attr_type & NLA_TYPE_MASK] = data[offset + _NLATTR.size:offset + length]
+        offset += _align(length)
+    return attrs
+
+
+def attr_str(value: bytes) -> str:
+    return value.split(b"\0", 1)[0].decode()
+
+
+def attr_u32(value: bytes) -> int:
+    return struct.unpack_from("=I", value)[0]
+
+
+class NetlinkSocket:
+    # One netlink socket with request/acknowledgement handling. Requests are serialised.
+
+    def __init__(self, protocol: int, timeout: float = 2.0):
+        self.timeout = timeout
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, protocol)
+        self._sock.bind((0, 0))
+        self._sock.setblocking(False)
+        self._seq = 0
+        self._lock = asyncio.Lock()
+
+    def close(self):
+        self._sock.close()
+
+    async def request(self, msg_type: int, flags: int, payload: bytes) -> list:
+        # Sends one message and returns the [(msg_type, body)] replies. Non-dump requests
+        # wait for the kernel's acknowledgement; errors raise NetlinkError.
+        dump = flags & NLM_F_DUMP == NLM_F_DUMP
+        flags |= NLM_F_REQUEST
+        if not dump:
+            flags |= NLM_F_ACK
+
+        async with self._lock:
+            self._seq += 1
+            seq = self._seq
+            message = _NLMSGHDR.pack(_NLMSGHDR.size + len(payload), msg_type, flags, seq, 0) + payload
+            await asyncio.get_running_loop().sock_sendall(self._sock, message)
+            return await asyncio.wait_for(self._collect(seq), self.timeout)
+
+    async def _collect(self, seq: int) -> list:
+        loop = asyncio.get_running_loop()
+        replies = []
+        while True:
+            data = await loop.sock_recv(self._sock, 65536)
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                length, msg_type, _, msg_seq, _ = _NLMSGHDR.unpack_from(data, offset)
+                if length < _NLMSGHDR.size:
+                    break
+                body = data[offset + _NLMSGHDR.size:offset + length]
+                offset += _align(length)
+
+                # Ignore stragglers from an earlier, timed-out request.
+                if msg_seq != seq:
+                    continue
+                if msg_type == NLMSG_ERROR:
+                    code = -_NLMSGERR.unpack_from(body)[0]
+                    if code:
+                        raise NetlinkError(code, os.strerror(code))
+                    return replies
+                if msg_type == NLMSG_DONE:
+                    return replies
+                replies.append((msg_type, body))
+
+
+class RouteNetlink:
+    # rtnetlink operations on links and addresses.
+
+    def __init__(self, timeout: float = 2.0):
+        self.nl = NetlinkSocket(NETLINK_ROUTE, timeout=timeout)
+
+    def close(self):
+        self.nl.close()
+
+    async def get_link(self, name: str):
+        # Returns {"index", "name", "up"} for a link, or None if it doesn't exist.
+        payload = _IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0) + pack_str(IFLA_IFNAME, name)
+        try:
+            replies = await self.nl.request(RTM_GETLINK, 0, payload)
+        except NetlinkError as e:
+            if e.errno == errno.ENODEV:
+                return None
+            raise
+
+        for msg_type, body in replies:
+            if msg_type == RTM_NEWLINK:
+                _, _, index, flags, _ = _IFINFOMSG.unpack_from(body)
+                attrs = parse_attrs(body, _IFINFOMSG.size)
+                return {"index": index, "name": attr_str(attrs.get(IFLA_IFNAME, b"")), "up": bool(flags & IFF_UP)}
+        return None
+
+    async def link_index(self, name: str) -> int:
+        link = await self.get_link(name)
+        if link is None:
+            raise NetlinkError(errno.ENODEV, f"No such interface: {name}")
+        return link["index"]
+
+    async def set_link_up(self, name: str, up: bool = True):
+        index = await self.link_index(name)
+        payload = _IFINFOMSG.pack(socket.AF_UNSPEC, 0, index, IFF_UP if up else 0, IFF_UP)
+        await self.nl.request(RTM_NEWLINK, 0, payload)
+
+    async def create_link(self, name: str, kind: str, peer: str = None):
+        # Creates a software link such as "dummy" or a "veth" pair (used for testing in a network namespace).
+        info = pack_str(IFLA_INFO_KIND, kind)
+        if peer is not None:
+            peer_info = _IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0) + pack_str(IFLA_IFNAME, peer)
+            info += pack_nested(IFLA_INFO_DATA, pack_attr(VETH_INFO_PEER, peer_info))
+        payload = _IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0) + pack_str(IFLA_IFNAME, name) + pack_nested(IFLA_LINKINFO, info)
+        await self.nl.request(RTM_NEWLINK, NLM_F_CREATE | NLM_F_EXCL, payload)
+
+    async def delete_link(self, name: str):
+        index = await self.link_index(name)
+        await self.nl.request(RTM_DELLINK, 0, _IFINFOMSG.pack(socket.AF_UNSPEC, 0, index, 0, 0))
+
+    async def get_addresses(self, name: str, family: int = socket.AF_INET) -> list:
+        # Returns ["ip/prefixlen", ...] configured on a link.
+        index = await self.link_index(name)
+        replies = await self.nl.request(RTM_GETADDR, NLM_F_DUMP, _IFADDRMSG.pack(family, 0, 0, 0, 0))
+
+        addresses = []
+        for msg_type, body in replies:
+            if msg_type != RTM_NEWADDR:
+                continue
+            addr_family, prefixlen, _, _, addr_index = _IFADDRMSG.unpack_from(body)
+            if addr_index != index:
+                continue
+            attrs = parse_attrs(body, _IFADDRMSG.size)
+            raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+            if raw:
+                addresses.append(f"{socket.inet_ntop(addr_family, raw)}/{prefixlen}")
+        return addresses
+
+    def _address_payload(self, index: int, address: str) -> bytes:
+        interface = ipaddress.ip_interface(address)
+        family = socket.AF_INET if interface.version == 4 else socket.AF_INET6
+        payload = _IFADDRMSG.pack(family, interface.network.prefixlen, 0, 0, index)
+        payload += pack_attr(IFA_LOCAL, interface.ip.packed) + pack_attr(IFA_ADDRESS, interface.ip.packed)
+        if interface.version == 4 and interface.network.prefixlen < 31:
+            payload += pack_attr(IFA_BROADCAST, interface.network.broadcast_address.packed)
+        return payload
+
+    async def add_address(self, name: str, address: str):
+        # Adds an "ip/prefixlen" address to a link.
+        index = await self.link_index(name)
+        await self.nl.request(RTM_NEWADDR, NLM_F_CREATE | NLM_F_EXCL, self._address_payload(index, address))
+
+    async def delete_address(self, name: str, address: str):
+        index = await self.link_index(name)
+        await self.nl.request(RTM_DELADDR, 0, self._address_payload(index, address))
+
+    async def flush_addresses(self, name: str, family: int = socket.AF_INET):
+        for address in await self.get_addresses(name, family):
+            await self.delete_address(name, address)
+
+
+class GenericNetlink:
+    # Generic netlink with cached family-name resolution.
+
+    def __init__(self, timeout: float = 2.0):
+        self.nl = NetlinkSocket(NETLINK_GENERIC, timeout=timeout)
+        self._families = {}
+
+    def close(self):
+        self.nl.close()
+
+    async def family_id(self, name: str) -> int:
+        if name not in self._families:
+            try:
+                replies = await self.request(GENL_ID_CTRL, CTRL_CMD_GETFAMILY, pack_str(CTRL_ATTR_FAMILY_NAME, name))
+            except NetlinkError as e:
+                # The controller answers an unknown family with ENOENT.
+                if e.errno != errno.ENOENT:
+                    raise
+                replies = []
+            for attrs in replies:
+                if CTRL_ATTR_FAMILY_ID in attrs:
+                    self._families[name] = struct.unpack_from("=H", attrs[CTRL_ATTR_FAMILY_ID])[0]
+                    break
+            else:
+                raise FamilyNotFound(errno.ENOENT, f"Generic netlink family not found: {name}")
+        return self._families[name]
+
+    async def request(self, family: int, cmd: int, attrs: bytes = b"", flags: int = 0) -> list:
+        # Returns the attribute dictionaries of each reply.
+        replies = await self.nl.request(family, flags, _GENLMSGHDR.pack(cmd, 1, 0) + attrs)
+        return [parse_attrs(body, _GENLMSGHDR.size) for _, body in replies]
+
+
+class Nl80211:
+    # The handful of nl80211 commands `iw` was used for.
+
+    def __init__(self, genl: GenericNetlink):
+        self.genl = genl
+
+    async def _request(self, cmd: int, attrs: bytes) -> list:
+        return await self.genl.request(await self.genl.family_id("nl80211"), cmd, attrs)
+
+    async def get_wiphy(self, ifindex: int) -> int:
+        for attrs in await self._request(NL80211_CMD_GET_INTERFACE, pack_u32(NL80211_ATTR_IFINDEX, ifindex)):
+            if NL80211_ATTR_WIPHY in attrs:
+                return attr_u32(attrs[NL80211_ATTR_WIPHY])
+        raise NetlinkError(errno.ENODEV, f"Interface {ifindex} is not a wireless device")
+
+    async def new_interface(self, wiphy: int, name: str, iftype: int = NL80211_IFTYPE_AP) -> int:
+        # Creates a virtual interface on a PHY and returns its ifindex.
+        attrs = pack_u32(NL80211_ATTR_WIPHY, wiphy) + pack_str(NL80211_ATTR_IFNAME, name) + pack_u32(NL80211_ATTR_IFTYPE, iftype)
+        for reply in await self._request(NL80211_CMD_NEW_INTERFACE, attrs):
+            if NL80211_ATTR_IFINDEX in reply:
+                return attr_u32(reply[NL80211_ATTR_IFINDEX])
+        return None
+
+    async def del_interface(self, ifindex: int):
+        await self._request(NL80211_CMD_DEL_INTERFACE, pack_u32(NL80211_ATTR_IFINDEX, ifindex))
+
+
+class NetlinkBackend:
+    """
+    In-process replacement for the `ip`/`iw` chain in start_hotspot.sh.
+
+    Each step is acknowledged by the kernel, so no settling sleeps are needed.
+    Raises NetlinkError (an OSError) if any step fails, letting callers fall back
+    to the shell script.
+    """
+
+    def __init__(self, timeout: float = 2.0):
+        self.route = RouteNetlink(timeout=timeout)
+        self.genl = GenericNetlink(timeout=timeout)
+        self.nl80211 = Nl80211(self.genl)
+
+    def close(self):
+        self.route.close()
+        self.genl.close()
+
+    async def has_nl80211(self) -> bool:
+        # False if the kernel has no nl80211 family (no cfg80211), so the PHY steps can't run here.
+        try:
+            await self.genl.family_id("nl80211")
+            return True
+        except FamilyNotFound:
+            return False
+
+    async def get_phy(self, ifname: str) -> int:
+        # Equivalent of `iw dev <ifname> info | awk '/wiphy/'`.
+        return await self.nl80211.get_wiphy(await self.route.link_index(ifname))
+
+    def set_ipv6_disabled(self, ifname: str, disabled: bool = True):
+        path = f"/proc/sys/net/ipv6/conf/{ifname}/disable_ipv6"
+        if os.path.exists(path):
+            with open(path, "w") as f:
+                f.write("1" if disabled else "0")
+
+    async def configure_address(self, ifname: str, address: str):
+        # Brings a link up with exactly one IPv4 address and verifies it took.
+        await self.route.set_link_up(ifname)
+        self.set_ipv6_disabled(ifname)
+        await self.route.flush_addresses(ifname)
+        await self.route.add_address(ifname, address)
+
+        addresses = await self.route.get_addresses(ifname)
+        if address not in addresses:
+            raise NetlinkError(errno.EADDRNOTAVAIL, f"{address} missing from {ifname} after assignment: {addresses}")
+
+    async def setup_ap_interface(self, wifi_interface: str, ap_interface: str, address: str) -> int:
+        # Recreates `ap_interface` as an AP on the same PHY as `wifi_interface` and assigns `address`.
+        # Returns the PHY index used.
+        phy = await self.get_phy(wifi_interface)
+
+        existing = await self.route.get_link(ap_interface)
+        if existing is not None:
+            await self.nl80211.del_interface(existing["index"])
+
+        await self.route.set_link_up(wifi_interface, False)
+        await self.nl80211.new_interface(phy, ap_interface, NL80211_IFTYPE_AP)
+        await self.configure_address(ap_interface, address)
+        return phy
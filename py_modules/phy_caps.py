@@ -0,0 +1,204 @@
+import re
+
+from channel_select import channel_to_freq, parse_phy_channels
+
+# iw's HT capability lines -> hostapd ht_capab flags.
+HT_FLAGS = {
+    "RX LDPC": "[LDPC]",
+    "RX HT20 SGI": "[SHORT-GI-20]",
+    "RX HT40 SGI": "[SHORT-GI-40]",
+    "TX STBC": "[TX-STBC]",
+    "RX STBC 1-stream": "[RX-STBC1]",
+    "RX STBC 2-streams": "[RX-STBC12]",
+    "RX STBC 3-streams": "[RX-STBC123]",
+    "Max AMSDU length: 7935 bytes": "[MAX-AMSDU-7935]",
+    "DSSS/CCK HT40": "[DSSS_CCK-40]",
+}
+
+# iw's VHT capability lines -> hostapd vht_capab flags.
+VHT_FLAGS = {
+    "Max MPDU length: 7991": "[MAX-MPDU-7991]",
+    "Max MPDU length: 11454": "[MAX-MPDU-11454]",
+    "Supported Channel Width: 160 MHz": "[VHT160]",
+    "Supported Channel Width: 160 MHz, 80+80 MHz": "[VHT160-80PLUS80]",
+    "RX LDPC": "[RXLDPC]",
+    "short GI (80 MHz)": "[SHORT-GI-80]",
+    "short GI (160/80+80 MHz)": "[SHORT-GI-160]",
+    "TX STBC": "[TX-STBC-2BY1]",
+    "SU Beamformer": "[SU-BEAMFORMER]",
+    "SU Beamformee": "[SU-BEAMFORMEE]",
+    "MU Beamformer": "[MU-BEAMFORMER]",
+    "MU Beamformee": "[MU-BEAMFORMEE]",
+}
+
+# First channel of each 5 GHz 80 MHz and 160 MHz block.
+VHT80_BLOCKS = (36, 52, 100, 116, 132, 149)
+VHT160_BLOCKS = (36, 100)
+
+# hostapd vht_oper_chwidth / he_oper_chwidth values.
+CHWIDTH = {20: 0, 40: 0, 80: 1, 160: 2}
+# HE PHY capability line needed to run HE at each wide channel width.
+HE_WIDTH_CAPS = {80: "HE40/HE80/5GHz", 160: "HE160/5GHz"}
+
+
+def _depth(line: str) -> int:
+    return len(line) - len(line.lstrip("\t"))
+
+
+def parse_phy_info(text: str) -> dict:
+    # Parses `iw phy <phy> info` into {"bands": {"g" | "a": {...}}}. Each band has the raw
+    # "ht" and "vht" capability lines, "he" (whether HE is offered in AP mode), the
+    # "he_phy" capability lines and its "channels" (see channel_select.parse_phy_channels).
+    bands = []
+    band = section = None
+    for line in text.splitlines():
+        depth, stripped = _depth(line), line.strip()
+        if not stripped:
+            continue
+        if depth <= 1:
+            band = section = None
+            if re.match(r"Band \d+:", stripped):
+                band = {"ht": [], "vht": [], "he": False, "he_phy": [], "frequencies": []}
+                bands.append(band)
+            continue
+        if band is None:
+            continue
+
+        if depth == 2:
+            if stripped.startswith("Capabilities: 0x"):
+                section = "ht"
+            elif stripped.startswith("VHT Capabilities"):
+                section = "vht"
+            elif stripped.startswith("HE Iftypes:"):
+                section = "he"
+                band["he"] = band["he"] or "AP" in stripped.split(":", 1)[1].replace(" ", "").split(",")
+            elif stripped.startswith("Frequencies:"):
+                section = "frequencies"
+            else:
+                section = None
+            continue
+
+        if section in ("ht", "vht", "frequencies"):
+            band[section].append(stripped if section != "frequencies" else line)
+        elif section == "he":
+            band["he_phy"].append(stripped)
+
+    result = {}
+    for band in bands:
+        channels = parse_phy_channels("\n".join(band.pop("frequencies")))
+        if not channels:
+            continue
+        name = "a" if 5000 < channels[0]["freq"] < 5900 else "g" if channels[0]["freq"] < 2500 else None
+        if name is None:
+            # 6 GHz needs WPA3/SAE, which the generated config doesn't use.
+            continue
+        band["channels"] = channels
+        result[name] = band
+    return {"bands": result}
+
+
+def usable_channels(band: dict) -> set:
+    return {c["channel"] for c in band.get("channels", []) if not (c["disabled"] or c["radar"] or c["no_ir"])}
+
+
+def _ht40_partner(channel: int):
+    # The secondary 20 MHz channel for a 5 GHz HT40 pair, as (offset, channel).
+    if channel == 165 or channel < 36:
+        return None
+    base = 149 if channel >= 149 else 36
+    if ((channel - base) // 4) % 2 == 0:
+        return 1, channel + 4
+    return -1, channel - 4
+
+
+def _block(channel: int, starts, size: int):
+    for start in starts:
+        channels = [start + 4 * i for i in range(size)]
+        if channel in channels:
+            return channels
+    return None
+
+
+def radio_params(caps: dict, channel, hw_mode: str) -> dict:
+    # Picks the widest HT/VHT/HE operation the PHY supports on `channel` without touching
+    # DFS or disallowed channels, and returns {"lines", "width", "sec_offset", "center_channel",
+    # "ht", "vht", "he"}. Without probed capabilities it returns the historical defaults.
+    channel = int(channel)
+    if not caps or ("a" if hw_mode == "a" else "g") not in caps.get("bands", {}):
+        lines = ["ieee80211n=1"]
+        if hw_mode == "a":
+            lines += ["ieee80211ac=1", "ht_capab=[HT40+]"]
+        return {"lines": lines, "width": 40 if hw_mode == "a" else 20, "sec_offset": 1 if hw_mode == "a" else 0,
+                "center_channel": None, "ht": True, "vht": hw_mode == "a", "he": False}
+
+    band = caps["bands"]["a" if hw_mode == "a" else "g"]
+    allowed = usable_channels(band)
+    ht, vht, he = bool(band["ht"]), hw_mode == "a" and bool(band["vht"]), band["he"]
+    width, sec_offset, center = 20, 0, None
+
+    if hw_mode == "a" and ht and "HT20/HT40" in band["ht"]:
+        partner = _ht40_partner(channel)
+        if partner and partner[1] in allowed:
+            width, sec_offset, center = 40, partner[0], channel + 2 * partner[0]
+    if vht and width == 40:
+        block = _block(channel, VHT80_BLOCKS, 4)
+        if block and all(c in allowed for c in block):
+            width, center = 80, block[0] + 6
+            block = _block(channel, VHT160_BLOCKS, 8)
+            if block and "Supported Channel Width: 160 MHz" in " ".join(band["vht"]) and all(c in allowed for c in block):
+                width, center = 160, block[0] + 14
+    # 2.4 GHz stays at 20 MHz: 40 MHz there overlaps most of the band and is rarely granted
+    # by 20/40 coexistence rules in crowded environments anyway.
+
+    lines = []
+    if ht:
+        flags = [HT_FLAGS[line] for line in band["ht"] if line in HT_FLAGS]
+        if width < 40:
+            flags = [f for f in flags if f not in ("[SHORT-GI-40]", "[DSSS_CCK-40]")]
+        else:
+            flags.insert(0, "[HT40+]" if sec_offset > 0 else "[HT40-]")
+        lines.append("ieee80211n=1")
+        if flags:
+            lines.append("ht_capab=" + "".join(flags))
+    if vht:
+        flags = [VHT_FLAGS[line] for line in band["vht"] if line in VHT_FLAGS]
+        if width < 160:
+            flags = [f for f in flags if f not in ("[VHT160]", "[VHT160-80PLUS80]", "[SHORT-GI-160]")]
+        lines.append("ieee80211ac=1")
+        if flags:
+            lines.append("vht_capab=" + "".join(flags))
+        lines.append(f"vht_oper_chwidth={CHWIDTH[width]}")
+        if width >= 80:
+            lines.append(f"vht_oper_centr_freq_seg0_idx={center}")
+    if he:
+        lines.append("ieee80211ax=1")
+        if hw_mode == "a" and (width < 80 or HE_WIDTH_CAPS[width] in band["he_phy"]):
+            lines.append(f"he_oper_chwidth={CHWIDTH[width]}")
+            if width >= 80:
+                lines.append(f"he_oper_centr_freq_seg0_idx={center}")
+
+    return {"lines": lines, "width": width, "sec_offset": sec_offset, "center_channel": center, "ht": ht, "vht": vht, "he": he}
+
+
+def span_channels(params: dict, channel) -> list:
+    # The 20 MHz channels occupied by an AP on `channel` with radio_params `params`.
+    channel = int(channel)
+    if params["width"] >= 80 and params["center_channel"]:
+        half = params["width"] // 10 - 2
+        return list(range(params["center_channel"] - half, params["center_channel"] + half + 1, 4))
+    if params["width"] == 40 and params["sec_offset"]:
+        return sorted([channel, channel + 4 * params["sec_offset"]])
+    return [channel]
+
+
+def chan_switch_flags(params: dict) -> list:
+    # Arguments for hostapd's CHAN_SWITCH that keep the width chosen by radio_params.
+    flags = []
+    if params["sec_offset"]:
+        flags.append(f"sec_channel_offset={params['sec_offset']}")
+    if params["center_channel"]:
+        flags.append(f"center_freq1={channel_to_freq(params['center_channel'])}")
+    if params["width"] > 20:
+        flags.append(f"bandwidth={params['width']}")
+    flags += [mode for mode in ("ht", "vht", "he") if params[mode]]
+    return flags
@@ -0,0 +1,316 @@
+"""
+Persistent helper that runs a whitelisted set of commands for the plugin.
+
+The plugin starts it once per session and talks to it over stdin/stdout using
+length-prefixed JSON frames (a 4-byte big-endian length, then a UTF-8 JSON object):
+
+    request:  {"id": 1, "batch": [["systemctl", "is-active", "iwd"], ...], "stop_on_error": false, "timeout": 10}
+    response: {"id": 1, "results": [{"returncode": 0, "stdout": "...", "stderr": "...", "timed_out": false}, ...]}
+    cancel:   {"cancel": 1}   (kills the request's running command; no response)
+
+Each command runs in its own session and its whole process tree is killed if it
+exceeds the request's timeout or the request is cancelled.
+
+Commands are executed as argv lists, never through a shell. Run this file directly to
+start the helper; `PrivilegedHelper` is the asyncio client used by the plugin.
+"""
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import threading
+
+_FRAME_HEADER = struct.Struct(">I")
+# Refuse absurd frames rather than allocating whatever a corrupt header asks for.
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# Per-command timeout when a request doesn't give one, in seconds.
+DEFAULT_TIMEOUT = 30.0
+# Slack on top of the batch's own timeouts before the client stops waiting for a response.
+DEADLINE_MARGIN = 5.0
+
+# Executable -> allowed first arguments, or None to allow any arguments.
+ALLOWED_COMMANDS = {
+    "systemctl": {"is-active", "start", "stop", "restart", "reload"},
+    "systemd-sysext": {"status", "refresh", "merge", "unmerge"},
+    "pgrep": {"-x"},
+    "pkill": {"-x"},
+    "ip": None,
+    "iw": None,
+    "rfkill": {"list"},
+    "firewall-cmd": None,
+    "which": None,
+}
+
+# Returned for commands that were refused or could not be started.
+RETURNCODE_NOT_ALLOWED = 126
+RETURNCODE_NOT_FOUND = 127
+
+
+class HelperError(Exception):
+    pass
+
+
+def encode_frame(message: dict) -> bytes:
+    payload = json.dumps(message).encode("utf-8")
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+def check_allowed(argv) -> str:
+    # Returns None if argv may be run, otherwise the reason it was refused.
+    if not isinstance(argv, list) or not argv or not all(isinstance(a, str) for a in argv):
+        return "command must be a non-empty list of strings"
+    if argv[0] not in ALLOWED_COMMANDS:
+        return f"'{argv[0]}' is not an allowed command"
+    allowed_args = ALLOWED_COMMANDS[argv[0]]
+    if allowed_args is not None and (len(argv) < 2 or argv[1] not in allowed_args):
+        return f"'{' '.join(argv[:2])}' is not an allowed operation"
+    return None
+
+
+# HELPER PROCESS
+def _kill_tree(process):
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            process.wait(2)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+class _Request:
+    # Tracks the command a request is running so a cancel message can kill it.
+    def __init__(self, request: dict):
+        self.id = request.get("id")
+        self.batch = request.get("batch", [])
+        self.stop_on_error = request.get("stop_on_error", False)
+        self.timeout = request.get("timeout")
+        self.cancelled = False
+        self.process = None
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            process = self.process
+        if process is not None:
+            _kill_tree(process)
+
+    def execute(self, argv) -> dict:
+        reason = check_allowed(argv)
+        if reason:
+            return {"returncode": RETURNCODE_NOT_ALLOWED, "stdout": "", "stderr": reason, "timed_out": False}
+
+        executable = shutil.which(argv[0])
+        if executable is None:
+            return {"returncode": RETURNCODE_NOT_FOUND, "stdout": "", "stderr": f"{argv[0]}: command not found", "timed_out": False}
+
+        with self.lock:
+            if self.cancelled:
+                return {"returncode": None, "stdout": "", "stderr": "cancelled", "timed_out": False}
+            try:
+                self.process = subprocess.Popen(
+                    [executable] + argv[1:], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE, start_new_session=True
+                )
+            except OSError as e:
+                return {"returncode": RETURNCODE_NOT_FOUND, "stdout": "", "stderr": str(e), "timed_out": False}
+
+        timed_out = False
+        try:
+            stdout, stderr = self.process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            _kill_tree(self.process)
+            stdout, stderr = self.process.communicate()
+        return {
+            "returncode": self.process.returncode,
+            "stdout": stdout.decode("utf-8", "replace"),
+            "stderr": stderr.decode("utf-8", "replace"),
+            "timed_out": timed_out,
+        }
+
+    def handle(self) -> dict:
+        results = []
+        for argv in self.batch:
+            result = self.execute(argv)
+            results.append(result)
+            if self.cancelled or (self.stop_on_error and result["returncode"] != 0):
+                break
+        return {"id": self.id, "results": results}
+
+
+def serve(stdin=None, stdout=None):
+    # Reads requests until stdin closes. Each request runs on its own thread so a slow
+    # command doesn't hold up unrelated requests; responses carry the request id.
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    write_lock = threading.Lock()
+    active = {}
+
+    def respond(message):
+        with write_lock:
+            stdout.write(encode_frame(message))
+            stdout.flush()
+
+    def worker(request):
+        try:
+            respond(request.handle())
+        except Exception as e:
+            respond({"id": request.id, "error": str(e)})
+        finally:
+            active.pop(request.id, None)
+
+    while True:
+        header = stdin.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return
+        (length,) = _FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            return
+        payload = stdin.read(length)
+        if len(payload) < length:
+            return
+        try:
+            request = json.loads(payload)
+        except ValueError as e:
+            respond({"id": None, "error": f"invalid request: {e}"})
+            continue
+        if "cancel" in request:
+            pending = active.get(request["cancel"])
+            if pending is not None:
+                pending.cancel()
+            continue
+        pending = active[request.get("id")] = _Request(request)
+        threading.Thread(target=worker, args=(pending,), daemon=True).start()
+
+
+# PLUGIN-SIDE CLIENT
+class PrivilegedHelper:
+    """
+    asyncio client for the helper process. The helper is started lazily and restarted
+    on the next request if it exits.
+    """
+
+    def __init__(self, python: str = "/usr/bin/python3", env: dict = None):
+        self.python = python
+        self.env = env
+        self._process = None
+        self._reader = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._start_lock = asyncio.Lock()
+
+    def available(self) -> bool:
+        return os.path.exists(self.python)
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self):
+        async with self._start_lock:
+            if self.running:
+                return
+            if not self.available():
+                raise HelperError(f"{self.python} not found")
+            self._process = await asyncio.create_subprocess_exec(
+                self.python, os.path.abspath(__file__),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                env=self.env,
+            )
+            self._reader = asyncio.create_task(self._read_responses(self._process))
+
+    async def _read_responses(self, process):
+        try:
+            while True:
+                (length,) = _FRAME_HEADER.unpack(await process.stdout.readexactly(_FRAME_HEADER.size))
+                response = json.loads(await process.stdout.readexactly(length))
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (asyncio.IncompleteReadError, ValueError, OSError):
+            pass
+        finally:
+            # The helper is gone; fail whatever was still waiting on it.
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(HelperError("helper process exited"))
+            self._pending.clear()
+
+    async def batch(self, commands: list, stop_on_error: bool = False, timeout: float = None) -> list:
+        # Runs argv lists in order in one round trip. `timeout` applies to each command
+        # (DEFAULT_TIMEOUT if None). Returns one {"returncode", "stdout", "stderr", "timed_out"}
+        # per command that ran. Cancelling the call kills the command the helper is running for
+        # it. If no response arrives within the batch's timeouts plus DEADLINE_MARGIN, the helper
+        # is assumed stuck: it is killed, to be restarted by the next request, and HelperError
+        # is raised.
+        timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+        await self.start()
+        process = self._process
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            process.stdin.write(encode_frame({"id": request_id, "batch": commands, "stop_on_error": stop_on_error, "timeout": timeout}))
+            await process.stdin.drain()
+            deadline = timeout * len(commands) + DEADLINE_MARGIN
+            try:
+                response = await asyncio.wait_for(future, deadline)
+            except asyncio.TimeoutError:
+                self._send_cancel(process, request_id)
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise HelperError(f"helper did not respond within {deadline}s") from None
+        except (ConnectionError, OSError) as e:
+            raise HelperError(f"helper unavailable: {e}") from e
+        except asyncio.CancelledError:
+            self._send_cancel(process, request_id)
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+        if "error" in response:
+            raise HelperError(response["error"])
+        return response["results"]
+
+    @staticmethod
+    def _send_cancel(process, request_id: int):
+        if process.returncode is None:
+            try:
+                process.stdin.write(encode_frame({"cancel": request_id}))
+            except (ConnectionError, OSError):
+                pass
+
+    async def run(self, *argv: str) -> dict:
+        return (await self.batch([list(argv)]))[0]
+
+    async def close(self):
+        if self._process is None:
+            return
+        if self._process.returncode is None:
+            self._process.stdin.close()
+            try:
+                await asyncio.wait_for(self._process.wait(), 2)
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+        if self._reader is not None:
+            await self._reader
+        self._process = None
+        self._reader = None
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,61 @@
+# Extra hostapd settings for each selectable radio profile, appended to the rendered config.
+RADIO_PROFILES = {
+    "default": [],
+    # Local multiplayer: consistent round trips matter more than peak throughput.
+    "latency": [
+        # Deliver buffered broadcast/multicast (LAN discovery) on every beacon rather than every other.
+        "beacon_int=100",
+        "dtim_period=1",
+        # Notice vanished clients within two minutes instead of five, but don't disassociate
+        # a client over a short burst of missed ACKs (e.g. a hand over the antenna).
+        "ap_max_inactivity=120",
+        "disassoc_low_ack=0",
+        # WMM parameters advertised to clients. Voice and video (where DSCP-marked game traffic
+        # lands) keep short contention windows; background yields to everything.
+        "wmm_ac_vo_aifs=2",
+        "wmm_ac_vo_cwmin=2",
+        "wmm_ac_vo_cwmax=3",
+        "wmm_ac_vo_txop_limit=47",
+        "wmm_ac_vo_acm=0",
+        "wmm_ac_vi_aifs=2",
+        "wmm_ac_vi_cwmin=3",
+        "wmm_ac_vi_cwmax=4",
+        "wmm_ac_vi_txop_limit=94",
+        "wmm_ac_vi_acm=0",
+        "wmm_ac_be_aifs=3",
+        "wmm_ac_be_cwmin=4",
+        "wmm_ac_be_cwmax=6",
+        "wmm_ac_be_txop_limit=0",
+        "wmm_ac_be_acm=0",
+        "wmm_ac_bk_aifs=7",
+        "wmm_ac_bk_cwmin=4",
+        "wmm_ac_bk_cwmax=10",
+        "wmm_ac_bk_txop_limit=0",
+        "wmm_ac_bk_acm=0",
+        # The AP's own transmit queues (data0 = voice ... data3 = background). Best effort gets a
+        # bounded backoff (cwmax 63 rather than 1023) so one retry storm can't stall game packets
+        # for tens of milliseconds; no bursting on video keeps head-of-line blocking short.
+        "tx_queue_data0_aifs=1",
+        "tx_queue_data0_cwmin=3",
+        "tx_queue_data0_cwmax=7",
+        "tx_queue_data0_burst=1.5",
+        "tx_queue_data1_aifs=1",
+        "tx_queue_data1_cwmin=7",
+        "tx_queue_data1_cwmax=15",
+        "tx_queue_data1_burst=0",
+        "tx_queue_data2_aifs=3",
+        "tx_queue_data2_cwmin=15",
+        "tx_queue_data2_cwmax=63",
+        "tx_queue_data2_burst=0",
+        "tx_queue_data3_aifs=7",
+        "tx_queue_data3_cwmin=15",
+        "tx_queue_data3_cwmax=1023",
+        "tx_queue_data3_burst=0",
+    ],
+}
+
+DEFAULT_PROFILE = "default"
+
+
+def profile_lines(name: str) -> list:
+    return list(RADIO_PROFILES.get(name, RADIO_PROFILES[DEFAULT_PROFILE]))
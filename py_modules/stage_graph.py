@@ -0,0 +1,137 @@
+import asyncio
+
+
+class Stage:
+    """
+    One step of a pipeline.
+
+    `run` is an async callable taking no arguments; the stage fails if it raises or
+    returns False. `requires` names stages that must succeed first. `rollback` is an
+    optional async callable undoing the stage, and must tolerate a partial run.
+    """
+
+    def __init__(self, name: str, run, requires=(), rollback=None):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+        self.rollback = rollback
+
+
+class StageGraph:
+    """
+    Runs stages as soon as their requirements have succeeded, so independent stages
+    overlap. After the first failure no further stages are started, stages already in
+    flight are allowed to finish, and everything that ran is rolled back in reverse
+    completion order.
+    """
+
+    def __init__(self, stages):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'.")
+            self.stages[stage.name] = stage
+
+        for stage in self.stages.values():
+            for dep in stage.requires:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' requires unknown stage '{dep}'.")
+        self._check_acyclic()
+
+        self.results = {}
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through '{name}'.")
+            visiting.add(name)
+            for dep in self.stages[name].requires:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _record(self, name, status, started=None, finished=None, error=None):
+        self.results[name] = {
+            "stage": name,
+            "status": status,
+            "duration": None if started is None else round(finished - started, 4),
+            "error": error,
+            "rolled_back": False,
+        }
+
+    async def _run_stage(self, stage):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            ok = await stage.run() is not False
+            error = None if ok else "stage reported failure"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            ok, error = False, str(e)
+        return ok, error, started, loop.time()
+
+    async def run(self) -> bool:
+        # Returns True if every stage succeeded. Per-stage outcomes are left in `self.results`.
+        self.results = {}
+        pending = dict(self.stages)
+        running = {}
+        completed = []
+        failed = False
+
+        try:
+            while pending or running:
+                if not failed:
+                    for name, stage in list(pending.items()):
+                        if all(self.results.get(dep, {}).get("status") == "ok" for dep in stage.requires):
+                            running[asyncio.create_task(self._run_stage(stage))] = stage
+                            del pending[name]
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    ok, error, started, finished = task.result()
+                    self._record(stage.name, "ok" if ok else "failed", started, finished, error)
+                    completed.append(stage)
+                    failed = failed or not ok
+        except asyncio.CancelledError:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            completed.extend(running.values())
+            for stage in running.values():
+                self._record(stage.name, "cancelled")
+            await self._rollback(completed)
+            raise
+
+        # Anything never started was cancelled by an upstream failure.
+        for name in pending:
+            self._record(name, "cancelled")
+
+        if failed:
+            await self._rollback(completed)
+        return not failed
+
+    async def _rollback(self, completed):
+        for stage in reversed(completed):
+            if stage.rollback is None:
+                continue
+            try:
+                await stage.rollback()
+                self.results[stage.name]["rolled_back"] = True
+            except Exception as e:
+                self.results[stage.name]["error"] = f"rollback failed: {e}"
+
+    def report(self) -> list:
+        # Outcomes in declaration order.
+        return [self.results[name] for name in self.stages if name in self.results]
@@ -0,0 +1,170 @@
+import math
+import time
+from array import array
+from collections import OrderedDict
+
+# Per-sample series kept for every station. Rates are derived from counter deltas.
+FIELDS = (
+    "signal",         # dBm
+    "rx_rate",        # bytes/s received from the station
+    "tx_rate",        # bytes/s sent to the station
+    "rx_bitrate",     # Mbit/s, last received frame
+    "tx_bitrate",     # Mbit/s, last transmitted frame
+    "inactive_msec",  # ms since the station was last heard
+    "tx_retry_rate",  # retries/s
+    "tx_failed_rate", # failed transmissions/s
+)
+
+# hostapd counter -> rate field it feeds.
+COUNTERS = {
+    "rx_bytes": "rx_rate",
+    "tx_bytes": "tx_rate",
+    "tx_retry_count": "tx_retry_rate",
+    "tx_retry_failed": "tx_failed_rate",
+}
+
+_NAN = float("nan")
+
+
+def parse_bitrate(info: dict, direction: str) -> float:
+    # hostapd reports "tx_rate_info=8667 vhtmcs 9 ..." in 100 kbit/s units; iw-style
+    # "tx_bitrate=866.7 MBit/s ..." is accepted too. Returns Mbit/s or NaN.
+    raw = info.get(f"{direction}_rate_info")
+    scale = 0.1
+    if raw is None:
+        raw, scale = info.get(f"{direction}_bitrate"), 1.0
+    try:
+        return float(raw.split()[0]) * scale
+    except (AttributeError, IndexError, ValueError):
+        return _NAN
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+class StationSeries:
+    """
+    Fixed-size ring buffer of samples for one station, one array('d') per field, so
+    memory is `capacity * (len(FIELDS) + 1) * 8` bytes however long the session runs.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array("d", [0.0]) * capacity
+        self.values = {field: array("d", [_NAN]) * capacity for field in FIELDS}
+        self.head = 0
+        self.count = 0
+        self.last_counters = {}
+        self.last_time = None
+
+    def append(self, now: float, info: dict):
+        sample = {
+            "signal": _number(info.get("signal")),
+            "rx_bitrate": parse_bitrate(info, "rx"),
+            "tx_bitrate": parse_bitrate(info, "tx"),
+            "inactive_msec": _number(info.get("inactive_msec")),
+        }
+        for counter, field in COUNTERS.items():
+            value = _number(info.get(counter))
+            previous = self.last_counters.get(counter)
+            elapsed = now - self.last_time if self.last_time is not None else 0
+            # No rate for the first sample or across a counter reset (e.g. a reassociation).
+            if previous is None or math.isnan(value) or value < previous or elapsed <= 0:
+                sample[field] = _NAN
+            else:
+                sample[field] = (value - previous) / elapsed
+            self.last_counters[counter] = value
+        self.last_time = now
+
+        self.times[self.head] = now
+        for field in FIELDS:
+            self.values[field][self.head] = sample[field]
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def indices(self):
+        # Buffer positions from oldest to newest.
+        start = (self.head - self.count) % self.capacity
+        return [(start + i) % self.capacity for i in range(self.count)]
+
+
+class StationStatsCollector:
+    """
+    Keeps a StationSeries per MAC. At most `max_stations` are tracked; the station
+    updated least recently is dropped first, so disconnected stations stay
+    queryable until newer ones push them out.
+    """
+
+    def __init__(self, capacity: int = 600, max_stations: int = 64):
+        self.capacity = capacity
+        self.max_stations = max_stations
+        self._stations = OrderedDict()
+
+    def record(self, mac: str, info: dict, now: float = None):
+        now = time.monotonic() if now is None else now
+        series = self._stations.get(mac)
+        if series is None:
+            series = self._stations[mac] = StationSeries(self.capacity)
+            while len(self._stations) > self.max_stations:
+                self._stations.popitem(last=False)
+        self._stations.move_to_end(mac)
+        series.append(now, info)
+
+    def forget(self, mac: str):
+        self._stations.pop(mac, None)
+
+    def __contains__(self, mac: str) -> bool:
+        return mac in self._stations
+
+    def series(self, mac: str, window: float = 60, points: int = 60, now: float = None):
+        # Returns the last `window` seconds averaged into at most `points` equal buckets, with
+        # "t" as seconds relative to now (bucket end). Empty buckets are dropped; missing values
+        # are None. Returns None for an unknown MAC.
+        series = self._stations.get(mac)
+        if series is None:
+            return None
+        now = time.monotonic() if now is None else now
+        window = max(float(window), 0.001)
+        points = max(1, int(points))
+        bucket_width = window / points
+        start = now - window
+
+        sums = [dict.fromkeys(FIELDS, 0.0) for _ in range(points)]
+        counts = [dict.fromkeys(FIELDS, 0) for _ in range(points)]
+        filled = [False] * points
+        for i in series.indices():
+            t = series.times[i]
+            if t < start or t > now:
+                continue
+            bucket = min(int((t - start) / bucket_width), points - 1)
+            filled[bucket] = True
+            for field in FIELDS:
+                value = series.values[field][i]
+                if not math.isnan(value):
+                    sums[bucket][field] += value
+                    counts[bucket][field] += 1
+
+        result = {"mac": mac, "window": window, "interval": bucket_width, "t": []}
+        result.update((field, []) for field in FIELDS)
+        for bucket in range(points):
+            if not filled[bucket]:
+                continue
+            result["t"].append(round((bucket + 1) * bucket_width - window, 3))
+            for field in FIELDS:
+                n = counts[bucket][field]
+                result[field].append(round(sums[bucket][field] / n, 2) if n else None)
+        return result
+
+    def summary(self, macs, window: float = 10, now: float = None) -> dict:
+        # Averages over the last `window` seconds for each of `macs`, as {mac: {field: value}};
+        # stations without samples in the window are left out.
+        result = {}
+        for mac in macs:
+            series = self.series(mac, window, 1, now)
+            if series is not None and series["t"]:
+                result[mac] = {field: series[field][0] for field in FIELDS}
+        return result
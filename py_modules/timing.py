@@ -0,0 +1,122 @@
+import contextvars
+import functools
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# The lifecycle run (if any) that spans recorded in the current task belong to.
+# Tasks created inside a run inherit it, so concurrent stages land in the same run.
+_current_run = contextvars.ContextVar("muon_current_run", default=None)
+
+
+def percentile(sorted_values: list, pct: float):
+    # Nearest-rank percentile of an already sorted list.
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarise(durations: list) -> dict:
+    values = sorted(durations)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": values[-1] if values else None,
+    }
+
+
+class Tracer:
+    """
+    Lightweight monotonic-clock tracing for lifecycle operations.
+
+    `run()` wraps an operation such as start_hotspot; `span()` records a timed
+    section inside whichever run is current. Finished runs and recent command spans
+    are kept in bounded ring buffers, so memory use doesn't grow with uptime.
+    """
+
+    def __init__(self, max_runs: int = 20, max_commands: int = 200):
+        self.runs = deque(maxlen=max_runs)
+        self.commands = deque(maxlen=max_commands)
+
+    @contextmanager
+    def run(self, operation: str):
+        record = {
+            "operation": operation,
+            "started_at": time.time(),
+            "duration": None,
+            "success": None,
+            "spans": [],
+        }
+        started = time.monotonic()
+        token = _current_run.set((record, started))
+        try:
+            yield record
+        finally:
+            _current_run.reset(token)
+            record["duration"] = round(time.monotonic() - started, 4)
+            self.runs.append(record)
+
+    def add_span(self, name: str, duration: float, category: str = "stage", offset: float = None):
+        # Records an externally measured span (e.g. reported by a shell script) in the current run.
+        span = {"name": name, "category": category, "offset": offset, "duration": round(duration, 4)}
+        current = _current_run.get()
+        if current is not None:
+            record, run_started = current
+            if span["offset"] is None:
+                span["offset"] = round(time.monotonic() - run_started - duration, 4)
+            record["spans"].append(span)
+        if category == "command":
+            self.commands.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage"):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.monotonic() - started, category)
+
+    def report(self, limit: int = 10) -> dict:
+        runs = list(self.runs)[-limit:] if limit else list(self.runs)
+
+        operations = {}
+        for run in runs:
+            op = operations.setdefault(run["operation"], {"total": [], "stages": {}})
+            op["total"].append(run["duration"])
+            for span in run["spans"]:
+                if span["category"] != "command":
+                    op["stages"].setdefault(span["name"], []).append(span["duration"])
+
+        return {
+            "runs": runs,
+            "operations": {
+                name: {
+                    "total": summarise(op["total"]),
+                    "stages": {stage: summarise(d) for stage, d in op["stages"].items()},
+                }
+                for name, op in operations.items()
+            },
+            "commands": {
+                **summarise([c["duration"] for c in self.commands]),
+                "slowest": sorted(self.commands, key=lambda c: c["duration"], reverse=True)[:5],
+            },
+        }
+
+
+def traced(name: str = None):
+    # Decorator recording an async method's duration as a span on `self.tracer`.
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with self.tracer.span(span_name):
+                return await func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
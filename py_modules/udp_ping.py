@@ -0,0 +1,186 @@
+"""
+UDP round-trip measurement between hotspot clients and the Deck.
+
+A client runs this file against the Deck's hotspot address:
+
+    python3 udp_ping.py 192.168.8.1 [--port 47999] [--count 200] [--interval 0.05]
+
+Each exchange is three datagrams, so both ends measure the same path:
+
+    client -> AP   PROBE (seq, client time)
+    AP -> client   ECHO  (seq, client time, AP time)    the client records its RTT
+    client -> AP   ACK   (seq, client time, AP time)    the AP records the client's RTT
+
+`UdpPingResponder` is the plugin's side. It answers probes and keeps per-client
+RTT, jitter and loss figures.
+"""
+import argparse
+import asyncio
+import math
+import socket
+import struct
+import time
+from collections import OrderedDict, deque
+
+DEFAULT_PORT = 47999
+
+_PACKET = struct.Struct(">4sBIdd")
+_MAGIC = b"MUP1"
+PROBE, ECHO, ACK = 1, 2, 3
+
+
+def encode(kind: int, seq: int, client_time: float, server_time: float = 0.0) -> bytes:
+    return _PACKET.pack(_MAGIC, kind, seq, client_time, server_time)
+
+
+def decode(data: bytes):
+    # Returns (kind, seq, client_time, server_time), or None for anything that isn't ours.
+    if len(data) != _PACKET.size:
+        return None
+    magic, kind, seq, client_time, server_time = _PACKET.unpack(data)
+    if magic != _MAGIC or kind not in (PROBE, ECHO, ACK):
+        return None
+    return kind, seq, client_time, server_time
+
+
+class LatencyStats:
+    # Round-trip figures for one peer. Jitter is the RFC 3550 running estimate over
+    # consecutive RTTs; percentiles come from the most recent samples.
+    def __init__(self, window: int = 256):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.jitter = 0.0
+        self.sent = 0
+        self.last_seen = None
+
+    def add(self, rtt: float, now: float = None):
+        if self.samples:
+            self.jitter += (abs(rtt - self.samples[-1]) - self.jitter) / 16
+        self.samples.append(rtt)
+        self.count += 1
+        self.total += rtt
+        self.minimum = min(self.minimum, rtt)
+        self.maximum = max(self.maximum, rtt)
+        self.last_seen = time.monotonic() if now is None else now
+
+    def report(self) -> dict:
+        # Milliseconds, rounded for display. Loss counts echoes that were never acknowledged.
+        if not self.count:
+            return {"samples": 0, "sent": self.sent}
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return {
+            "samples": self.count,
+            "sent": self.sent,
+            "loss": round(max(0.0, 1 - self.count / self.sent), 3) if self.sent else 0.0,
+            "last_ms": round(self.samples[-1] * 1000, 2),
+            "min_ms": round(self.minimum * 1000, 2),
+            "avg_ms": round(self.total / self.count * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "max_ms": round(self.maximum * 1000, 2),
+            "jitter_ms": round(self.jitter * 1000, 2),
+        }
+
+
+class UdpPingResponder(asyncio.DatagramProtocol):
+    """
+    Answers PROBEs and measures each client's round trip from its ACKs. Clients are keyed
+    by IP; at most `max_clients` are tracked, dropping the least recently heard first.
+    """
+
+    def __init__(self, max_clients: int = 64):
+        self.max_clients = max_clients
+        self.clients = OrderedDict()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def _client(self, ip: str) -> LatencyStats:
+        stats = self.clients.get(ip)
+        if stats is None:
+            stats = self.clients[ip] = LatencyStats()
+            while len(self.clients) > self.max_clients:
+                self.clients.popitem(last=False)
+        self.clients.move_to_end(ip)
+        return stats
+
+    def datagram_received(self, data, addr):
+        packet = decode(data)
+        if packet is None:
+            return
+        kind, seq, client_time, server_time = packet
+        now = time.monotonic()
+        if kind == PROBE:
+            self._client(addr[0]).sent += 1
+            self.transport.sendto(encode(ECHO, seq, client_time, now), addr)
+        elif kind == ACK and 0 < server_time <= now:
+            self._client(addr[0]).add(now - server_time, now)
+
+    def report(self) -> dict:
+        return {ip: stats.report() for ip, stats in self.clients.items()}
+
+    def forget(self, ip: str):
+        self.clients.pop(ip, None)
+
+
+async def start_responder(host: str, port: int = DEFAULT_PORT):
+    # Returns (transport, responder) listening on host:port.
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(UdpPingResponder, local_addr=(host, port))
+
+
+def ping(host: str, port: int = DEFAULT_PORT, count: int = 200, interval: float = 0.05, timeout: float = 1.0) -> LatencyStats:
+    # Client side: sends `count` probes `interval` seconds apart and acknowledges every echo.
+    stats = LatencyStats(window=count)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect((host, port))
+        for seq in range(count):
+            now = time.monotonic()
+            sock.send(encode(PROBE, seq, now))
+            stats.sent += 1
+            deadline = now + interval if seq < count - 1 else now + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                sock.settimeout(remaining)
+                try:
+                    packet = decode(sock.recv(64))
+                except socket.timeout:
+                    break
+                except ConnectionRefusedError:
+                    raise SystemExit(f"Nothing is answering on {host}:{port}. Is the hotspot running?")
+                if packet is None or packet[0] != ECHO:
+                    continue
+                _, _, client_time, server_time = packet
+                received = time.monotonic()
+                stats.add(received - client_time, received)
+                sock.send(encode(ACK, packet[1], client_time, server_time))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure UDP round-trip time and jitter to a Muon hotspot.")
+    parser.add_argument("host", help="hotspot address, e.g. 192.168.8.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between probes")
+    args = parser.parse_args()
+
+    report = ping(args.host, args.port, args.count, args.interval).report()
+    if not report["samples"]:
+        print(f"No replies from {args.host}:{args.port}.")
+        return
+    print(
+        f"{report['samples']}/{report['sent']} replies, loss {report['loss'] * 100:.1f}%\n"
+        f"rtt min/avg/p95/max = {report['min_ms']}/{report['avg_ms']}/{report['p95_ms']}/{report['max_ms']} ms\n"
+        f"jitter = {report['jitter_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
-import { ModalRoot, showModal, Dropdown, TextField, Field } from "@decky/ui";
-import { useState, useMemo } from "react";
+import { ModalRoot, showModal, Dropdown, TextField, Field, ToggleField } from "@decky/ui";
+import { useState, useMemo, useEffect } from "react";
 import { ButtonItem, PanelSectionRow } from "@decky/ui";
 import { FaTimes, FaCheck } from "react-icons/fa";
 import { callable, toaster } from "@decky/api";
 
 // Define valid channel and hardware modes.
-const VALID_CHANNELS = ["1", "6", "11", "36", "40", "44", "48"];
+// "auto" surveys nearby networks at start-up and picks the least congested channel.
+const VALID_CHANNELS = ["auto", "1", "6", "11", "36", "40", "44", "48"];
 const VALID_HW_MODES = ["a", "b", "g"];
 const DEFAULT_CHANNEL = "36";
 const DEFAULT_HW_MODE = "a";
 const DEFAULT_COUNTRY_CODE = "US";
+// Radio profiles rendered by the backend; "latency" tunes WMM and queueing for local multiplayer.
+const RADIO_PROFILE_LABELS: Record<string, string> = { default: "Default", latency: "Low latency" };
+
+const getRadioProfile = callable<[], { radio_profile: string; dscp_priority: boolean; profiles: string[] }>("get_radio_profile");
+const updateRadioProfile = callable<[string, boolean], { radio_profile: string; dscp_priority: boolean; error?: string }>("update_radio_profile");
+const getLogLevel = callable<[], { log_level: string; levels: string[] }>("get_log_level");
+const setLogLevel = callable<[string], { log_level: string; error?: string }>("set_log_level");
 
 export const showAdvancedSettingsModal = (
   currentChannel: string,
@@ -62,9 +70,26 @@ const AdvancedSettingsModal = ({
   const [newCountryCode, setNewCountryCode] = useState(validatedCountryCode);
   const [newHwMode, setNewHwMode] = useState(validatedHwMode);
   const [error, setError] = useState<string | null>(null);
+  const [radioProfile, setRadioProfile] = useState("default");
+  const [radioProfiles, setRadioProfiles] = useState<string[]>(["default"]);
+  const [dscpPriority, setDscpPriority] = useState(false);
+  const [logLevel, setLogLevelState] = useState("INFO");
+  const [logLevels, setLogLevels] = useState<string[]>(["INFO"]);
+
+  useEffect(() => {
+    getRadioProfile().then(profile => {
+      setRadioProfile(profile.radio_profile);
+      setRadioProfiles(profile.profiles);
+      setDscpPriority(profile.dscp_priority);
+    }).catch(() => {});
+    getLogLevel().then(level => {
+      setLogLevelState(level.log_level);
+      setLogLevels(level.levels);
+    }).catch(() => {});
+  }, []);
 
   const channelOptions = useMemo(() => 
-    VALID_CHANNELS.map(ch => ({ label: ch, data: ch })),
+    VALID_CHANNELS.map(ch => ({ label: ch === "auto" ? "Auto" : ch, data: ch })),
     []
   );
 
@@ -73,6 +98,16 @@ const AdvancedSettingsModal = ({
     []
   );
 
+  const radioProfileOptions = useMemo(() =>
+    radioProfiles.map(profile => ({ label: RADIO_PROFILE_LABELS[profile] ?? profile, data: profile })),
+    [radioProfiles]
+  );
+
+  const logLevelOptions = useMemo(() =>
+    logLevels.map(level => ({ label: level, data: level })),
+    [logLevels]
+  );
+
   const handleSave = async () => {
     setError(null);
 
@@ -80,6 +115,18 @@ const AdvancedSettingsModal = ({
       const updatedAdvancedSettings = await callable<[string, string, string], { channel: string; hw_mode: string; country_code: string }>(
         "update_advanced_settings"
       )(newChannel, newHwMode, newCountryCode);
+      const updatedProfile = await updateRadioProfile(radioProfile, dscpPriority);
+      if (updatedProfile.error) {
+        throw new Error(updatedProfile.error);
+      }
+      await setLogLevel(logLevel);
+      // Push the saved settings to the running hotspot, if any
+      const applied = await callable<[], { mode: string; changed: string[]; success: boolean }>("apply_live")();
+      if (applied.mode === "restart") {
+        toaster.toast({ title: "Hotspot Restarted", body: "New settings required a hotspot restart." });
+      } else if (applied.mode === "live") {
+        toaster.toast({ title: "Settings Applied", body: "Running hotspot updated without a restart." });
+      }
       onSave(
         updatedAdvancedSettings.channel,
         updatedAdvancedSettings.hw_mode,
@@ -116,6 +163,34 @@ const AdvancedSettingsModal = ({
       <PanelSectionRow>
         <TextField label="Country Code" value={newCountryCode} onChange={(e) => setNewCountryCode(e.target.value)} />
       </PanelSectionRow>
+      <PanelSectionRow>
+        <Field label="Radio Profile">
+          <Dropdown
+            rgOptions={radioProfileOptions}
+            selectedOption={radioProfile}
+            onChange={(option: any) => setRadioProfile(option.data)}
+          />
+        </Field>
+      </PanelSectionRow>
+      {radioProfile === "latency" && (
+        <PanelSectionRow>
+          <ToggleField
+            label="Prioritise Game Traffic"
+            description="Mark small UDP packets to clients for the WiFi voice/video queues."
+            checked={dscpPriority}
+            onChange={setDscpPriority}
+          />
+        </PanelSectionRow>
+      )}
+      <PanelSectionRow>
+        <Field label="Log Level">
+          <Dropdown
+            rgOptions={logLevelOptions}
+            selectedOption={logLevel}
+            onChange={(option: any) => setLogLevelState(option.data)}
+          />
+        </Field>
+      </PanelSectionRow>
       {error && (
         <PanelSectionRow>
           <div style={{ color: "red", marginBottom: "10px" }}>{error}</div>
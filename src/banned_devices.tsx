@@ -27,6 +27,7 @@ const BannedDevicesModal = ({ closeModal }: { closeModal?: () => void }) => {
 
   const retrieveBanList = callable<[], string[]>("retrieve_ban_list");
   const unbanMacAddress = callable<[string], boolean>("unban_mac_address");
+  const unbanMacs = callable<[string[]], { unbanned: string[]; failed: string[]; invalid: string[] }>("unban_macs");
 
   // Fetch banned MAC addresses
   useEffect(() => {
@@ -55,6 +56,17 @@ const BannedDevicesModal = ({ closeModal }: { closeModal?: () => void }) => {
     }
   };
 
+  // Handle unbanning every device in one batch
+  const handleUnbanAll = async () => {
+    const result = await unbanMacs(bannedDevices);
+    if (result.failed.length === 0) {
+      toaster.toast({ title: "Success", body: `Unbanned ${result.unbanned.length} devices` });
+    } else {
+      toaster.toast({ title: "Error", body: `Failed to unban ${result.failed.length} devices` });
+    }
+    setBannedDevices((prev) => prev.filter((item) => !result.unbanned.includes(item)));
+  };
+
   return (
     <ModalRoot>
       {loading ? (
@@ -74,6 +86,14 @@ const BannedDevicesModal = ({ closeModal }: { closeModal?: () => void }) => {
         <p>No banned devices found.</p>
       )}
 
+      {bannedDevices.length > 1 && (
+        <PanelSectionRow>
+          <ButtonItem layout="inline" onClick={handleUnbanAll}>
+            <FaTrash color="red" /> Unban All
+          </ButtonItem>
+        </PanelSectionRow>
+      )}
+
       {/* Close button at the bottom */}
       <PanelSectionRow>
         <ButtonItem layout="inline" onClick={closeModal}>
@@ -4,6 +4,7 @@ import { useEffect, useState, ReactNode } from "react";
 import { callable, toaster } from "@decky/api";
 
 type GameEntry = {
+  id: string;
   title: string;
   state: "supported" | "unsupported" | "informational";
   notes: string;
@@ -12,8 +13,29 @@ type GameEntry = {
   short_description?: string;
 };
 
-const fetchLatestCompat = callable<[], { success: boolean; errortype: string | null }>("fetch_latest_compat");
-const getCompatList = callable<[], { success: boolean; data: GameEntry[]; errortype?: string | null }>("get_compat_list");
+type GameSummary = {
+  id: string;
+  title: string;
+  state: GameEntry["state"];
+  has_notes: boolean;
+  variable_players?: string;
+  short_description?: string;
+};
+
+type SearchPage = {
+  success: boolean;
+  errortype?: string | null;
+  total: number;
+  offset: number;
+  limit: number;
+  items: GameSummary[];
+};
+
+const PAGE_SIZE = 50;
+
+const fetchLatestCompat = callable<[boolean], { success: boolean; errortype: string | null; status?: string }>("fetch_latest_compat");
+const searchCompat = callable<[string, number, number, string[]], SearchPage>("search_compat");
+const getCompatEntry = callable<[string], { success: boolean; entry?: GameEntry; errortype?: string | null }>("get_compat_entry");
 
 export const showCompatibilityListModal = () => {
   showModal(<CompatibilityList />, undefined, { strTitle: "Compatibility List" });
@@ -25,26 +47,38 @@ const STATE_STYLE: Record<string, { label: ReactNode }> = {
   informational: { label: <span style={{ display: "inline-flex", alignItems: "center", justifyContent: "center", width: "16px", height: "16px", borderRadius: "50%", backgroundColor: "#1a6bb5", color: "white", fontSize: "11px", fontWeight: "bold", fontStyle: "italic", lineHeight: 1 }}>i</span> },
 };
 
-let _expandedIndex: number | null = null;
+let _expandedId: string | null = null;
 let _searchQuery: string = "";
 let _activeStates = { supported: true, unsupported: true, informational: true };
 
 export const CompatibilityList = ({ closeModal }: { closeModal?: () => void }) => {
-  const [games, setGames] = useState<GameEntry[]>([]);
+  const [games, setGames] = useState<GameSummary[]>([]);
+  const [total, setTotal] = useState(0);
+  const [catalogueEmpty, setCatalogueEmpty] = useState(false);
   const [loading, setLoading] = useState(true);
-  const [expandedIndex, setExpandedIndex] = useState<number | null>(_expandedIndex);
+  const [expandedId, setExpandedId] = useState<string | null>(_expandedId);
+  const [notes, setNotes] = useState<Record<string, string>>({});
   const [searchQuery, setSearchQuery] = useState<string>(_searchQuery);
   const [activeStates, setActiveStates] = useState(_activeStates);
   const toggleState = (s: "supported" | "unsupported" | "informational") =>
     setActiveStates(prev => ({ ...prev, [s]: !prev[s] }));
 
-  const loadList = async () => {
+  const selectedStates = () =>
+    (Object.keys(activeStates) as (keyof typeof activeStates)[]).filter(s => activeStates[s]);
+
+  // Fetch one page from the backend; offset 0 replaces the list, later offsets append to it
+  const loadPage = async (offset: number) => {
     setLoading(true);
     try {
-      const result = await getCompatList();
+      const result = await searchCompat(searchQuery, offset, PAGE_SIZE, selectedStates());
       if (result.success) {
-        setGames(result.data);
+        setGames(prev => (offset === 0 ? result.items : [...prev, ...result.items]));
+        setTotal(result.total);
+        setCatalogueEmpty(false);
       } else {
+        setGames([]);
+        setTotal(0);
+        setCatalogueEmpty(true);
         toaster.toast({ title: "Error", body: result.errortype === "filenotfound"
           ? "Compatibility list not found. Please try refreshing."
           : "Failed to load compatibility list." });
@@ -54,25 +88,44 @@ export const CompatibilityList = ({ closeModal }: { closeModal?: () => void }) =
     }
   };
 
-  useEffect(() => { loadList(); }, []);
+  const loadList = () => loadPage(0);
+
+  // Debounce searches so typing doesn't issue a request per keystroke
+  useEffect(() => {
+    const timer = setTimeout(() => { loadList(); }, 150);
+    return () => clearTimeout(timer);
+  }, [searchQuery, activeStates]);
 
-  useEffect(() => { setExpandedIndex(null); }, [searchQuery, activeStates]);
+  useEffect(() => { setExpandedId(null); }, [searchQuery, activeStates]);
 
   useEffect(() => { _searchQuery = searchQuery; }, [searchQuery]);
   useEffect(() => { _activeStates = activeStates; }, [activeStates]);
-  useEffect(() => { _expandedIndex = expandedIndex; }, [expandedIndex]);
+  useEffect(() => { _expandedId = expandedId; }, [expandedId]);
 
-  const filteredGames = games.filter(g =>
-    activeStates[g.state] &&
-    g.title.toLowerCase().includes(searchQuery.toLowerCase())
-  );
+  // Notes are fetched per entry the first time it is expanded
+  const toggleExpanded = async (game: GameSummary) => {
+    if (expandedId === game.id) {
+      setExpandedId(null);
+      return;
+    }
+    setExpandedId(game.id);
+    if (notes[game.id] === undefined) {
+      const result = await getCompatEntry(game.id);
+      if (result.success && result.entry) {
+        const entryNotes = result.entry.notes;
+        setNotes(prev => ({ ...prev, [game.id]: entryNotes }));
+      }
+    }
+  };
 
   const handleRefresh = async () => {
     setLoading(true);
     try {
-      const result = await fetchLatestCompat();
+      // Bypass the refresh TTL; an unchanged list still costs only a conditional request
+      const result = await fetchLatestCompat(true);
       if (result.success) {
         toaster.toast({ title: "Updated", body: "Compatibility list refreshed." });
+        setNotes({});
         await loadList();
       } else {
         toaster.toast({ title: "Error", body: `Failed to fetch list: ${result.errortype ?? "Unknown"}` });
@@ -143,11 +196,11 @@ export const CompatibilityList = ({ closeModal }: { closeModal?: () => void }) =
 
         {}
         <ScrollPanelGroup>
-          {loading ? (
+          {loading && games.length === 0 ? (
             <p style={{ padding: "8px" }}>Loading...</p>
-          ) : games.length === 0 ? (
+          ) : catalogueEmpty ? (
             <p style={{ padding: "8px" }}>No data. Click the refresh button to fetch the list.</p>
-          ) : filteredGames.length === 0 ? (
+          ) : games.length === 0 ? (
             <p style={{ padding: "8px" }}>No games match the current filter.</p>
           ) : (
             <table style={{ width: "100%", borderCollapse: "collapse", fontSize: "13px" }}>
@@ -158,16 +211,16 @@ export const CompatibilityList = ({ closeModal }: { closeModal?: () => void }) =
                 </tr>
               </thead>
               <tbody>
-                {filteredGames.map((game, i) => {
+                {games.map((game) => {
                   const style = STATE_STYLE[game.state] ?? STATE_STYLE.informational;
-                  const isExpanded = expandedIndex === i;
-                  const hasNotes = !!game.notes;
+                  const isExpanded = expandedId === game.id;
+                  const hasNotes = game.has_notes;
                   return (
                     <>
                       <tr
-                        key={i}
+                        key={game.id}
                         style={{ borderBottom: "1px solid #333", backgroundColor: "#1e1e1e", cursor: hasNotes ? "pointer" : "default" }}
-                        onClick={() => hasNotes && setExpandedIndex(isExpanded ? null : i)}
+                        onClick={() => hasNotes && toggleExpanded(game)}
                       >
                         <td style={{ padding: "6px 8px" }}>
                           <div style={{ fontWeight: "bold" }}>{game.title}</div>
@@ -183,9 +236,9 @@ export const CompatibilityList = ({ closeModal }: { closeModal?: () => void }) =
                         </td>
                       </tr>
                       {isExpanded && hasNotes && (
-                        <tr key={`${i}-notes`} style={{ backgroundColor: "#1a1a1a" }}>
+                        <tr key={`${game.id}-notes`} style={{ backgroundColor: "#1a1a1a" }}>
                           <td colSpan={2} style={{ padding: "6px 12px 10px", fontSize: "12px", color: "#ccc", whiteSpace: "pre-wrap" }}>
-                            {game.notes}
+                            {notes[game.id] ?? "Loading..."}
                           </td>
                         </tr>
                       )}
@@ -195,6 +248,11 @@ export const CompatibilityList = ({ closeModal }: { closeModal?: () => void }) =
               </tbody>
             </table>
           )}
+          {games.length > 0 && games.length < total && (
+            <DialogButton onClick={() => loadPage(games.length)} disabled={loading} style={{ marginTop: "6px" }}>
+              {loading ? "Loading..." : `Show more (${total - games.length} remaining)`}
+            </DialogButton>
+          )}
         </ScrollPanelGroup>
 
         {}
@@ -6,6 +6,7 @@ import {
   PanelSectionRow,
   TextField,
   staticClasses,
+  useQuickAccessVisible,
 } from "@decky/ui";
 import {
   callable,
@@ -19,7 +20,8 @@ import { useState, useEffect } from "react";
 import { FaWifi, FaSpinner, FaCog } from "react-icons/fa";
 import { showCompatibilityListModal } from "./compatibility_list";
 import { showWifiSettingsModal } from "./wifi_settings";
-import { getSignalIcon } from "./signalIcons";
+import { showProfilesModal, ProfileSettings } from "./profiles";
+import { getSignalIcon, formatThroughput } from "./signalIcons";
 import { BootIcon } from "./banned_devices";
 import { sleepManager } from "./lib/SleepManager";
 
@@ -29,12 +31,37 @@ const checkDependencies = callable<[], Record<string, boolean>>("check_dependenc
 const isHotspotActive = callable<[], boolean>("is_hotspot_active");
 const updateCredentials = callable<[string, string, boolean], void>("update_credentials");
 const installDependencies = callable<[], { success: boolean; error?: string }>("install_dependencies");
-const getConnectedDevices = callable<[], any>("get_connected_devices");
+const getConnectedDevicesSince = callable<[number], DeviceDelta>("get_connected_devices_since");
 const kickMac = callable<[string], boolean>("kick_mac");
 const getIpAddress = callable<[], string>("get_ip_address");
+const getDeviceStats = callable<[number], DeviceStats>("get_device_stats");
+const getChannelSelection = callable<[], { channel?: string; scores?: { channel: number; score: number; bss_count: number }[] }>("get_channel_selection");
 
 let _muonListenerRegistered = false;
 
+type DeviceDelta = {
+  version: number;
+  unchanged?: boolean;
+  full?: boolean;
+  devices?: any[];
+  added?: any[];
+  removed?: string[];
+  changed?: any[];
+};
+
+type StationSummary = {
+  rx_rate: number | null;
+  tx_rate: number | null;
+  tx_retry_rate: number | null;
+  tx_failed_rate: number | null;
+  signal: number | null;
+};
+
+type DeviceStats = {
+  stations: Record<string, StationSummary>;
+  latency: Record<string, { samples: number; avg_ms?: number; jitter_ms?: number }>;
+};
+
 declare global {
   interface Window {
     SteamClient: any;
@@ -56,6 +83,8 @@ function Content() {
   const [installingDependencies, setInstallingDependencies] = useState(false);
   const [isBlocked, setIsBlocked] = useState<boolean>(false);
   const [connectedDevices, setConnectedDevices] = useState<any[]>([]);
+  const [stationStats, setStationStats] = useState<DeviceStats["stations"]>({});
+  const [latency, setLatency] = useState<DeviceStats["latency"]>({});
   const [ipAddress, setIpAddress] = useState<string>("");
 
   useEffect(() => {
@@ -175,31 +204,40 @@ function Content() {
     }
   }, [dependencies, installingDependencies]);
 
-    useEffect(() => {
+  useEffect(() => {
+    // Local copy of the backend's versioned device snapshot; only deltas cross the bridge.
+    let version = -1;
+    let devices = new Map<string, any>();
+
     const fetchDevices = async () => {
       try {
-        const devices = await getConnectedDevices();
-        // Parse device list safely
-        const parsedDevices = typeof devices === "string" ? JSON.parse(devices) : devices;
-        const newDeviceList = (Array.isArray(parsedDevices) ? parsedDevices : [])
-          .filter(d => d.ip && d.hostname);
-
-        // Store updated device list and the updated announcements
-        setConnectedDevices(newDeviceList);
+        const delta = await getConnectedDevicesSince(version);
+        if (delta.unchanged) return;
+
+        if (delta.full) {
+          devices = new Map((delta.devices ?? []).map(d => [d.mac, d] as [string, any]));
+        } else {
+          (delta.removed ?? []).forEach(mac => devices.delete(mac));
+          [...(delta.added ?? []), ...(delta.changed ?? [])].forEach(d => devices.set(d.mac, d));
+        }
+        version = delta.version;
 
+        setConnectedDevices([...devices.values()].filter(d => d.ip && d.hostname));
       } catch (error) {
         console.error("Failed to fetch connected devices:", error);
+        version = -1;
+        devices = new Map();
         setConnectedDevices([]);
       }
     };
   
-    // Poll every 5 seconds when hotspot is running
+    // Poll every 2 seconds when hotspot is running
     if (hotspotStatus === "running") {
       fetchDevices(); // Fetch immediately when hotspot starts
   
       const interval = setInterval(() => {
         fetchDevices();
-      }, 2000); // Poll every 5 seconds
+      }, 2000);
   
       return () => clearInterval(interval);
     }
@@ -208,6 +246,30 @@ function Content() {
     return undefined;
   }, [hotspotStatus]);
 
+  // Per-device throughput, retries and round trips, one call for all devices. Only polled
+  // while the Connected Devices list is on screen.
+  const quickAccessVisible = useQuickAccessVisible();
+  const showingDevices = quickAccessVisible && hotspotStatus === "running" && connectedDevices.length > 0;
+
+  useEffect(() => {
+    if (!showingDevices) return undefined;
+
+    const fetchStats = async () => {
+      try {
+        // Averages over the last 10 seconds; latency comes from clients running udp_ping.py
+        const stats = await getDeviceStats(10);
+        setStationStats(stats.stations);
+        setLatency(stats.latency);
+      } catch (error) {
+        console.error("Failed to fetch device stats:", error);
+      }
+    };
+
+    fetchStats();
+    const interval = setInterval(fetchStats, 2000);
+    return () => clearInterval(interval);
+  }, [showingDevices]);
+
   
   const spinnerStyle = {
     animation: "spin 1s linear infinite"
@@ -241,7 +303,12 @@ function Content() {
       if (hotspotStatus === "stopped") {
         await startHotspot();
         setHotspotStatus("running");
-        toaster.toast({ title: "Hotspot Started", body: `SSID: ${ssid}` });
+        if (channel === "auto") {
+          const selection = await getChannelSelection();
+          toaster.toast({ title: "Hotspot Started", body: `SSID: ${ssid}, Channel: ${selection.channel ?? "?"} (auto)` });
+        } else {
+          toaster.toast({ title: "Hotspot Started", body: `SSID: ${ssid}` });
+        }
       } else {
         await stopHotspot();
         setHotspotStatus("stopped");
@@ -344,11 +411,24 @@ function Content() {
             <PanelSectionRow key={index}>
               <div style={{ display: "flex", alignItems: "center", width: "100%" }}>
                 <div style={{ width: "50px", height: "50px", display: "flex", justifyContent: "center", alignItems: "center" }}>
-                  {getSignalIcon(device.signal_strength, 32)}
+                  {/* The snapshot's signal only updates with other changes; prefer the live average */}
+                  {getSignalIcon(stationStats[device.mac]?.signal ?? device.signal_strength, 32)}
                 </div>
                 <div style={{ flex: 1 }}>
                   <div style={{ fontWeight: "bold", fontSize: "14px" }}>{device.hostname}</div>
                   <div style={{ fontSize: "12px", color: "#888" }}>{device.ip}</div>
+                  {stationStats[device.mac] && (
+                    <div style={{ fontSize: "11px", color: "#888" }}>
+                      {/* The AP transmits what the device downloads */}
+                      ↓ {formatThroughput(stationStats[device.mac].tx_rate)} ↑ {formatThroughput(stationStats[device.mac].rx_rate)}
+                      {(stationStats[device.mac].tx_retry_rate ?? 0) > 0 && ` · ${stationStats[device.mac].tx_retry_rate} retries/s`}
+                    </div>
+                  )}
+                  {latency[device.ip]?.samples > 0 && (
+                    <div style={{ fontSize: "11px", color: "#888" }}>
+                      RTT {latency[device.ip].avg_ms} ms ± {latency[device.ip].jitter_ms} ms
+                    </div>
+                  )}
                 </div>
                 <Focusable
                   style={{
@@ -433,6 +513,27 @@ function Content() {
             <FaCog /> Edit WiFi Settings
           </ButtonItem>
         </PanelSectionRow>
+        <PanelSectionRow>
+          <ButtonItem
+            layout="below"
+            onClick={() =>
+              showProfilesModal((settings: ProfileSettings) => {
+                setSsid(settings.ssid);
+                setPassphrase(settings.passphrase);
+                setAlwaysUseStoredCredentials(true);
+                setChannel(settings.channel);
+                setHwMode(settings.hw_mode);
+                setCountryCode(settings.country_code);
+                setBaseIp(settings.ip_address);
+                const [start, end] = settings.dhcp_range.split(",").slice(0, 2);
+                setDhcpStart(start);
+                setDhcpEnd(end);
+              })
+            }
+          >
+            Profiles
+          </ButtonItem>
+        </PanelSectionRow>
         <PanelSectionRow>
           <ButtonItem layout="below" onClick={() => showCompatibilityListModal()}>
             Compatibility List
@@ -0,0 +1,141 @@
+import { ModalRoot, showModal, TextField } from "@decky/ui";
+import { useEffect, useState } from "react";
+import { ButtonItem, PanelSectionRow } from "@decky/ui";
+import { FaCheck, FaSave, FaTimes, FaTrash } from "react-icons/fa";
+import { callable, toaster } from "@decky/api";
+
+// Settings bundled by a profile, as returned by the backend.
+export type ProfileSettings = {
+  ssid: string;
+  passphrase: string;
+  channel: string;
+  hw_mode: string;
+  country_code: string;
+  ip_address: string;
+  dhcp_range: string;
+  radio_profile: string;
+  dscp_priority: boolean;
+};
+
+const listProfiles = callable<[], { active: string | null; profiles: ({ name: string } & ProfileSettings)[] }>("list_profiles");
+const saveProfile = callable<[string], { name?: string; error?: string }>("save_profile");
+const deleteProfile = callable<[string], boolean>("delete_profile");
+const activateProfile = callable<[string], { name?: string; settings?: ProfileSettings; apply?: { success: boolean }; error?: string }>("activate_profile");
+
+// Shows the profiles modal; onActivate receives the settings of the profile switched to.
+export const showProfilesModal = (onActivate: (settings: ProfileSettings) => void) => {
+  showModal(<ProfilesModal onActivate={onActivate} />, undefined, { strTitle: "Hotspot Profiles" });
+};
+
+const ProfilesModal = ({
+  onActivate,
+  closeModal,
+}: {
+  onActivate: (settings: ProfileSettings) => void;
+  closeModal?: () => void;
+}) => {
+  const [profiles, setProfiles] = useState<({ name: string } & ProfileSettings)[]>([]);
+  const [active, setActive] = useState<string | null>(null);
+  const [newName, setNewName] = useState("");
+  const [busy, setBusy] = useState(false);
+
+  const refresh = async () => {
+    try {
+      const result = await listProfiles();
+      setProfiles(result.profiles);
+      setActive(result.active);
+    } catch (error) {
+      toaster.toast({ title: "Error", body: "Failed to load profiles." });
+    }
+  };
+
+  useEffect(() => {
+    refresh();
+  }, []);
+
+  // Saves the current settings under the entered name
+  const handleSave = async () => {
+    const result = await saveProfile(newName);
+    if (result.error) {
+      toaster.toast({ title: "Error", body: result.error });
+      return;
+    }
+    toaster.toast({ title: "Profile Saved", body: `Saved ${result.name}` });
+    setNewName("");
+    refresh();
+  };
+
+  const handleActivate = async (name: string) => {
+    setBusy(true);
+    try {
+      const result = await activateProfile(name);
+      if (result.error || !result.settings) {
+        toaster.toast({ title: "Error", body: result.error ?? `Failed to switch to ${name}` });
+        return;
+      }
+      onActivate(result.settings);
+      if (result.apply && !result.apply.success) {
+        toaster.toast({ title: "Error", body: `Switched to ${name}, but the hotspot failed to apply it.` });
+      } else {
+        toaster.toast({ title: "Profile Active", body: `Switched to ${name}` });
+      }
+      setActive(name);
+    } finally {
+      setBusy(false);
+    }
+  };
+
+  const handleDelete = async (name: string) => {
+    if (await deleteProfile(name)) {
+      setProfiles((prev) => prev.filter((profile) => profile.name !== name));
+    } else {
+      toaster.toast({ title: "Error", body: `Failed to delete ${name}` });
+    }
+  };
+
+  return (
+    <ModalRoot>
+      {profiles.length > 0 ? (
+        profiles.map((profile) => (
+          <PanelSectionRow key={profile.name}>
+            <div style={{ display: "flex", justifyContent: "space-between", alignItems: "center", width: "100%" }}>
+              <div>
+                <div style={{ fontSize: "14px", fontWeight: "bold" }}>
+                  {profile.name} {profile.name === active && <FaCheck color="green" />}
+                </div>
+                <div style={{ fontSize: "12px", opacity: 0.7 }}>
+                  {profile.ssid} · {profile.hw_mode === "a" ? "5 GHz" : "2.4 GHz"} · Ch {profile.channel} · {profile.country_code}
+                </div>
+              </div>
+              <div style={{ display: "flex" }}>
+                <ButtonItem layout="inline" disabled={busy || profile.name === active} onClick={() => handleActivate(profile.name)}>
+                  Use
+                </ButtonItem>
+                <ButtonItem layout="inline" disabled={busy} onClick={() => handleDelete(profile.name)}>
+                  <FaTrash color="red" />
+                </ButtonItem>
+              </div>
+            </div>
+          </PanelSectionRow>
+        ))
+      ) : (
+        <p>No profiles saved.</p>
+      )}
+
+      <PanelSectionRow>
+        <TextField label="Save current settings as" value={newName} onChange={(e) => setNewName(e.target.value)} />
+      </PanelSectionRow>
+      <PanelSectionRow>
+        <ButtonItem layout="inline" disabled={!newName.trim()} onClick={handleSave}>
+          <FaSave /> Save Profile
+        </ButtonItem>
+      </PanelSectionRow>
+
+      <PanelSectionRow>
+        <ButtonItem layout="inline" onClick={closeModal}>
+          <FaTimes /> Close
+        </ButtonItem>
+      </PanelSectionRow>
+    </ModalRoot>
+  );
+};
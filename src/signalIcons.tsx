@@ -37,4 +37,18 @@ export const getSignalIcon = (signalStrength: number, size: number = 50) => {
       />
     );
   }
-};  
\ No newline at end of file
+};  
+// Formats a byte rate from get_station_stats as a short bit rate, e.g. "12.3 Mbps".
+export const formatThroughput = (bytesPerSecond: number | null | undefined) => {
+  if (bytesPerSecond === null || bytesPerSecond === undefined) {
+    return "–";
+  }
+  const bits = bytesPerSecond * 8;
+  if (bits >= 1e6) {
+    return `${(bits / 1e6).toFixed(1)} Mbps`;
+  }
+  if (bits >= 1e3) {
+    return `${(bits / 1e3).toFixed(0)} kbps`;
+  }
+  return `${bits.toFixed(0)} bps`;
+};
@@ -88,6 +88,13 @@ const WifiSettingsModal = ({
       )(newSsid, newPassphrase, alwaysUse);
       const updateDhcp = callable<[string, string, string], { ip_address: string; dhcp_range: string }>("update_dhcp");
       await updateDhcp(baseIp, dhcpStart, dhcpEnd);
+      // Push the saved settings to the running hotspot, if any
+      const applied = await callable<[], { mode: string; changed: string[]; success: boolean }>("apply_live")();
+      if (applied.mode === "restart") {
+        toaster.toast({ title: "Hotspot Restarted", body: "New settings required a hotspot restart." });
+      } else if (applied.mode === "live") {
+        toaster.toast({ title: "Settings Applied", body: "Running hotspot updated without a restart." });
+      }
       // Update UI with the latest values
       onSave(
         updatedConfig.ssid,
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "py_modules"))
+
+
+def read_fixture(*path: str) -> str:
+    # Fixtures live in tests/fixtures; the `iw phy info` recording is shared with the benchmarks.
+    with open(os.path.join(*path), "r") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="session")
+def phy_info() -> str:
+    return read_fixture(REPO_DIR, "benchmarks", "fixtures", "iw_phy_info.txt")
+
+
+
+@pytest.fixture(scope="session")
+def survey_dump() -> str:
+    return read_fixture(TESTS_DIR, "fixtures", "iw_survey_dump.txt")
+
+
+@pytest.fixture(scope="session")
+def scan_dump() -> str:
+    return read_fixture(TESTS_DIR, "fixtures", "iw_scan.txt")
@@ -0,0 +1,31 @@
+import os
+import stat
+
+import pytest
+
+from atomic_file import JsonCache
+
+
+def test_json_cache_round_trip(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = JsonCache(str(path), mode=0o600)
+    assert cache.load() == {}
+
+    cache.save({"key": "abc", "statuses": {"hostapd": True}})
+    assert JsonCache(str(path)).load() == {"key": "abc", "statuses": {"hostapd": True}}
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+@pytest.mark.parametrize("content", ["{truncated", "[1, 2]"])
+def test_unreadable_json_cache_loads_empty(tmp_path, content):
+    path = tmp_path / "cache.json"
+    path.write_text(content)
+    assert JsonCache(str(path)).load() == {}
+
+
+def test_failed_save_keeps_the_value_in_memory(tmp_path):
+    cache = JsonCache(str(tmp_path / "missing-dir" / "file" / "cache.json"))
+    (tmp_path / "missing-dir").write_text("not a directory")
+    with pytest.raises(OSError):
+        cache.save({"key": "abc"})
+    assert cache.load() == {"key": "abc"}
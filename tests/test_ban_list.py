@@ -0,0 +1,38 @@
+import pytest
+
+import ban_list
+from ban_list import BanList
+
+PLACEHOLDER = "00:20:30:40:50:60"
+
+
+def make_list(tmp_path):
+    path = tmp_path / "hostapd.deny"
+    path.write_text(f"{PLACEHOLDER}\naa:bb:cc:dd:ee:01\n")
+    return path, BanList(str(path), excluded=[PLACEHOLDER])
+
+
+def test_add_and_remove_write_the_deny_file(tmp_path):
+    path, bans = make_list(tmp_path)
+    assert bans.add(["AA-BB-CC-DD-EE-02", "aa:bb:cc:dd:ee:01", "bogus", PLACEHOLDER]) == ["aa:bb:cc:dd:ee:02"]
+    assert bans.remove(["aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:03"]) == ["aa:bb:cc:dd:ee:01"]
+    assert bans.bans() == ["aa:bb:cc:dd:ee:02"]
+    assert path.read_text() == f"{PLACEHOLDER}\naa:bb:cc:dd:ee:02\n"
+
+
+@pytest.mark.parametrize("change", [
+    lambda bans: bans.add(["aa:bb:cc:dd:ee:02"]),
+    lambda bans: bans.remove(["aa:bb:cc:dd:ee:01"]),
+])
+def test_failed_save_leaves_memory_matching_the_file(tmp_path, monkeypatch, change):
+    path, bans = make_list(tmp_path)
+    bans.load()
+
+    def fail(*args, **kwargs):
+        raise OSError("read-only file system")
+    monkeypatch.setattr(ban_list, "atomic_write", fail)
+
+    with pytest.raises(OSError):
+        change(bans)
+    assert bans.bans() == ["aa:bb:cc:dd:ee:01"]
+    assert "aa:bb:cc:dd:ee:01" in bans and "aa:bb:cc:dd:ee:02" not in bans
@@ -0,0 +1,83 @@
+import pytest
+
+from channel_select import parse_scan, parse_survey_dump, score_channel, select_channel
+from phy_caps import parse_phy_info, radio_params, span_channels
+
+
+@pytest.fixture(scope="module")
+def caps(phy_info):
+    return parse_phy_info(phy_info)
+
+
+@pytest.fixture(scope="module")
+def survey(survey_dump):
+    return parse_survey_dump(survey_dump)
+
+
+@pytest.fixture(scope="module")
+def networks(scan_dump):
+    return parse_scan(scan_dump)
+
+
+def spans(caps, hw_mode):
+    return lambda channel: span_channels(radio_params(caps, channel, hw_mode), channel)
+
+
+def test_parse_survey_dump(survey):
+    assert len(survey) == 17
+    assert survey[5180] == {"noise": -95, "active": 1000, "busy": 40, "in_use": True}
+    assert survey[5220] == {"noise": -92, "active": 1000, "busy": 880, "in_use": False}
+    assert not survey[2412]["in_use"]
+
+
+def test_parse_scan_occupied_spectrum(networks):
+    by_bssid = {bss["bssid"]: bss for bss in networks}
+    assert len(by_bssid) == 7
+    # 20 MHz on 5 GHz
+    assert by_bssid["9c:53:22:aa:bb:02"] == {"bssid": "9c:53:22:aa:bb:02", "freq": 5220, "signal": -42.0, "low": 5210, "high": 5230}
+    # HT40 above on 2.4 GHz, 22 MHz per channel
+    assert (by_bssid["50:c7:bf:01:02:05"]["low"], by_bssid["50:c7:bf:01:02:05"]["high"]) == (2401, 2443)
+    # VHT80 centred on channel 155
+    assert (by_bssid["50:c7:bf:01:02:07"]["low"], by_bssid["50:c7:bf:01:02:07"]["high"]) == (5735, 5815)
+
+
+def test_span_channels(caps):
+    assert span_channels(radio_params(caps, 40, "a"), 40) == [36, 40, 44, 48]
+    assert span_channels(radio_params(caps, 165, "a"), 165) == [165]
+    assert span_channels(radio_params(caps, 6, "g"), 6) == [6]
+    assert span_channels({"width": 40, "sec_offset": -1, "center_channel": 38}, 40) == [36, 40]
+
+
+def test_wide_span_counts_busy_secondary_channels(survey, networks):
+    primary = score_channel(36, survey, networks)
+    block = score_channel(36, survey, networks, [36, 40, 44, 48])
+    assert block["width"] == 80 and primary["width"] == 20
+    assert block["busy"] == 0.88 and primary["busy"] == 0.04
+    assert block["bss_count"] == 3 and primary["bss_count"] == 1
+    assert block["score"] > primary["score"]
+
+
+def test_selects_20mhz_channel_without_spans(caps, survey, networks):
+    # Scored as 20 MHz channels, 40 looks quietest even though 44 and 48 are saturated.
+    assert select_channel("a", caps["bands"]["a"]["channels"], survey, networks)["channel"] == 40
+
+
+def test_selects_quiet_80mhz_block(caps, survey, networks):
+    selection = select_channel("a", caps["bands"]["a"]["channels"], survey, networks, spans(caps, "a"))
+    # The 149-161 block is clear; within it the quietest primary wins.
+    assert selection["channel"] == 161
+    assert selection["scores"][0]["width"] == 80
+    assert {s["channel"] for s in selection["scores"][:4]} == {149, 153, 157, 161}
+    # DFS channels are never candidates.
+    assert not {52, 56, 60, 64} & {s["channel"] for s in selection["scores"]}
+    assert [s["score"] for s in selection["scores"]] == sorted(s["score"] for s in selection["scores"])
+
+
+def test_selects_2ghz_channel(caps, survey, networks):
+    selection = select_channel("g", caps["bands"]["g"]["channels"], survey, networks, spans(caps, "g"))
+    assert selection["channel"] == 11
+    assert [s["channel"] for s in selection["scores"]] == [11, 13, 1, 6]
+
+
+def test_no_candidates():
+    assert select_channel("a", [{"channel": 52, "freq": 5260, "disabled": False, "radar": True, "no_ir": True}]) == {"channel": None, "scores": []}
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from compat_fetcher import CompatFetcher, CompatFetchError
+
+LIST = {"devices": [{"name": "Steam Deck OLED", "supported": True}]}
+ETAG = '"v1"'
+LAST_MODIFIED = "Sat, 17 Oct 2026 12:00:00 GMT"
+
+
+class StandIn:
+    # Local HTTP server playing the compatibility list host. `responses` are served in order,
+    # the last one repeating; each is (status, body).
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        status, body = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if status == 304:
+            return web.Response(status=304, headers={"ETag": ETAG})
+        return web.Response(status=status, body=body, headers={"ETag": ETAG, "Last-Modified": LAST_MODIFIED})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/list.json", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/list.json"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def run(responses, path, steps, **options):
+    # Runs `steps(fetcher, server)` against a stand-in serving `responses`.
+    async def main():
+        async with StandIn(responses) as server:
+            fetcher = CompatFetcher(server.url, str(path), backoff=0, **options)
+            try:
+                return await steps(fetcher, server)
+            finally:
+                await fetcher.close()
+    return asyncio.run(main())
+
+
+def test_download_writes_the_list_and_its_validators(tmp_path):
+    path = tmp_path / "compatibility.json"
+
+    async def steps(fetcher, server):
+        return await fetcher.fetch()
+
+    result = run([(200, json.dumps(LIST))], path, steps)
+    assert result["status"] == "updated" and result["size"] == len(json.dumps(LIST))
+    assert json.loads(path.read_text()) == LIST
+    meta = json.loads((tmp_path / "compatibility.json.meta.json").read_text())
+    assert meta["etag"] == ETAG and meta["last_modified"] == LAST_MODIFIED
+
+
+def test_revalidates_with_the_saved_validators(tmp_path):
+    path = tmp_path / "compatibility.json"
+
+    async def steps(fetcher, server):
+        first = await fetcher.fetch()
+        second = await fetcher.fetch(force=True)
+        return first, second, server.requests
+
+    first, second, requests = run([(200, json.dumps(LIST)), (304, b"")], path, steps)
+    assert (first["status"], second["status"]) == ("updated", "not_modified")
+    assert "If-None-Match" not in requests[0]
+    assert requests[1]["If-None-Match"] == ETAG and requests[1]["If-Modified-Since"] == LAST_MODIFIED
+    assert json.loads(path.read_text()) == LIST
+
+
+def test_fresh_list_makes_no_request(tmp_path):
+    path = tmp_path / "compatibility.json"
+
+    async def steps(fetcher, server):
+        await fetcher.fetch()
+        return await fetcher.fetch(), len(server.requests)
+
+    result, requests = run([(200, json.dumps(LIST))], path, steps, ttl=3600)
+    assert result == {"status": "fresh", "size": None}
+    assert requests == 1
+
+
+def test_retries_transient_failures(tmp_path):
+    path = tmp_path / "compatibility.json"
+
+    async def steps(fetcher, server):
+        return await fetcher.fetch(), len(server.requests)
+
+    result, requests = run([(503, b""), (502, b""), (200, json.dumps(LIST))], path, steps, retries=3)
+    assert result["status"] == "updated" and requests == 3
+    assert json.loads(path.read_text()) == LIST
+
+
+def test_invalid_json_leaves_the_saved_list_untouched(tmp_path):
+    path = tmp_path / "compatibility.json"
+    path.write_text(json.dumps(LIST))
+
+    async def steps(fetcher, server):
+        with pytest.raises(CompatFetchError) as error:
+            await fetcher.fetch(force=True)
+        return error.value.errortype
+
+    assert run([(200, b"{not json")], path, steps) == "invalidjson"
+    assert json.loads(path.read_text()) == LIST
+    # Nothing half-written or left behind next to it.
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["compatibility.json"]
@@ -0,0 +1,59 @@
+from device_snapshot import DeviceSnapshot
+
+
+def device(mac, ip="192.168.8.10", hostname="deck", signal=-50):
+    return {"mac": mac, "ip": ip, "hostname": hostname, "signal_strength": signal}
+
+
+A, B, C = "aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:02", "aa:bb:cc:dd:ee:03"
+
+
+def test_since_returns_only_what_changed():
+    snapshot = DeviceSnapshot()
+    snapshot.update([device(A), device(B, "192.168.8.11")])
+    version = snapshot.version
+
+    assert snapshot.since(version) == {"version": version, "unchanged": True}
+
+    snapshot.update([device(A, hostname="steamdeck"), device(C, "192.168.8.12")])
+    delta = snapshot.since(version)
+    assert delta["version"] == snapshot.version
+    assert delta["added"] == [device(C, "192.168.8.12")]
+    assert delta["removed"] == [B]
+    assert delta["changed"] == [device(A, hostname="steamdeck")]
+
+
+def test_device_added_and_removed_in_between_is_not_reported():
+    snapshot = DeviceSnapshot()
+    snapshot.update([device(A)])
+    version = snapshot.version
+    snapshot.add(device(B))
+    snapshot.remove(B)
+    assert snapshot.since(version) == {"version": snapshot.version, "added": [], "removed": [], "changed": []}
+
+
+def test_stale_or_unknown_version_gets_the_full_snapshot():
+    snapshot = DeviceSnapshot(tombstone_limit=1)
+    snapshot.update([device(A), device(B), device(C)])
+    version = snapshot.version
+    snapshot.remove(A)
+    snapshot.remove(B)  # Drops A's tombstone, so deltas from `version` can't be computed.
+
+    for stale in (version, -1, snapshot.version + 1):
+        delta = snapshot.since(stale)
+        assert delta["full"] and delta["devices"] == [device(C)]
+
+
+def test_signal_changes_do_not_bump_the_version():
+    snapshot = DeviceSnapshot()
+    snapshot.update([device(A)])
+    version = snapshot.version
+
+    snapshot.update([device(A, signal=-71)])
+    assert snapshot.version == version
+    assert snapshot.since(version)["unchanged"]
+    # The latest value is still stored for full snapshots.
+    assert snapshot.get(A)["signal_strength"] == -71
+
+    snapshot.update([device(A, ip="192.168.8.20", signal=-40)])
+    assert snapshot.since(version)["changed"] == [device(A, ip="192.168.8.20", signal=-40)]
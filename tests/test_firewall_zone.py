@@ -0,0 +1,53 @@
+from firewall_zone import ZONE_NAME, missing_settings, parse_zone_info, plan_zone_commands
+
+ZONE = f"--zone={ZONE_NAME}"
+COMPLETE = f"""{ZONE_NAME} (active)
+  target: ACCEPT
+  icmp-block-inversion: no
+  interfaces: muon0
+  sources:
+  services: dhcp
+  ports:
+  protocols:
+  forward: yes
+  masquerade: yes
+  forward-ports:
+"""
+
+
+def test_parse_zone_info():
+    info = parse_zone_info(COMPLETE)
+    assert info == {"target": "ACCEPT", "interfaces": {"muon0"}, "services": {"dhcp"}, "masquerade": True}
+
+
+def test_complete_zone_needs_no_commands():
+    info = parse_zone_info(COMPLETE)
+    assert missing_settings(info, "muon0") == []
+    assert plan_zone_commands(info, info, "muon0") == []
+
+
+def test_missing_runtime_zone_is_rebuilt_by_a_reload():
+    info = parse_zone_info(COMPLETE)
+    assert plan_zone_commands(None, info, "muon0") == [["firewall-cmd", "--reload"]]
+
+
+def test_only_missing_settings_are_added_without_a_reload():
+    info = parse_zone_info(COMPLETE.replace("interfaces: muon0", "interfaces:").replace("masquerade: yes", "masquerade: no"))
+    assert missing_settings(info, "muon0") == ["--change-interface=muon0", "--add-masquerade"]
+    assert plan_zone_commands(info, info, "muon0") == [
+        ["firewall-cmd", "--permanent", ZONE, "--change-interface=muon0"],
+        ["firewall-cmd", "--permanent", ZONE, "--add-masquerade"],
+        ["firewall-cmd", ZONE, "--change-interface=muon0"],
+        ["firewall-cmd", ZONE, "--add-masquerade"],
+    ]
+
+
+def test_absent_zone_is_created_then_reloaded():
+    assert plan_zone_commands(None, None, "muon0") == [
+        ["firewall-cmd", "--permanent", f"--new-zone={ZONE_NAME}"],
+        ["firewall-cmd", "--permanent", ZONE, "--set-target=ACCEPT"],
+        ["firewall-cmd", "--permanent", ZONE, "--change-interface=muon0"],
+        ["firewall-cmd", "--permanent", ZONE, "--add-masquerade"],
+        ["firewall-cmd", "--permanent", ZONE, "--add-service=dhcp"],
+        ["firewall-cmd", "--reload"],
+    ]
@@ -0,0 +1,13 @@
+import os
+import stat
+
+from hotspot_profiles import ArtifactCache
+
+
+def test_cache_files_are_private(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    path = cache.store("hostapd", {"ssid": "Muon", "passphrase": "correct horse"}, "wpa_passphrase=correct horse\n")
+
+    assert cache.lookup("hostapd", {"ssid": "Muon", "passphrase": "correct horse"}) == path
+    for name in (os.path.basename(path), "index.json"):
+        assert stat.S_IMODE(os.stat(tmp_path / name).st_mode) == 0o600
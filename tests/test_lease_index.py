@@ -0,0 +1,83 @@
+import asyncio
+import os
+
+import pytest
+
+from lease_index import DhcpLeaseIndex, Lease, parse_leases
+
+NOW = 1_800_000_000
+LEASES = f"""{NOW + 3600} AA:BB:CC:DD:EE:01 192.168.8.10 steamdeck 01:aa:bb:cc:dd:ee:01
+{NOW - 60} aa:bb:cc:dd:ee:02 192.168.8.11 old-phone *
+0 aa:bb:cc:dd:ee:03 192.168.8.12 * *
+garbage line
+"""
+
+
+def rewrite(path, text):
+    # dnsmasq replaces the lease file by renaming a new one over it.
+    tmp = f"{path}.new"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def test_parse_leases():
+    leases = parse_leases(LEASES)
+    assert leases == {
+        "aa:bb:cc:dd:ee:01": Lease("192.168.8.10", "steamdeck", NOW + 3600),
+        "aa:bb:cc:dd:ee:02": Lease("192.168.8.11", "old-phone", NOW - 60),
+        "aa:bb:cc:dd:ee:03": Lease("192.168.8.12", "*", 0),
+    }
+
+
+def test_missing_and_empty_files_are_empty_indexes(tmp_path):
+    index = DhcpLeaseIndex(str(tmp_path / "dnsmasq.leases"))
+    assert index.leases(NOW) == {} and index.lookup("aa:bb:cc:dd:ee:01", NOW) is None
+    (tmp_path / "dnsmasq.leases").write_text("")
+    assert index.leases(NOW) == {}
+
+
+def test_expired_leases_are_left_out(tmp_path):
+    path = tmp_path / "dnsmasq.leases"
+    path.write_text(LEASES)
+    index = DhcpLeaseIndex(str(path))
+    # Expiry 0 never expires.
+    assert sorted(index.leases(NOW)) == ["aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:03"]
+    assert index.lookup("AA:BB:CC:DD:EE:01", NOW).ip == "192.168.8.10"
+    assert index.lookup("aa:bb:cc:dd:ee:02", NOW) is None
+
+
+def test_rewritten_file_is_reparsed_without_inotify(tmp_path):
+    path = tmp_path / "dnsmasq.leases"
+    path.write_text(LEASES)
+    index = DhcpLeaseIndex(str(path))
+    assert index.refresh() and not index.refresh()
+
+    rewrite(path, f"{NOW + 3600} aa:bb:cc:dd:ee:04 192.168.8.13 laptop *\n")
+    assert index.refresh()
+    assert list(index.leases(NOW)) == ["aa:bb:cc:dd:ee:04"]
+
+
+def test_rewritten_file_is_reparsed_with_inotify(tmp_path):
+    path = tmp_path / "dnsmasq.leases"
+    path.write_text(LEASES)
+
+    async def main():
+        index = DhcpLeaseIndex(str(path))
+        if not index.start():
+            return None
+        try:
+            before = sorted(index.leases(NOW))
+            rewrite(path, f"{NOW + 3600} aa:bb:cc:dd:ee:04 192.168.8.13 laptop *\n")
+            # Let the loop deliver the inotify event.
+            await asyncio.sleep(0.05)
+            return before, index._dirty, sorted(index.leases(NOW))
+        finally:
+            index.stop()
+
+    result = asyncio.run(main())
+    if result is None:
+        pytest.skip("inotify is unavailable")
+    before, dirty, after = result
+    assert before == ["aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:03"]
+    assert dirty and after == ["aa:bb:cc:dd:ee:04"]
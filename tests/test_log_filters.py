@@ -0,0 +1,63 @@
+import logging
+
+from log_filters import REDACTED, install
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name):
+    # Created inside each test, so the only handler is ours.
+    logger = logging.Logger(name, logging.DEBUG)
+    handler = ListHandler(logging.INFO)
+    logger.addHandler(handler)
+    return logger, handler
+
+
+def test_redacts_secrets_in_emitted_records():
+    logger, handler = make_logger("muon")
+    install(logger, lambda: ("hunter22",))
+    logger.info("SET wpa_passphrase=%s", "correct horse battery")
+    logger.info("settings %s", {"ssid": "Muon", "passphrase": "correct horse battery"})
+    logger.info("config:\nwpa_passphrase=correct horse battery\nchannel=6")
+    logger.info("joined with %s", "hunter22")
+    assert handler.messages == [
+        f"SET wpa_passphrase={REDACTED}",
+        f"settings {{'ssid': 'Muon', 'passphrase': '{REDACTED}'}}",
+        f"config:\nwpa_passphrase={REDACTED}\nchannel=6",
+        f"joined with {REDACTED}",
+    ]
+    for word in ("correct", "horse", "battery"):
+        assert not any(word in message for message in handler.messages)
+
+
+def test_records_below_the_handler_level_are_not_redacted():
+    logger, handler = make_logger("muon")
+    calls = []
+    install(logger, lambda: calls.append(1) or ())
+    logger.debug("passphrase=%s", "secret")
+    assert calls == [] and handler.messages == []
+
+
+def test_covers_records_propagated_from_child_loggers():
+    logger, handler = make_logger("muon")
+    child = logging.Logger("muon.child")
+    child.parent = logger
+    install(logger, lambda: ("hunter22",))
+    child.warning("key hunter22")
+    assert handler.messages == [f"key {REDACTED}"]
+
+
+def test_install_replaces_earlier_filters():
+    logger, handler = make_logger("muon")
+    install(logger)
+    install(logger, lambda: ("hunter22",))
+    assert len(logger.filters) == 1 and len(handler.filters) == 1
+    logger.info("hunter22")
+    assert handler.messages == [REDACTED]
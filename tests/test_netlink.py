@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_DIR
+from netlink import FamilyNotFound, GenericNetlink
+
+# Runs in a throwaway network namespace, so the veth pair and addresses vanish with it.
+NETNS_SCRIPT = """
+import asyncio, json, sys
+sys.path.insert(0, sys.argv[1])
+from netlink import NetlinkBackend, NetlinkError
+
+async def main():
+    backend = NetlinkBackend()
+    route = backend.route
+    seen = {}
+    try:
+        await route.create_link("muon-veth0", "veth", peer="muon-veth1")
+        seen["created"] = [await route.get_link(name) for name in ("muon-veth0", "muon-veth1")]
+        seen["missing"] = await route.get_link("muon-none")
+
+        await route.set_link_up("muon-veth0")
+        seen["up"] = (await route.get_link("muon-veth0"))["up"]
+        await route.set_link_up("muon-veth0", False)
+        seen["down"] = (await route.get_link("muon-veth0"))["up"]
+
+        await backend.configure_address("muon-veth0", "192.168.50.1/24")
+        await route.add_address("muon-veth0", "192.168.51.1/24")
+        seen["added"] = await route.get_addresses("muon-veth0")
+        await route.delete_address("muon-veth0", "192.168.51.1/24")
+        seen["deleted"] = await route.get_addresses("muon-veth0")
+        # Replaces the previous address rather than adding to it.
+        await backend.configure_address("muon-veth0", "192.168.52.1/24")
+        seen["reconfigured"] = await route.get_addresses("muon-veth0")
+
+        try:
+            await backend.get_phy("muon-veth0")
+        except NetlinkError as e:
+            seen["phy_error"] = type(e).__name__
+
+        await route.delete_link("muon-veth0")
+        seen["deleted_pair"] = [await route.get_link(name) for name in ("muon-veth0", "muon-veth1")]
+    finally:
+        backend.close()
+    print(json.dumps(seen))
+
+asyncio.run(main())
+"""
+
+
+def netns_command():
+    # `unshare` with a new network namespace, mapping to root in a user namespace if we aren't root.
+    if shutil.which("unshare") is None:
+        return None
+    command = ["unshare", "--net"] if os.geteuid() == 0 else ["unshare", "--net", "--map-root-user"]
+    if subprocess.run(command + ["true"], capture_output=True).returncode != 0:
+        return None
+    return command
+
+
+def test_backend_manages_links_and_addresses_in_a_network_namespace():
+    command = netns_command()
+    if command is None:
+        pytest.skip("unshare or CAP_NET_ADMIN in a new network namespace is unavailable")
+
+    result = subprocess.run(
+        command + [sys.executable, "-c", NETNS_SCRIPT, os.path.join(REPO_DIR, "py_modules")],
+        capture_output=True, text=True, timeout=30,
+    )
+    assert result.returncode == 0, result.stderr
+    seen = json.loads(result.stdout)
+
+    veth0, veth1 = seen["created"]
+    assert veth0["name"] == "muon-veth0" and veth1["name"] == "muon-veth1"
+    assert veth0["index"] != veth1["index"]
+    assert seen["missing"] is None
+    assert seen["up"] is True and seen["down"] is False
+    assert seen["added"] == ["192.168.50.1/24", "192.168.51.1/24"]
+    assert seen["deleted"] == ["192.168.50.1/24"]
+    assert seen["reconfigured"] == ["192.168.52.1/24"]
+    # A veth isn't wireless: either nl80211 says so or the family isn't there at all.
+    assert seen["phy_error"] in ("NetlinkError", "FamilyNotFound")
+    # Deleting one end of a veth pair removes both.
+    assert seen["deleted_pair"] == [None, None]
+
+
+def test_unknown_generic_netlink_family_raises_family_not_found():
+    async def main():
+        genl = GenericNetlink()
+        try:
+            with pytest.raises(FamilyNotFound):
+                await genl.family_id("muon-nofamily")
+        finally:
+            genl.close()
+
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+import pytest
+
+from phy_caps import chan_switch_flags, parse_phy_info, radio_params
+
+
+@pytest.fixture(scope="module")
+def caps(phy_info):
+    return parse_phy_info(phy_info)
+
+
+def option(params: dict, key: str):
+    values = [line.split("=", 1)[1] for line in params["lines"] if line.startswith(f"{key}=")]
+    return values[0] if values else None
+
+
+def test_parses_2ghz_and_5ghz_bands_and_skips_6ghz(caps):
+    assert set(caps["bands"]) == {"a", "g"}
+    five = caps["bands"]["a"]
+    assert "HT20/HT40" in five["ht"]
+    assert "Supported Channel Width: neither 160 nor 80+80" in five["vht"]
+    assert five["he"] and "HE40/HE80/5GHz" in five["he_phy"]
+    channels = {c["channel"]: c for c in five["channels"]}
+    assert channels[52]["radar"] and channels[52]["no_ir"]
+    assert not channels[36]["radar"]
+
+
+def test_channel_36_runs_ht40_plus_vht80(caps):
+    params = radio_params(caps, 36, "a")
+    assert params["width"] == 80 and params["center_channel"] == 42
+    assert option(params, "ht_capab").startswith("[HT40+]")
+    assert option(params, "vht_oper_chwidth") == "1"
+    assert option(params, "vht_oper_centr_freq_seg0_idx") == "42"
+    assert option(params, "he_oper_centr_freq_seg0_idx") == "42"
+    assert "[VHT160]" not in option(params, "vht_capab")
+    assert chan_switch_flags(params) == ["sec_channel_offset=1", "center_freq1=5210", "bandwidth=80", "ht", "vht", "he"]
+
+
+def test_channel_40_pairs_below(caps):
+    params = radio_params(caps, 40, "a")
+    assert option(params, "ht_capab").startswith("[HT40-]")
+    assert params["sec_offset"] == -1
+    assert option(params, "vht_oper_centr_freq_seg0_idx") == "42"
+
+
+@pytest.mark.parametrize("channel", [149, 157])
+def test_upper_band_runs_vht80_centred_on_155(caps, channel):
+    params = radio_params(caps, channel, "a")
+    assert params["width"] == 80
+    assert option(params, "ht_capab").startswith("[HT40+]")
+    assert option(params, "vht_oper_centr_freq_seg0_idx") == "155"
+    assert "center_freq1=5775" in chan_switch_flags(params)
+
+
+@pytest.mark.parametrize("channel", [165, 52])
+def test_unpaired_and_dfs_channels_stay_at_20mhz(caps, channel):
+    params = radio_params(caps, channel, "a")
+    assert params["width"] == 20 and params["center_channel"] is None
+    assert "[HT40" not in option(params, "ht_capab")
+    assert "[SHORT-GI-40]" not in option(params, "ht_capab")
+    assert option(params, "vht_oper_chwidth") == "0"
+    assert option(params, "vht_oper_centr_freq_seg0_idx") is None
+    assert chan_switch_flags(params) == ["ht", "vht", "he"]
+
+
+def test_2ghz_drops_40mhz_flags(caps):
+    params = radio_params(caps, 6, "g")
+    ht_capab = option(params, "ht_capab")
+    assert params["width"] == 20
+    for flag in ("[HT40+]", "[HT40-]", "[SHORT-GI-40]", "[DSSS_CCK-40]"):
+        assert flag not in ht_capab
+    assert option(params, "ieee80211ac") is None and option(params, "vht_oper_chwidth") is None
+    assert option(params, "ieee80211ax") == "1" and option(params, "he_oper_chwidth") is None
+
+
+def test_without_capabilities_falls_back_to_historical_defaults():
+    assert radio_params(None, 36, "a")["lines"] == ["ieee80211n=1", "ieee80211ac=1", "ht_capab=[HT40+]"]
+    assert radio_params({"bands": {}}, 6, "g")["lines"] == ["ieee80211n=1"]
@@ -0,0 +1,40 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+import priv_helper
+from priv_helper import HelperError, PrivilegedHelper
+
+
+def test_batch_runs_commands_through_the_helper():
+    async def main():
+        helper = PrivilegedHelper(python=sys.executable)
+        try:
+            return await helper.batch([["which", "which"], ["reboot"]], timeout=5)
+        finally:
+            await helper.close()
+
+    found, refused = asyncio.run(main())
+    assert found["returncode"] == 0 and not found["timed_out"]
+    assert refused["returncode"] == priv_helper.RETURNCODE_NOT_ALLOWED
+
+
+def test_batch_gives_up_on_a_helper_that_never_answers(tmp_path, monkeypatch):
+    # Stands in for the interpreter: reads nothing and never writes a response.
+    stuck = tmp_path / "stuck"
+    stuck.write_text("#!/bin/sh\nexec sleep 60\n")
+    os.chmod(stuck, 0o755)
+    monkeypatch.setattr(priv_helper, "DEADLINE_MARGIN", 0.2)
+
+    async def main():
+        helper = PrivilegedHelper(python=str(stuck))
+        try:
+            with pytest.raises(HelperError, match="did not respond"):
+                await helper.batch([["which", "which"]], timeout=0.1)
+            assert not helper.running
+        finally:
+            await helper.close()
+
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from stage_graph import Stage, StageGraph
+
+
+class Recorder:
+    # Builds stage callables that log what ran, in order.
+    def __init__(self):
+        self.events = []
+
+    def step(self, name, delay=0.0, result=True, error=None):
+        async def run():
+            self.events.append(f"start {name}")
+            await asyncio.sleep(delay)
+            self.events.append(f"end {name}")
+            if error is not None:
+                raise error
+            return result
+        return run
+
+    def undo(self, name):
+        async def rollback():
+            self.events.append(f"rollback {name}")
+        return rollback
+
+
+def test_independent_stages_run_concurrently():
+    log = Recorder()
+    graph = StageGraph([
+        Stage("a", log.step("a", 0.05)),
+        Stage("b", log.step("b", 0.05)),
+        Stage("c", log.step("c"), requires=["a", "b"]),
+    ])
+    assert asyncio.run(graph.run())
+    # Both roots start before either finishes; the dependent waits for both.
+    assert log.events[:2] == ["start a", "start b"]
+    assert log.events.index("start c") > max(log.events.index("end a"), log.events.index("end b"))
+
+
+def test_failed_stage_cancels_its_dependents():
+    log = Recorder()
+    graph = StageGraph([
+        Stage("a", log.step("a", result=False)),
+        Stage("b", log.step("b"), requires=["a"]),
+        Stage("c", log.step("c"), requires=["b"]),
+    ])
+    assert not asyncio.run(graph.run())
+    assert log.events == ["start a", "end a"]
+    assert [r["status"] for r in graph.report()] == ["failed", "cancelled", "cancelled"]
+
+
+def test_rollback_runs_in_reverse_for_completed_stages_only():
+    log = Recorder()
+    graph = StageGraph([
+        Stage("first", log.step("first"), rollback=log.undo("first")),
+        Stage("second", log.step("second"), requires=["first"], rollback=log.undo("second")),
+        Stage("broken", log.step("broken", error=RuntimeError("boom")), requires=["second"]),
+        Stage("never", log.step("never"), requires=["broken"], rollback=log.undo("never")),
+    ])
+    assert not asyncio.run(graph.run())
+    assert [e for e in log.events if e.startswith("rollback")] == ["rollback second", "rollback first"]
+    results = {r["stage"]: r for r in graph.report()}
+    assert results["first"]["rolled_back"] and results["second"]["rolled_back"]
+    assert not results["never"]["rolled_back"]
+    assert results["broken"]["error"] == "boom"
+
+
+def test_report_lists_statuses_and_durations_in_declaration_order():
+    log = Recorder()
+    graph = StageGraph([
+        Stage("slow", log.step("slow", 0.05)),
+        Stage("fast", log.step("fast")),
+        Stage("bad", log.step("bad", result=False), requires=["fast"]),
+        Stage("after", log.step("after"), requires=["bad"]),
+    ])
+    asyncio.run(graph.run())
+    report = graph.report()
+    assert [(r["stage"], r["status"]) for r in report] == [("slow", "ok"), ("fast", "ok"), ("bad", "failed"), ("after", "cancelled")]
+    assert report[0]["duration"] >= 0.05 and report[1]["duration"] < 0.05
+    assert report[2]["error"] == "stage reported failure"
+    assert report[3]["duration"] is None
+
+
+def test_rejects_unknown_requirements_and_cycles():
+    with pytest.raises(ValueError, match="unknown stage"):
+        StageGraph([Stage("a", None, requires=["missing"])])
+    with pytest.raises(ValueError, match="cycle"):
+        StageGraph([Stage("a", None, requires=["b"]), Stage("b", None, requires=["a"])])
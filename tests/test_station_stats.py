@@ -0,0 +1,22 @@
+from station_stats import StationStatsCollector
+
+A = "aa:bb:cc:dd:ee:01"
+B = "aa:bb:cc:dd:ee:02"
+
+
+def sample(rx_bytes, tx_bytes, retries, signal=-50):
+    return {"rx_bytes": rx_bytes, "tx_bytes": tx_bytes, "tx_retry_count": retries, "tx_retry_failed": 0, "signal": signal}
+
+
+def test_summary_averages_each_station_over_the_window():
+    stats = StationStatsCollector()
+    for second in range(6):
+        stats.record(A, sample(1000 * second, 4000 * second, 2 * second), now=100 + second)
+    stats.record(B, sample(0, 0, 0), now=90)
+
+    summary = stats.summary([A, B, "aa:bb:cc:dd:ee:03"], window=10, now=105)
+    assert list(summary) == [A]
+    assert summary[A]["rx_rate"] == 1000
+    assert summary[A]["tx_rate"] == 4000
+    assert summary[A]["tx_retry_rate"] == 2
+    assert summary[A]["signal"] == -50